@@ -1,14 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional, List, Literal
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.services.espn_service import ESPNService
+from app.services.espn_views import FetchMode, espn_view_cache
+from app.services.box_score_format import box_scores_to_columnar, iter_box_scores_ndjson, NDJSON_MEDIA_TYPE
+from app.services.league_registry import league_registry
+from app.services.player_index import player_index_registry
+from app.services.single_flight import espn_single_flight
+from app.services.espn_resilience import espn_resilience
+from app.services.scoreboard_watcher import scoreboard_watcher
 
 router = APIRouter()
 
+# Most weeks one box-scores range request may cover
+MAX_BOX_SCORE_WEEKS = 18
+
 # Dependency to get ESPN service
 def get_espn_service() -> ESPNService:
     return ESPNService()
 
+# Dependencies for endpoints that only need a few ESPN views, so a cold start skips the full League build
+def get_settings_espn_service() -> ESPNService:
+    return ESPNService(fetch_mode=FetchMode.SETTINGS)
+
+def get_scoreboard_espn_service() -> ESPNService:
+    return ESPNService(fetch_mode=FetchMode.SCOREBOARD)
+
+def get_roster_espn_service() -> ESPNService:
+    return ESPNService(fetch_mode=FetchMode.ROSTER)
+
 # Request models
 class LeagueConfigRequest(BaseModel):
     league_id: int
@@ -24,7 +45,7 @@ class ActivityRequest(BaseModel):
     msg_type: Optional[str] = None
 
 @router.post("/configure")
-async def configure_league(
+def configure_league(
     config: LeagueConfigRequest,
     espn_service: ESPNService = Depends(get_espn_service)
 ):
@@ -42,7 +63,7 @@ async def configure_league(
     return {"message": "ESPN league configured successfully", "league_id": config.league_id, "year": config.year}
 
 @router.get("/test-connection")
-async def test_connection(espn_service: ESPNService = Depends(get_espn_service)):
+def test_connection(espn_service: ESPNService = Depends(get_espn_service)):
     """Test ESPN API connection"""
     success = espn_service.test_connection()
     
@@ -52,7 +73,7 @@ async def test_connection(espn_service: ESPNService = Depends(get_espn_service))
     return {"message": "ESPN connection successful"}
 
 @router.get("/league-info")
-async def get_league_info(espn_service: ESPNService = Depends(get_espn_service)):
+def get_league_info(espn_service: ESPNService = Depends(get_settings_espn_service)):
     """Get basic league information"""
     info = espn_service.get_league_info()
     
@@ -62,7 +83,7 @@ async def get_league_info(espn_service: ESPNService = Depends(get_espn_service))
     return info
 
 @router.get("/teams")
-async def get_teams(espn_service: ESPNService = Depends(get_espn_service)):
+def get_teams(espn_service: ESPNService = Depends(get_scoreboard_espn_service)):
     """Get all teams in the league"""
     teams = espn_service.get_teams()
     
@@ -74,10 +95,10 @@ async def get_teams(espn_service: ESPNService = Depends(get_espn_service)):
 @router.get("/matchups")
 async def get_matchups(
     week: Optional[int] = None,
-    espn_service: ESPNService = Depends(get_espn_service)
+    espn_service: ESPNService = Depends(get_scoreboard_espn_service)
 ):
     """Get matchups for a specific week or current week"""
-    matchups = espn_service.get_matchups(week)
+    matchups = await espn_service.get_matchups_async(week)
     
     if not matchups:
         raise HTTPException(status_code=404, detail="No matchups found or league not configured")
@@ -87,18 +108,70 @@ async def get_matchups(
 @router.get("/box-scores/{week}")
 async def get_box_scores(
     week: int,
+    format: Literal["json", "columnar", "ndjson"] = Query("json", description="json, columnar (parallel arrays per team) or ndjson (one matchup per line)"),
     espn_service: ESPNService = Depends(get_espn_service)
 ):
     """Get detailed box scores for a specific week"""
-    box_scores = espn_service.get_box_scores(week)
+    if format == "json":
+        box_scores = (await espn_service.get_box_scores_async([week])).get(week)
+        
+        if not box_scores:
+            raise HTTPException(status_code=404, detail="No box scores found or league not configured")
+        
+        return {"box_scores": box_scores, "week": week, "count": len(box_scores)}
+    
+    box_scores = (await espn_service.get_box_score_objects_async([week])).get(week)
+    
+    if not box_scores:
+        raise HTTPException(status_code=404, detail="No box scores found or league not configured")
+    
+    if format == "ndjson":
+        return StreamingResponse(iter_box_scores_ndjson({week: box_scores}), media_type=NDJSON_MEDIA_TYPE)
+    return {**box_scores_to_columnar(box_scores, week), "count": len(box_scores)}
+
+@router.get("/box-scores")
+async def get_box_scores_range(
+    start_week: int = Query(..., ge=1),
+    end_week: int = Query(..., ge=1),
+    format: Literal["json", "columnar", "ndjson"] = Query("json", description="json, columnar (parallel arrays per team) or ndjson (one matchup per line)"),
+    espn_service: ESPNService = Depends(get_espn_service)
+):
+    """Get box scores for a range of weeks, fetched concurrently"""
+    if end_week < start_week:
+        raise HTTPException(status_code=400, detail="end_week must be greater than or equal to start_week")
+    if end_week - start_week + 1 > MAX_BOX_SCORE_WEEKS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BOX_SCORE_WEEKS} weeks per request")
+    
+    weeks = list(range(start_week, end_week + 1))
+    if format != "json":
+        box_scores = await espn_service.get_box_score_objects_async(weeks)
+        
+        if not box_scores:
+            raise HTTPException(status_code=404, detail="No box scores found or league not configured")
+        
+        if format == "ndjson":
+            return StreamingResponse(iter_box_scores_ndjson(box_scores), media_type=NDJSON_MEDIA_TYPE)
+        return {
+            "box_scores": {str(week): box_scores_to_columnar(scores, week) for week, scores in box_scores.items()},
+            "start_week": start_week,
+            "end_week": end_week,
+            "count": sum(len(scores) for scores in box_scores.values())
+        }
+    
+    box_scores = await espn_service.get_box_scores_async(weeks)
     
     if not box_scores:
         raise HTTPException(status_code=404, detail="No box scores found or league not configured")
     
-    return {"box_scores": box_scores, "week": week, "count": len(box_scores)}
+    return {
+        "box_scores": {str(week): scores for week, scores in box_scores.items()},
+        "start_week": start_week,
+        "end_week": end_week,
+        "count": sum(len(scores) for scores in box_scores.values())
+    }
 
 @router.get("/standings")
-async def get_standings(espn_service: ESPNService = Depends(get_espn_service)):
+def get_standings(espn_service: ESPNService = Depends(get_espn_service)):
     """Get current league standings"""
     standings = espn_service.get_standings()
     
@@ -108,7 +181,7 @@ async def get_standings(espn_service: ESPNService = Depends(get_espn_service)):
     return {"standings": standings, "count": len(standings)}
 
 @router.get("/power-rankings")
-async def get_power_rankings(
+def get_power_rankings(
     week: Optional[int] = None,
     espn_service: ESPNService = Depends(get_espn_service)
 ):
@@ -121,13 +194,16 @@ async def get_power_rankings(
     return {"power_rankings": rankings, "week": week, "count": len(rankings)}
 
 @router.get("/recent-activity")
-async def get_recent_activity(
-    size: int = 25,
-    msg_type: Optional[str] = None,
+def get_recent_activity(
+    size: int = Query(25, ge=1, le=500),
+    msg_type: Optional[str] = Query(None, description="FA, WAIVER, TRADED or DROPPED"),
+    team_id: Optional[int] = None,
+    week: Optional[int] = None,
+    offset: int = Query(0, ge=0),
     espn_service: ESPNService = Depends(get_espn_service)
 ):
-    """Get recent league activity"""
-    activities = espn_service.get_recent_activity(size=size, msg_type=msg_type)
+    """Get recent league activity from the local activity log, newest first"""
+    activities = espn_service.get_recent_activity(size=size, msg_type=msg_type, team_id=team_id, week=week, offset=offset)
     
     if not activities:
         raise HTTPException(status_code=404, detail="No recent activity found or league not configured")
@@ -135,9 +211,9 @@ async def get_recent_activity(
     return {"activities": activities, "count": len(activities)}
 
 @router.get("/teams/{team_id}/roster")
-async def get_team_roster(
+def get_team_roster(
     team_id: int,
-    espn_service: ESPNService = Depends(get_espn_service)
+    espn_service: ESPNService = Depends(get_roster_espn_service)
 ):
     """Get roster for a specific team"""
     roster = espn_service.get_team_roster(team_id)
@@ -146,3 +222,41 @@ async def get_team_roster(
         raise HTTPException(status_code=404, detail="Team not found or no roster data available")
     
     return {"team_id": team_id, "roster": roster, "count": len(roster)}
+
+@router.get("/players/{player_id}")
+def get_player(
+    player_id: int,
+    espn_service: ESPNService = Depends(get_espn_service)
+):
+    """Get a player's name, position, pro team and injury status from the league's player index"""
+    player_index = espn_service.player_index()
+    player = player_index.to_dict(player_id) if player_index else None
+    
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found or league not configured")
+    
+    return player
+
+@router.get("/registry")
+async def get_league_registry():
+    """Get the shared ESPN league connections and registry counters"""
+    return {
+        **league_registry.get_stats(),
+        "player_indexes": player_index_registry.get_stats(),
+        "views": espn_view_cache.get_stats()
+    }
+
+@router.get("/single-flight")
+async def get_single_flight_stats():
+    """Get how many ESPN fetches were coalesced into an identical in-flight fetch"""
+    return espn_single_flight.get_stats()
+
+@router.get("/resilience")
+async def get_resilience_stats():
+    """Get ESPN rate limiting, retry, circuit breaker and stale-serving state"""
+    return espn_resilience.get_stats()
+
+@router.get("/scoreboard-watcher")
+async def get_scoreboard_watcher_status():
+    """Get scoreboard polling state and the most recent change events"""
+    return scoreboard_watcher.get_status()
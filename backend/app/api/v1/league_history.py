@@ -0,0 +1,97 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Dict, Any, Optional
+from app.services.league_history_store import LeagueHistoryStore, get_history_store
+from app.services.league_registry import league_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Dependency to get league history store
+def get_league_history_store() -> LeagueHistoryStore:
+    return get_history_store()
+
+def resolve_league_id(league_id: Optional[int]) -> int:
+    """Explicit league_id, else the configured league"""
+    if league_id:
+        return league_id
+    config = league_registry.get_active_config()
+    if not config:
+        raise HTTPException(status_code=404, detail="No league configured; pass league_id")
+    return int(config["espn_league_id"])
+
+@router.get("/seasons", response_model=List[Dict[str, Any]])
+def get_seasons(
+    league_id: Optional[int] = Query(None, description="ESPN league ID (defaults to the configured league)"),
+    store: LeagueHistoryStore = Depends(get_league_history_store)
+):
+    """Get every ingested season with its champion"""
+    try:
+        seasons = store.get_seasons(resolve_league_id(league_id))
+
+        if not seasons:
+            raise HTTPException(status_code=404, detail="No history ingested for this league. Run ingest_league_history.py first.")
+
+        return seasons
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting league seasons: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/teams/{team_id}", response_model=List[Dict[str, Any]])
+def get_team_history(
+    team_id: int,
+    league_id: Optional[int] = Query(None, description="ESPN league ID (defaults to the configured league)"),
+    store: LeagueHistoryStore = Depends(get_league_history_store)
+):
+    """Get a team's record, scoring and finish in every ingested season"""
+    try:
+        history = store.get_team_history(resolve_league_id(league_id), team_id)
+
+        if not history:
+            raise HTTPException(status_code=404, detail=f"No history found for team {team_id}")
+
+        return history
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting team history: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/rivalry", response_model=Dict[str, Any])
+def get_rivalry(
+    team_a: int = Query(..., description="ESPN team ID"),
+    team_b: int = Query(..., description="ESPN team ID"),
+    league_id: Optional[int] = Query(None, description="ESPN league ID (defaults to the configured league)"),
+    store: LeagueHistoryStore = Depends(get_league_history_store)
+):
+    """Get the all-time head-to-head record between two teams"""
+    try:
+        return store.get_rivalry(resolve_league_id(league_id), team_a, team_b)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting rivalry: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/bids", response_model=List[Dict[str, Any]])
+def get_bidding_history(
+    year: Optional[int] = Query(None, description="Season (defaults to all seasons)"),
+    limit: int = Query(500, ge=1, le=5000),
+    league_id: Optional[int] = Query(None, description="ESPN league ID (defaults to the configured league)"),
+    store: LeagueHistoryStore = Depends(get_league_history_store)
+):
+    """Get historical FAAB waiver bids, newest first"""
+    try:
+        return store.get_bidding_history(resolve_league_id(league_id), year, limit)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting bidding history: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,35 +1,58 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Dict, Any, Optional
+from datetime import datetime
+from pydantic import BaseModel
 from app.services.odds_service import OddsService
+from app.services.odds_history_service import OddsHistoryService
+from app.services.odds_refresh_scheduler import odds_refresh_scheduler
+from app.core.security import require_admin
+from app.services.lineup_optimizer import LineupOptimizer
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Most weeks one batch request may price (a full regular season)
+MAX_BATCH_WEEKS = 18
+
+# Most team-stat pairs one advanced-odds batch may simulate
+MAX_ADVANCED_BATCH_PAIRS = 1000
+
 # Dependency to get odds service
 def get_odds_service() -> OddsService:
     return OddsService()
 
+# Dependency to get odds history service
+def get_odds_history_service() -> OddsHistoryService:
+    return OddsHistoryService()
+
+# Dependency to get lineup optimizer
+def get_lineup_optimizer() -> LineupOptimizer:
+    return LineupOptimizer()
+
+# Request models
+class AdvancedOddsPair(BaseModel):
+    team1_stats: Dict[str, Any]
+    team2_stats: Dict[str, Any]
+
 @router.get("/matchups", response_model=List[Dict[str, Any]])
-def get_matchup_odds(
-    week: Optional[int] = Query(None, description="Week number (defaults to current week)"),
-    odds_service: OddsService = Depends(get_odds_service)
+async def get_matchup_odds(
+    response: Response,
+    week: Optional[int] = Query(None, description="Week number (defaults to current week)")
 ):
-    """Get odds for all matchups in a given week"""
+    """Get materialized odds for all matchups in a given week"""
     try:
-        if week:
-            odds_data = odds_service.get_odds_for_week(week)
-        else:
-            odds_data = odds_service.get_current_odds()
+        materialized = await odds_refresh_scheduler.get_materialized(week)
         
-        if not odds_data:
+        if not materialized:
             raise HTTPException(
                 status_code=404,
                 detail=f"No odds data found for week {week or 'current'}. Make sure the league is configured and the week has matchups."
             )
         
-        return odds_data
+        set_odds_age_headers(response, materialized)
+        return materialized['odds']
         
     except HTTPException:
         raise
@@ -41,21 +64,22 @@ def get_matchup_odds(
         )
 
 @router.get("/matchups/{week}", response_model=List[Dict[str, Any]])
-def get_matchup_odds_for_week(
+async def get_matchup_odds_for_week(
     week: int,
-    odds_service: OddsService = Depends(get_odds_service)
+    response: Response
 ):
-    """Get odds for all matchups in a specific week"""
+    """Get materialized odds for all matchups in a specific week"""
     try:
-        odds_data = odds_service.get_odds_for_week(week)
+        materialized = await odds_refresh_scheduler.get_materialized(week)
         
-        if not odds_data:
+        if not materialized:
             raise HTTPException(
                 status_code=404,
                 detail=f"No odds data found for week {week}. Make sure the league is configured and the week has matchups."
             )
         
-        return odds_data
+        set_odds_age_headers(response, materialized)
+        return materialized['odds']
         
     except HTTPException:
         raise
@@ -66,16 +90,88 @@ def get_matchup_odds_for_week(
             detail=f"Error retrieving matchup odds for week {week}: {str(e)}"
         )
 
-@router.post("/update")
-def update_odds(
-    week: Optional[int] = Query(None, description="Week number to update (defaults to current week)"),
-    odds_service: OddsService = Depends(get_odds_service)
+def set_odds_age_headers(response: Response, materialized: Dict[str, Any]):
+    """Expose when the served snapshot was computed without changing the response body"""
+    response.headers["X-Odds-Refreshed-At"] = materialized['refreshed_at']
+    response.headers["X-Odds-Age-Seconds"] = str(materialized['age_seconds'])
+
+@router.get("/batch", response_model=Dict[str, Any])
+async def get_matchup_odds_batch(
+    start_week: Optional[int] = Query(None, ge=1, description="First week (defaults to current week)"),
+    end_week: Optional[int] = Query(None, ge=1, description="Last week (defaults to the last regular-season week)")
+):
+    """Get odds for a range of weeks, pricing any weeks not yet materialized in one shared data pass"""
+    try:
+        remaining_weeks = await odds_refresh_scheduler.remaining_regular_season_weeks()
+        start_week = start_week or (remaining_weeks[0] if remaining_weeks else 1)
+        end_week = end_week or (remaining_weeks[-1] if remaining_weeks else start_week)
+        
+        if end_week < start_week or end_week - start_week >= MAX_BATCH_WEEKS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Week range must be ascending and span at most {MAX_BATCH_WEEKS} weeks"
+            )
+        
+        weeks = list(range(start_week, end_week + 1))
+        materialized = await odds_refresh_scheduler.get_materialized_weeks(weeks)
+        
+        return {
+            "weeks": [entry for entry in materialized if entry],
+            "missing_weeks": [week for week, entry in zip(weeks, materialized) if not entry]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting batch matchup odds: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving batch matchup odds: {str(e)}"
+        )
+
+@router.get("/materialized/status", response_model=Dict[str, Any])
+def get_materialized_status():
+    """Get background odds refresher status"""
+    return odds_refresh_scheduler.get_status()
+
+@router.get("/alternate-lines", response_model=List[Dict[str, Any]])
+async def get_alternate_lines(
+    response: Response,
+    week: Optional[int] = Query(None, description="Week number (defaults to current week)"),
+    matchup_id: Optional[str] = Query(None, description="Limit to one matchup (home_team_id-away_team_id-week)")
 ):
-    """Update odds for a specific week or current week"""
+    """Get materialized alternate spread and total ladders with fair prices for each line"""
     try:
-        success = odds_service.update_odds(week)
+        materialized = await odds_refresh_scheduler.get_materialized_ladders(week, matchup_id)
+        ladders = materialized['ladders'] if materialized else []
+        
+        if not ladders:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No alternate lines found for {'matchup ' + matchup_id if matchup_id else 'week ' + str(week or 'current')}."
+            )
+        
+        set_odds_age_headers(response, materialized)
+        return ladders
         
-        if success:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting alternate lines: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving alternate lines: {str(e)}"
+        )
+
+@router.post("/update", dependencies=[Depends(require_admin)])
+async def update_odds(
+    week: Optional[int] = Query(None, description="Week number to update (defaults to current week)")
+):
+    """Force a refresh of the materialized odds for a specific week or current week (admin only)"""
+    try:
+        changes = await odds_refresh_scheduler.refresh_week(week)
+        
+        if changes:
             return {
                 "success": True,
                 "message": f"Odds updated successfully for week {week or 'current'}",
@@ -96,6 +192,80 @@ def update_odds(
             detail=f"Error updating odds: {str(e)}"
         )
 
+@router.post("/refresh", response_model=Dict[str, Any], dependencies=[Depends(require_admin)])
+async def refresh_odds(
+    week: Optional[int] = Query(None, description="Week number to refresh (defaults to current week)")
+):
+    """Force a refresh, repricing matchups whose inputs changed and reporting which lines moved (admin only)"""
+    try:
+        changes = await odds_refresh_scheduler.refresh_week(week)
+        
+        if not changes:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No matchups found for week {week or 'current'}."
+            )
+        
+        return changes
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error refreshing odds: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error refreshing odds: {str(e)}"
+        )
+
+@router.get("/history/{matchup_id}", response_model=List[Dict[str, Any]])
+def get_line_movement(
+    matchup_id: str,
+    start: Optional[datetime] = Query(None, description="Only lines published at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only lines published at or before this time"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of lines"),
+    odds_service: OddsService = Depends(get_odds_service),
+    history_service: OddsHistoryService = Depends(get_odds_history_service)
+):
+    """Get a matchup's line movement in the configured league season, oldest first"""
+    try:
+        espn_service = odds_service.espn_service
+        return history_service.get_line_movement(espn_service.league_id, espn_service.year, matchup_id, start, end, limit)
+        
+    except Exception as e:
+        logger.error(f"Error getting line movement: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving line movement for {matchup_id}: {str(e)}"
+        )
+
+@router.get("/closing-lines/{week}", response_model=List[Dict[str, Any]])
+def get_closing_lines(
+    week: int,
+    odds_service: OddsService = Depends(get_odds_service),
+    history_service: OddsHistoryService = Depends(get_odds_history_service)
+):
+    """Get the last published line for every matchup in a week"""
+    try:
+        espn_service = odds_service.espn_service
+        closing_lines = history_service.get_closing_lines(espn_service.league_id, espn_service.year, week)
+        
+        if not closing_lines:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No line history found for week {week}."
+            )
+        
+        return closing_lines
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting closing lines: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving closing lines for week {week}: {str(e)}"
+        )
+
 @router.get("/test")
 def test_odds_calculation(odds_service: OddsService = Depends(get_odds_service)):
     """Test the odds calculation system"""
@@ -153,3 +323,49 @@ def calculate_advanced_odds(
             status_code=500,
             detail=f"Error calculating advanced odds: {str(e)}"
         )
+
+@router.post("/monte-carlo/advanced/batch", response_model=List[Dict[str, Any]])
+def calculate_advanced_odds_batch(
+    pairs: List[AdvancedOddsPair],
+    iterations: int = Query(10000, ge=100, le=100000, description="Simulations per pair"),
+    odds_service: OddsService = Depends(get_odds_service)
+):
+    """Calculate advanced odds for many team-stat pairs in one simulation, returned in request order"""
+    if len(pairs) > MAX_ADVANCED_BATCH_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ADVANCED_BATCH_PAIRS} pairs per batch")
+    
+    try:
+        return odds_service.calculate_advanced_odds_batch([(pair.team1_stats, pair.team2_stats) for pair in pairs], iterations)
+    except Exception as e:
+        logger.error(f"Error calculating batch advanced odds: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error calculating batch advanced odds: {str(e)}"
+        )
+
+@router.get("/lineup/{team_id}", response_model=Dict[str, Any])
+def optimize_lineup(
+    team_id: int,
+    week: Optional[int] = Query(None, description="Week number (defaults to current week)"),
+    lineup_optimizer: LineupOptimizer = Depends(get_lineup_optimizer)
+):
+    """Get the start/sit lineup that maximizes win probability against the week's opponent, from that week's projections"""
+    try:
+        result = lineup_optimizer.optimize_team_lineup(team_id, week)
+        
+        if not result:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No roster data found for team {team_id}. Make sure the league is configured."
+            )
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error optimizing lineup for team {team_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error optimizing lineup: {str(e)}"
+        )
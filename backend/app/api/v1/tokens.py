@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional, Dict, Any
 from uuid import UUID
 from app.services.token_service import TokenService
-from app.models.token import TokenBalance, TokenTransaction
+from app.services.token_economy_simulator import TokenEconomySimulator
+from app.models.token import TokenBalance, TokenTransaction, TokenAllocationPolicy
 
 router = APIRouter()
 
@@ -10,6 +11,10 @@ router = APIRouter()
 def get_token_service() -> TokenService:
     return TokenService()
 
+# Dependency to get token economy simulator
+def get_token_economy_simulator() -> TokenEconomySimulator:
+    return TokenEconomySimulator()
+
 @router.get("/balance/{team_id}/{week}", response_model=TokenBalance)
 def get_token_balance(
     team_id: UUID,
@@ -82,3 +87,17 @@ def weekly_token_reset(
     if not success:
         raise HTTPException(status_code=400, detail="Failed to reset tokens")
     return {"message": f"Weekly token reset completed for week {week}"}
+
+@router.post("/simulate-economy", response_model=Dict[str, Any])
+def simulate_token_economy(
+    policy: TokenAllocationPolicy,
+    weeks: int = Query(17, ge=1, le=25, description="Weeks in the simulated season"),
+    iterations: int = Query(5000, ge=1, le=50000, description="Simulated seasons"),
+    simulator: TokenEconomySimulator = Depends(get_token_economy_simulator)
+):
+    """Project season token balances and leaderboard volatility for an allocation policy"""
+    simulator.iterations = iterations
+    result = simulator.simulate_season(policy, weeks=weeks)
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=f"Token economy simulation failed: {result['error']}")
+    return result
@@ -0,0 +1,12 @@
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.core.config import settings
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Dependency that only lets requests carrying the configured admin key through"""
+    admin_key = getattr(settings, 'ADMIN_API_KEY', None)
+    if not admin_key:
+        raise HTTPException(status_code=403, detail="Admin operations are disabled (ADMIN_API_KEY not configured)")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(status_code=403, detail="Admin key required")
@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import tokens, espn, league_config, odds, betting, faab, trades, matchup_odds, enhanced_betting, faab_predictor, free_odds, advanced_markets, social_features, trade_tree
+from app.api.v1 import tokens, espn, league_config, odds, betting, faab, trades, matchup_odds, enhanced_betting, faab_predictor, free_odds, advanced_markets, social_features, trade_tree, league_history
 from app.core.config import settings
 from app.services.websocket_service import websocket_service
 from app.services.cache_service import cache_service
+from app.services.odds_refresh_scheduler import odds_refresh_scheduler, REPRICE_EVENTS
+from app.services.espn_async_client import close_http_client
+from app.services.espn_resilience import track_stale_responses
+from app.services.scoreboard_watcher import scoreboard_watcher, ScoreboardEventType
+from app.services.betting_service import settle_final_matchup
 from app.services.odds_api_service import OddsAPIService
 from app.services.monte_carlo import MonteCarloSimulator
 import logging
@@ -23,8 +28,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-ESPN-Stale", "X-ESPN-Data-Age", "X-Odds-Refreshed-At", "X-Odds-Age-Seconds"],
 )
 
+# Flag responses built from last-known-good ESPN data while ESPN is failing
+@app.middleware("http")
+async def mark_stale_espn_data(request: Request, call_next):
+    stale = track_stale_responses()
+    response = await call_next(request)
+    if "age" in stale:
+        response.headers["X-ESPN-Stale"] = "true"
+        response.headers["X-ESPN-Data-Age"] = str(int(stale["age"]))
+        response.headers["Warning"] = '110 - "Response is Stale"'
+    return response
+
 # Initialize services
 @app.on_event("startup")
 async def startup_event():
@@ -41,6 +58,15 @@ async def startup_event():
         await websocket_service.initialize(app)
         logger.info("WebSocket service initialized successfully")
         
+        # Start background odds materialization
+        await odds_refresh_scheduler.start()
+        
+        # Scoreboard changes drive odds refreshes, live broadcasts and bet settlement
+        scoreboard_watcher.subscribe(odds_refresh_scheduler.on_scoreboard_event, REPRICE_EVENTS)
+        scoreboard_watcher.subscribe(websocket_service.on_scoreboard_event)
+        scoreboard_watcher.subscribe(settle_final_matchup, [ScoreboardEventType.MATCHUP_FINAL])
+        await scoreboard_watcher.start()
+        
         logger.info("All services initialized successfully")
         
     except Exception as e:
@@ -50,7 +76,12 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     try:
+        # Stop background polling and odds materialization
+        await scoreboard_watcher.stop()
+        await odds_refresh_scheduler.stop()
+        
         # Close any open connections
+        await close_http_client()
         logger.info("Application shutdown complete")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -70,6 +101,7 @@ app.include_router(advanced_markets.router, prefix=f"{settings.API_V1_STR}/advan
 app.include_router(social_features.router, prefix=f"{settings.API_V1_STR}/social", tags=["social-features"])
 app.include_router(trade_tree.router, prefix=f"{settings.API_V1_STR}/trade-tree", tags=["trade-tree"])
 app.include_router(trades.router, prefix=f"{settings.API_V1_STR}/trades", tags=["trades"])
+app.include_router(league_history.router, prefix=f"{settings.API_V1_STR}/history", tags=["league-history"])
 
 @app.get("/")
 async def root():
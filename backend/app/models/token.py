@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
@@ -47,3 +47,9 @@ class TokenTransactionInDB(TokenTransactionBase):
 
 class TokenTransaction(TokenTransactionInDB):
     pass
+
+class TokenAllocationPolicy(BaseModel):
+    """Weekly token allocation policy evaluated by the token-economy simulator"""
+    weekly_allocation: int = Field(1000, gt=0)
+    carry_over: bool = False  # Unspent tokens roll into the next week
+    balance_cap: Optional[int] = Field(None, gt=0)  # Maximum balance after allocation (carry-over only)
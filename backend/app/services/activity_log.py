@@ -0,0 +1,193 @@
+"""
+Activity Log
+Per-league local log of ESPN league activity, synced incrementally so only new transactions are fetched and parsed
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional, Tuple
+from espn_api.football import League
+from espn_api.football.constant import ACTIVITY_MAP
+from app.core.config import settings
+from app.services.espn_resilience import espn_resilience
+from app.services.game_windows import game_calendar
+from app.services.league_history_store import LeagueHistoryStore, get_history_store
+from app.services.player_index import player_index_registry
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Topics requested per page; most syncs need only the first page
+ACTIVITY_PAGE_SIZE = 25
+# Pages read on a league's first sync (the backfill), and on any later one
+MAX_SYNC_PAGES = 40
+# Reads within this many seconds of the last sync use the log as is
+DEFAULT_ACTIVITY_SYNC_INTERVAL = 60
+# Message types espn_api's recent_activity requests (adds, waiver adds, drops, trades)
+ACTIVITY_MESSAGE_TYPES = [178, 180, 179, 239, 181, 244]
+# espn_api only serves league communication from this season on
+FIRST_ACTIVITY_SEASON = 2019
+
+# recent_activity msg_type values (espn_api's, plus a few aliases) mapped to stored action names
+ACTION_FILTERS = {
+    "FA": "FA ADDED",
+    "WAIVER": "WAIVER ADDED",
+    "TRADED": "TRADED",
+    "TRADE": "TRADED",
+    "DROPPED": "DROPPED",
+}
+
+def action_filter(msg_type: Optional[str]) -> Optional[str]:
+    """Stored action name for a msg_type filter (None matches everything)"""
+    if not msg_type:
+        return None
+    msg_type = msg_type.upper()
+    return ACTION_FILTERS.get(msg_type, msg_type)
+
+class ActivityLog:
+    """
+    Local, append-only copy of each league season's activity feed
+
+    A sync walks ESPN's newest-first feed a page at a time and stops at the first topic
+    already in the log, so steady-state syncs cost one small request and parse only new
+    messages. Topics from one sync are written in a single transaction, which keeps the
+    stored log a contiguous newest-first prefix of the feed. Player names come from the
+    shared player index rather than per-player ESPN lookups, and each topic is assigned
+    the scoring period whose games had finished by the time it happened.
+    """
+
+    def __init__(self, store: Optional[LeagueHistoryStore] = None):
+        self._store = store
+        self.sync_interval = getattr(settings, 'ACTIVITY_SYNC_INTERVAL', None) or DEFAULT_ACTIVITY_SYNC_INTERVAL
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[Tuple[int, int], threading.Lock] = {}
+        self._last_sync: Dict[Tuple[int, int], float] = {}
+        self.stats = {"syncs": 0, "pages": 0, "new_topics": 0}
+
+    @property
+    def store(self) -> LeagueHistoryStore:
+        return self._store or get_history_store()
+
+    def sync(self, league: League, force: bool = False) -> int:
+        """
+        Fetch activity newer than what the log holds
+
+        Args:
+            league: Fetched espn_api League
+            force: Sync even if the last sync was within sync_interval
+
+        Returns:
+            Number of new topics stored
+        """
+        if league.year < FIRST_ACTIVITY_SEASON:
+            return 0
+
+        key = (league.league_id, league.year)
+        with self._lock:
+            sync_lock = self._sync_locks.setdefault(key, threading.Lock())
+
+        with sync_lock:
+            # A concurrent reader may have synced while we waited
+            if not force and time.time() - self._last_sync.get(key, 0) < self.sync_interval:
+                return 0
+
+            topics = self._fetch_new_topics(league)
+            if topics:
+                self._store_topics(league, topics)
+            self._last_sync[key] = time.time()
+            self.stats["syncs"] += 1
+            self.stats["new_topics"] += len(topics)
+            if topics:
+                logger.info(f"Activity log for league {league.league_id} ({league.year}): {len(topics)} new topics")
+            return len(topics)
+
+    def _fetch_new_topics(self, league: League) -> List[Dict[str, Any]]:
+        """Newest-first topics down to the first one already stored"""
+        new_topics = []
+        for page in range(MAX_SYNC_PAGES):
+            topics = self._fetch_page(league, page * ACTIVITY_PAGE_SIZE)
+            self.stats["pages"] += 1
+            known = self.store.known_activity_topics(league.league_id, [self._topic_id(topic) for topic in topics])
+            for topic in topics:
+                if self._topic_id(topic) in known:
+                    return new_topics
+                new_topics.append(topic)
+            if len(topics) < ACTIVITY_PAGE_SIZE:
+                break
+        return new_topics
+
+    def _fetch_page(self, league: League, offset: int) -> List[Dict[str, Any]]:
+        """One raw page of ESPN's league communication feed (same request as League.recent_activity)"""
+        filters = {"topics": {
+            "filterType": {"value": ["ACTIVITY_TRANSACTIONS"]},
+            "limit": ACTIVITY_PAGE_SIZE,
+            "limitPerMessageSet": {"value": 25},
+            "offset": offset,
+            "sortMessageDate": {"sortPriority": 1, "sortAsc": False},
+            "sortFor": {"sortPriority": 2, "sortAsc": False},
+            "filterIncludeMessageTypeIds": {"value": ACTIVITY_MESSAGE_TYPES}
+        }}
+        key = ("activity_page", league.league_id, league.year, offset)
+        data = espn_resilience.call(key, league.league_id, lambda: league.espn_request.league_get(
+            extend='/communication/',
+            params={'view': 'kona_league_communication'},
+            headers={'x-fantasy-filter': json.dumps(filters)}
+        ))
+        return data.get('topics', [])
+
+    @staticmethod
+    def _topic_id(topic: Dict[str, Any]) -> str:
+        return str(topic.get('id') or topic['date'])
+
+    def _store_topics(self, league: League, topics: List[Dict[str, Any]]):
+        player_index = player_index_registry.get_index(league)
+        week_ends = self._week_end_dates(league)
+
+        topic_rows, action_rows = [], []
+        for topic in topics:
+            topic_id = self._topic_id(topic)
+            topic_rows.append((league.league_id, league.year, topic_id, topic['date'], self._week(topic['date'], week_ends)))
+            for seq, message in enumerate(topic.get('messages', [])):
+                message_type = message.get('messageTypeId')
+                action = ACTIVITY_MAP.get(message_type, 'UNKNOWN')
+                # Same team field espn_api's Activity reads for each message type
+                team_field = 'from' if message_type == 244 else 'for' if message_type == 239 else 'to'
+                player_id = message.get('targetId')
+                action_rows.append((
+                    league.league_id, topic_id, seq, message.get(team_field), action, player_id,
+                    player_index.name(player_id) if player_index else None,
+                    message.get('from', 0) if action == 'WAIVER ADDED' else 0
+                ))
+        self.store.append_activity_log(league.league_id, topic_rows, action_rows)
+
+    def _week_end_dates(self, league: League) -> List[int]:
+        """Epoch ms at which each scoring period's last game is over (see GameWindowCalendar.week_ends)"""
+        try:
+            return [int(end.timestamp() * 1000) for end in game_calendar.week_ends(league)]
+        except Exception as e:
+            logger.error(f"Error loading pro schedule for activity weeks: {e}")
+            return []
+
+    @staticmethod
+    def _week(date: int, week_ends: List[int]) -> Optional[int]:
+        """Scoring period in progress at date (the one after the last finished)"""
+        if not week_ends:
+            return None
+        return min(bisect_left(week_ends, date) + 1, len(week_ends))
+
+    def query(self, league: League, action: Optional[str] = None, team_id: Optional[int] = None,
+              week: Optional[int] = None, limit: int = 25, offset: int = 0) -> List[Dict[str, Any]]:
+        """Sync if due, then read the league season's log (see LeagueHistoryStore.query_activity_log)"""
+        try:
+            self.sync(league)
+        except Exception as e:
+            logger.error(f"Error syncing activity log for league {league.league_id}: {e}")
+        return self.store.query_activity_log(league.league_id, league.year, action, team_id, week, limit, offset)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "leagues": [f"{league_id}:{year}" for league_id, year in self._last_sync]}
+
+# Global activity log instance
+activity_log = ActivityLog()
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 from uuid import UUID, uuid4
+import asyncio
 from datetime import datetime
 from app.core.database import get_supabase
 from app.models.bet import BetCreate, BetUpdate, BetInDB, BetStatus, BetType, BetSummary
@@ -105,8 +106,8 @@ class BettingService:
             logger.error(f"Error getting bet {bet_id}: {e}")
             return None
     
-    def update_bet(self, bet_id: UUID, bet_update: BetUpdate) -> Optional[BetInDB]:
-        """Update a bet (typically to resolve it)"""
+    def update_bet(self, bet_id: UUID, bet_update: BetUpdate, only_if_status: Optional[BetStatus] = None) -> Optional[BetInDB]:
+        """Update a bet (typically to resolve it); with only_if_status, nothing changes unless the bet still has that status"""
         try:
             update_data = {
                 "updated_at": datetime.utcnow().isoformat()
@@ -121,7 +122,10 @@ class BettingService:
             if bet_update.notes:
                 update_data["notes"] = bet_update.notes
             
-            response = self.supabase.table("bets").update(update_data).eq("id", str(bet_id)).execute()
+            query = self.supabase.table("bets").update(update_data).eq("id", str(bet_id))
+            if only_if_status:
+                query = query.eq("status", only_if_status.value)
+            response = query.execute()
             
             if response.data:
                 return BetInDB(**response.data[0])
@@ -132,11 +136,14 @@ class BettingService:
             return None
     
     def resolve_bet(self, bet_id: UUID, actual_result: str, payout: Optional[int] = None) -> Optional[BetInDB]:
-        """Resolve a bet with the actual result"""
+        """Resolve a pending bet with the actual result; bets already resolved are left alone"""
         try:
             bet = self.get_bet(bet_id)
             if not bet:
                 return None
+            if bet.status != BetStatus.PENDING:
+                logger.info(f"Bet {bet_id} is already {bet.status.value}; not resolving again")
+                return None
             
             # Determine bet status based on result
             status = self._determine_bet_status(bet, actual_result)
@@ -152,7 +159,10 @@ class BettingService:
                 payout=payout
             )
             
-            updated_bet = self.update_bet(bet_id, bet_update)
+            # Conditional on the bet still being pending, so a concurrent or repeated settlement cannot pay twice
+            updated_bet = self.update_bet(bet_id, bet_update, only_if_status=BetStatus.PENDING)
+            if not updated_bet:
+                return None
             
             # Add tokens back if bet won
             if status == BetStatus.WON and payout > 0:
@@ -169,6 +179,53 @@ class BettingService:
             logger.error(f"Error resolving bet {bet_id}: {e}")
             return None
     
+    def settle_matchup(self, matchup_id: str, home_score: float, away_score: float) -> Optional[List[BetInDB]]:
+        """
+        Resolve every pending moneyline, spread and total bet on a finished matchup
+        
+        Args:
+            matchup_id: Matchup ID (home_team_id-away_team_id-week)
+            home_score: Final home score
+            away_score: Final away score
+            
+        Returns:
+            Bets that were resolved (custom bets are left for manual resolution), or None if
+            settlement failed; safe to repeat, since only pending bets are resolved
+        """
+        try:
+            response = self.supabase.table("bets").select("*").eq("matchup_id", matchup_id).eq("status", BetStatus.PENDING.value).execute()
+            
+            settled = []
+            for bet in [BetInDB(**row) for row in response.data]:
+                actual_result = self._matchup_result(bet, home_score, away_score)
+                if actual_result is None:
+                    continue
+                resolved = self.resolve_bet(bet.id, actual_result)
+                if resolved:
+                    settled.append(resolved)
+            
+            logger.info(f"Settled {len(settled)} bets on matchup {matchup_id}")
+            return settled
+            
+        except Exception as e:
+            logger.error(f"Error settling matchup {matchup_id}: {e}")
+            return None
+    
+    def _matchup_result(self, bet: BetInDB, home_score: float, away_score: float) -> Optional[str]:
+        """Winning selection for a bet's market ("home"/"away", "over"/"under" or "push")"""
+        if bet.bet_type == BetType.MONEYLINE:
+            margin = home_score - away_score
+        elif bet.bet_type == BetType.SPREAD and bet.bet_value is not None:
+            # bet_value is the line on the selected side
+            line = bet.bet_value if bet.bet_selection.lower() == "home" else -bet.bet_value
+            margin = home_score + line - away_score
+        elif bet.bet_type == BetType.TOTAL and bet.bet_value is not None:
+            total = home_score + away_score
+            return "push" if total == bet.bet_value else ("over" if total > bet.bet_value else "under")
+        else:
+            return None
+        return "push" if margin == 0 else ("home" if margin > 0 else "away")
+    
     def get_betting_summary(self, team_id: UUID, week: Optional[int] = None) -> Optional[BetSummary]:
         """Get betting summary for a team"""
         try:
@@ -244,3 +301,11 @@ class BettingService:
             return bet.bet_amount  # Return original bet amount
         else:
             return 0  # Lost bet, no payout
+
+async def settle_final_matchup(event):
+    """Scoreboard watcher subscriber: settle a matchup's bets once it is final (raising keeps the week unsettled)"""
+    settled = await asyncio.to_thread(
+        lambda: BettingService().settle_matchup(event.matchup_id, event.data['home_score'], event.data['away_score'])
+    )
+    if settled is None:
+        raise RuntimeError(f"Settlement failed for matchup {event.matchup_id}")
@@ -0,0 +1,97 @@
+"""
+Box Score Formats
+Compact columnar and NDJSON streaming encodings of espn_api box scores
+"""
+
+import json
+from typing import Dict, Any, Iterable, Iterator, List
+from app.services.espn_service import box_score_to_dict
+
+# Media type of the streamed box-score format
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Per-player fields carried as parallel arrays in the columnar format
+PLAYER_COLUMNS = ("name", "position", "slot_position", "points", "projected_points", "pro_opponent", "pro_pos_rank")
+# Low-cardinality string columns sent as indexes into a shared per-response dictionary
+DICTIONARY_COLUMNS = ("position", "slot_position", "pro_opponent")
+
+class _Dictionary:
+    """Assigns each distinct value of one column a small integer code"""
+
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def values(self) -> List[Any]:
+        return list(self.codes)
+
+def box_scores_to_columnar(box_scores: Iterable[Any], week: int) -> Dict[str, Any]:
+    """
+    Encode a week's box scores column-wise
+
+    Player data is keyed by team ID with one array per field (PLAYER_COLUMNS) instead of a
+    dict per player. DICTIONARY_COLUMNS hold integer codes into the response's
+    "dictionaries" lists. Matchups are [home_team_id, away_team_id] pairs.
+
+    Args:
+        box_scores: espn_api BoxScore objects for the week
+        week: Week number
+
+    Returns:
+        Columnar payload
+    """
+    dictionaries = {column: _Dictionary() for column in DICTIONARY_COLUMNS}
+    matchups = []
+    teams = {}
+    for box_score in box_scores:
+        pair = []
+        for side in ("home", "away"):
+            team = getattr(box_score, f"{side}_team")
+            team_id = getattr(team, 'team_id', None)
+            pair.append(team_id)
+            if team_id is None:
+                continue
+            lineup = getattr(box_score, f"{side}_lineup")
+            players = {column: [] for column in PLAYER_COLUMNS}
+            for player in lineup:
+                for column in PLAYER_COLUMNS:
+                    value = getattr(player, column)
+                    players[column].append(dictionaries[column].encode(value) if column in dictionaries else value)
+            teams[str(team_id)] = {
+                "name": team.team_name,
+                "score": getattr(box_score, f"{side}_score"),
+                "projected": getattr(box_score, f"{side}_projected", None),
+                "players": players
+            }
+        matchups.append(pair)
+
+    return {
+        "week": week,
+        "format": "columnar",
+        "columns": list(PLAYER_COLUMNS),
+        "dictionaries": {column: dictionary.values() for column, dictionary in dictionaries.items()},
+        "matchups": matchups,
+        "teams": teams
+    }
+
+def iter_box_scores_ndjson(box_scores_by_week: Dict[int, Iterable[Any]]) -> Iterator[bytes]:
+    """
+    Encode box scores as NDJSON, one matchup per line in the /box-scores JSON shape
+
+    Each line is built and serialized only when the response body pulls it, so the full
+    nested payload never exists in memory at once.
+
+    Args:
+        box_scores_by_week: espn_api BoxScore objects per week
+
+    Yields:
+        UTF-8 encoded lines
+    """
+    for week, box_scores in box_scores_by_week.items():
+        for box_score in box_scores:
+            yield (json.dumps(box_score_to_dict(box_score, week), separators=(",", ":")) + "\n").encode()
@@ -9,6 +9,7 @@ import asyncio
 from typing import Dict, Any, Optional, Union
 from datetime import datetime, timedelta
 import logging
+from app.services.game_windows import game_calendar
 try:
     from fastapi_cache import FastAPICache
     from fastapi_cache.backends.redis import RedisBackend
@@ -30,7 +31,7 @@ class CacheService:
         
         # Cache configuration
         self.default_ttl = {
-            'odds_data': 30,  # 30 seconds for odds data
+            'odds_data': 30,  # 30 seconds for odds data (set() uses the game-window TTL)
             'league_data': 300,  # 5 minutes for league data
             'user_data': 1800,  # 30 minutes for user data
             'api_responses': 60,  # 1 minute for API responses
@@ -98,6 +99,9 @@ class CacheService:
                 return False
             
             # Determine TTL
+            if ttl is None and cache_type == 'odds_data':
+                # Odds follow the game-window phase: seconds while games are live, minutes midweek
+                ttl = game_calendar.cache_ttl()
             if ttl is None:
                 ttl = self.default_ttl.get(cache_type, 300)  # Default 5 minutes
             
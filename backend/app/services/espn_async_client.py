@@ -0,0 +1,233 @@
+"""
+Async ESPN Client
+Pooled httpx client that fetches scoreboards and many weeks of box scores concurrently,
+returning the same dict shapes as ESPNService
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+import httpx
+from espn_api.football import League
+from espn_api.football.box_score import BoxScore
+from espn_api.football.matchup import Matchup
+from app.services.espn_service import matchup_to_dict, box_score_to_dict
+from app.services.espn_snapshot_store import get_snapshot_mode
+from app.services.espn_resilience import espn_resilience
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Most ESPN requests in flight at once per league, across every client and request
+MAX_CONCURRENT_REQUESTS = 8
+REQUEST_TIMEOUT = 15.0  # seconds
+
+_http_client: Optional[httpx.AsyncClient] = None
+_league_semaphores: Dict[int, asyncio.Semaphore] = {}
+
+def league_semaphore(league_id: int) -> asyncio.Semaphore:
+    """Concurrency cap shared by every AsyncESPNClient for a league (clients are built per request)"""
+    semaphore = _league_semaphores.get(league_id)
+    if semaphore is None:
+        semaphore = _league_semaphores.setdefault(league_id, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS))
+    return semaphore
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client (keep-alive, HTTP/2 when h2 is installed)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the pooled client on shutdown"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+class AsyncESPNClient:
+    """
+    Async reads for a League built by the registry
+
+    The League supplies settings, teams and credentials; this client only replaces the
+    blocking HTTP calls. The scoreboard view returns the whole season schedule, so any
+    number of weeks of matchups costs one request, and the pro schedule is shared by
+    every box-score week. When snapshot record/replay is enabled the calls fall back to
+    espn_api on a worker thread so recordings stay complete.
+    """
+
+    def __init__(self, league: League):
+        self.league = league
+        self.semaphore = league_semaphore(league.league_id)
+        self.use_threads = get_snapshot_mode() != "off"
+
+    async def _request(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> Any:
+        """GET one ESPN view through the resilience layer, joining an identical request already in flight"""
+        view = (params or {}).get('view', 'data')
+        view = '+'.join(view) if isinstance(view, list) else str(view)
+        key = (f"http:{view}", url, json.dumps(params, sort_keys=True), json.dumps(headers, sort_keys=True))
+        return await espn_resilience.call_async(key, self.league.league_id, lambda: self._fetch(url, params, headers))
+
+    async def _fetch(self, url: str, params: Optional[dict], headers: Optional[dict]) -> Any:
+        async with self.semaphore:
+            response = await get_http_client().get(
+                url, params=params, headers=headers, cookies=self.league.espn_request.cookies
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def _league_get(self, params: dict, headers: Optional[dict] = None) -> Dict[str, Any]:
+        data = await self._request(self.league.espn_request.LEAGUE_ENDPOINT, params, headers)
+        return data[0] if isinstance(data, list) else data
+
+    async def get_matchups(self, weeks: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Get matchups for several weeks from one scoreboard request
+
+        Args:
+            weeks: Matchup periods (what League.scoreboard calls a week)
+
+        Returns:
+            Dictionary mapping each week to matchups shaped like ESPNService.get_matchups
+        """
+        if self.use_threads:
+            scoreboards = await asyncio.gather(*(asyncio.to_thread(self._fetch_scoreboard_sync, week) for week in weeks))
+            return {week: [matchup_to_dict(m, week) for m in matchups] for week, matchups in zip(weeks, scoreboards)}
+
+        data = await self._league_get({'view': 'mMatchupScore'})
+        teams = {team.team_id: team for team in self.league.teams}
+
+        results = {}
+        for week in weeks:
+            matchups = [Matchup(matchup) for matchup in data['schedule'] if matchup['matchupPeriodId'] == week]
+            for matchup in matchups:
+                if matchup._home_team_id in teams:
+                    matchup.home_team = teams[matchup._home_team_id]
+                if matchup._away_team_id in teams:
+                    matchup.away_team = teams[matchup._away_team_id]
+            results[week] = [matchup_to_dict(matchup, week) for matchup in matchups]
+        return results
+
+    async def get_box_scores(self, weeks: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Get box scores for several weeks concurrently
+
+        Each week needs its box-score and positional-ratings views; the pro schedule is
+        fetched once for all weeks. Everything runs at once under the concurrency cap.
+
+        Args:
+            weeks: Week numbers
+
+        Returns:
+            Dictionary mapping each week to box scores shaped like ESPNService.get_box_scores
+        """
+        box_scores = await self.get_box_score_objects(weeks)
+        return {week: [box_score_to_dict(box_score, week) for box_score in week_scores] for week, week_scores in box_scores.items()}
+
+    async def get_box_score_objects(self, weeks: List[int]) -> Dict[int, List[BoxScore]]:
+        """get_box_scores without the dict conversion, for callers that serialize BoxScores themselves"""
+        if self.use_threads:
+            fetched = await asyncio.gather(*(asyncio.to_thread(self._fetch_box_scores_sync, week) for week in weeks))
+            return dict(zip(weeks, fetched))
+
+        periods = [self._scoring_and_matchup_period(week) for week in weeks]
+        pro_schedule_data, *week_data = await asyncio.gather(
+            self._request(self.league.espn_request.ENDPOINT, {'view': 'proTeamSchedules_wl'}),
+            *(self._league_get(
+                {'view': ['mMatchupScore', 'mScoreboard'], 'scoringPeriodId': scoring_period},
+                {'x-fantasy-filter': json.dumps({"schedule": {"filterMatchupPeriodIds": {"value": [matchup_period]}}})}
+            ) for scoring_period, matchup_period in periods),
+            *(self._league_get({'view': 'mPositionalRatings', 'scoringPeriodId': scoring_period})
+              for scoring_period, _ in periods)
+        )
+        box_data, ratings_data = week_data[:len(weeks)], week_data[len(weeks):]
+
+        teams = {team.team_id: team for team in self.league.teams}
+        results = {}
+        for week, (scoring_period, _), data, ratings in zip(weeks, periods, box_data, ratings_data):
+            pro_schedule = self._pro_schedule(pro_schedule_data, scoring_period)
+            positional_rankings = self._positional_ratings(ratings)
+            box_scores = [
+                BoxScore(matchup, pro_schedule, positional_rankings, scoring_period, self.league.year)
+                for matchup in data['schedule']
+            ]
+            for box_score in box_scores:
+                box_score.home_team = teams.get(box_score.home_team, box_score.home_team)
+                box_score.away_team = teams.get(box_score.away_team, box_score.away_team)
+            results[week] = box_scores
+        return results
+
+    async def get_kickoffs(self, week: int) -> List[datetime]:
+        """
+        Kickoff times of every NFL game in a scoring period, from the pro schedule
+
+        Args:
+            week: Scoring period
+
+        Returns:
+            Sorted UTC kickoff datetimes
+        """
+        if self.use_threads:
+            data = await asyncio.to_thread(self.league.espn_request.get_pro_schedule)
+        else:
+            data = await self._request(self.league.espn_request.ENDPOINT, {'view': 'proTeamSchedules_wl'})
+
+        kickoffs = set()
+        for team in data['settings']['proTeams']:
+            for game in team.get('proGamesByScoringPeriod', {}).get(str(week), []):
+                kickoffs.add(game['date'])
+        return [datetime.fromtimestamp(date / 1000.0, tz=timezone.utc) for date in sorted(kickoffs)]
+
+    def _fetch_scoreboard_sync(self, week: int):
+        key = ("scoreboard", self.league.league_id, self.league.year, week)
+        return espn_resilience.call(key, self.league.league_id, lambda: self.league.scoreboard(week))
+
+    def _fetch_box_scores_sync(self, week: int):
+        key = ("box_scores", self.league.league_id, self.league.year, week)
+        return espn_resilience.call(key, self.league.league_id, lambda: self.league.box_scores(week))
+
+    def _scoring_and_matchup_period(self, week: int):
+        """Same period resolution as League.box_scores"""
+        matchup_period = self.league.currentMatchupPeriod
+        scoring_period = self.league.current_week
+        if week and week <= self.league.current_week:
+            scoring_period = week
+            for matchup_id in self.league.settings.matchup_periods:
+                if week in self.league.settings.matchup_periods[matchup_id]:
+                    matchup_period = matchup_id
+                    break
+        return scoring_period, matchup_period
+
+    def _pro_schedule(self, data: Dict[str, Any], scoring_period: int) -> Dict[int, Any]:
+        """Same parsing as League._get_pro_schedule, on an already fetched response"""
+        pro_team_schedule = {}
+        for team in data['settings']['proTeams']:
+            pro_game = team.get('proGamesByScoringPeriod', {})
+            if team['id'] != 0 and pro_game.get(str(scoring_period)):
+                game_data = pro_game[str(scoring_period)][0]
+                if team['id'] == game_data['awayProTeamId']:
+                    pro_team_schedule[team['id']] = (game_data['homeProTeamId'], game_data['date'])
+                else:
+                    pro_team_schedule[team['id']] = (game_data['awayProTeamId'], game_data['date'])
+        return pro_team_schedule
+
+    def _positional_ratings(self, data: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        """Same parsing as League._get_positional_ratings, on an already fetched response"""
+        ratings = data.get('positionAgainstOpponent', {}).get('positionalRatings', {})
+        return {
+            pos: {team: team_data['rank'] for team, team_data in rating['ratingsByOpponent'].items()}
+            for pos, rating in ratings.items()
+        }
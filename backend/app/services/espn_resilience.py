@@ -0,0 +1,377 @@
+"""
+ESPN Resilience
+Rate limiting, retry with backoff, circuit breaking and last-known-good fallback around ESPN fetches
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Dict, Any, Callable, Awaitable, Hashable, Optional, Tuple
+import httpx
+from espn_api.requests.espn_requests import ESPNAccessDenied, ESPNInvalidLeague
+from app.core.config import settings
+from app.services.single_flight import espn_single_flight
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Requests per second (and burst) across all leagues and per league; a rate of 0 disables that bucket
+DEFAULT_GLOBAL_RATE = 10.0
+DEFAULT_GLOBAL_BURST = 20
+DEFAULT_LEAGUE_RATE = 4.0
+DEFAULT_LEAGUE_BURST = 10
+# Longest a fetch waits for a rate-limit token before giving up
+DEFAULT_RATE_LIMIT_WAIT = 5.0
+
+# Retries after the first attempt, with full-jitter exponential backoff between them
+DEFAULT_MAX_RETRIES = 2
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_MAX = 8.0   # seconds
+
+# Consecutive failed fetches that open a league's breaker (0 never opens it), and how long it stays open
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET = 30  # seconds
+
+# Last-known-good results kept for stale serving, and the oldest one served
+LAST_GOOD_MAX_ENTRIES = 256
+DEFAULT_STALE_MAX_AGE = 6 * 3600  # seconds
+
+def _setting(name: str, default: Any) -> Any:
+    """Setting value, or default only when it is unset (0 is a meaningful value for these knobs)"""
+    value = getattr(settings, name, None)
+    return default if value is None else value
+
+class CircuitOpenError(Exception):
+    """ESPN is failing for this league and no last-known-good data is available"""
+
+class RateLimitedError(Exception):
+    """No rate-limit token became available in time"""
+
+class TokenBucket:
+    """Thread-safe token bucket; take tokens through acquire_tokens, which never sleeps under the lock"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _wait(self, now: float) -> float:
+        """Refill, returning 0 if a token is available or the seconds until one is (caller holds the lock)"""
+        if self.rate <= 0:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def _take(self):
+        if self.rate > 0:
+            self.tokens -= 1
+
+def _reserve(buckets: Tuple[TokenBucket, ...]) -> float:
+    """
+    Take a token from every bucket only if each has one available
+
+    Returns:
+        0 once the tokens are taken, otherwise the seconds until all could be (nothing is taken then)
+    """
+    # Buckets are always passed global first, so concurrent reservations lock in the same order
+    with ExitStack() as stack:
+        for bucket in buckets:
+            stack.enter_context(bucket._lock)
+        now = time.monotonic()
+        wait = max(bucket._wait(now) for bucket in buckets)
+        if not wait:
+            for bucket in buckets:
+                bucket._take()
+        return wait
+
+def acquire_tokens(buckets: Tuple[TokenBucket, ...], timeout: float) -> bool:
+    """Take one token from each bucket together, waiting up to timeout; a refusal consumes none"""
+    deadline = time.monotonic() + timeout
+    while True:
+        wait = _reserve(buckets)
+        if not wait:
+            return True
+        if time.monotonic() + wait > deadline:
+            return False
+        time.sleep(wait)
+
+async def acquire_tokens_async(buckets: Tuple[TokenBucket, ...], timeout: float) -> bool:
+    """Async acquire_tokens"""
+    deadline = time.monotonic() + timeout
+    while True:
+        wait = _reserve(buckets)
+        if not wait:
+            return True
+        if time.monotonic() + wait > deadline:
+            return False
+        await asyncio.sleep(wait)
+
+class CircuitBreaker:
+    """
+    Closed -> open after consecutive failures -> half-open after the reset timeout
+
+    While half-open a single probe is let through; its success closes the breaker and its
+    failure reopens it for another reset period. A probe that ends without an outcome (rate
+    limited, cancelled, or an auth/bad-league error that says nothing about ESPN's health)
+    must call release_probe so the next call can probe instead.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> Tuple[bool, bool]:
+        """Whether a call may go upstream, and whether it is the half-open probe"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True, False
+            if state == "half_open" and not self.probing:
+                self.probing = True
+                return True, True
+            return False, False
+
+    def release_probe(self):
+        """Free the half-open slot if the probe finished without recording an outcome"""
+        with self._lock:
+            self.probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or 0 < self.failure_threshold <= self.failures:
+                if self.opened_at is None or self.probing:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+# Per-request record of stale data served, set up by the HTTP middleware
+_stale_marker: ContextVar[Optional[Dict[str, float]]] = ContextVar("espn_stale_marker", default=None)
+
+def track_stale_responses() -> Dict[str, float]:
+    """
+    Start recording stale ESPN data served in the current request
+
+    Returns:
+        Mutable marker; 'age' is set to the oldest stale result's age in seconds if any was served
+    """
+    marker: Dict[str, float] = {}
+    _stale_marker.set(marker)
+    return marker
+
+def _is_retryable(error: BaseException) -> bool:
+    """Auth and bad-league errors will not fix themselves, and do not say anything about ESPN's health"""
+    if isinstance(error, (ESPNAccessDenied, ESPNInvalidLeague)):
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+class ESPNResilience:
+    """
+    Guards every upstream ESPN fetch
+
+    A fetch first asks the league's circuit breaker; while it is open the last-known-good
+    result for the same query is served (and flagged stale) without touching ESPN. Otherwise
+    identical concurrent fetches are coalesced, and the one that runs takes a token from the
+    global and per-league buckets and retries transient errors with jittered backoff. If it
+    still fails the breaker counts it and callers fall back to last-known-good data; with
+    nothing to fall back to the error propagates and services return their usual defaults.
+    """
+
+    def __init__(self):
+        self.global_bucket = TokenBucket(
+            _setting('ESPN_RATE_LIMIT', DEFAULT_GLOBAL_RATE),
+            _setting('ESPN_RATE_BURST', DEFAULT_GLOBAL_BURST)
+        )
+        self.league_rate = _setting('ESPN_LEAGUE_RATE_LIMIT', DEFAULT_LEAGUE_RATE)
+        self.league_burst = _setting('ESPN_LEAGUE_RATE_BURST', DEFAULT_LEAGUE_BURST)
+        self.rate_limit_wait = _setting('ESPN_RATE_LIMIT_WAIT', DEFAULT_RATE_LIMIT_WAIT)
+        self.max_retries = _setting('ESPN_MAX_RETRIES', DEFAULT_MAX_RETRIES)
+        self.breaker_failures = _setting('ESPN_BREAKER_FAILURES', DEFAULT_BREAKER_FAILURES)
+        self.breaker_reset = _setting('ESPN_BREAKER_RESET', DEFAULT_BREAKER_RESET)
+        self.stale_max_age = _setting('ESPN_STALE_MAX_AGE', DEFAULT_STALE_MAX_AGE)
+
+        self._lock = threading.Lock()
+        self._league_buckets: Dict[int, TokenBucket] = {}
+        self._breakers: Dict[int, CircuitBreaker] = {}
+        self._last_good: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._stats = {"fetches": 0, "retries": 0, "failures": 0, "rate_limited": 0, "short_circuited": 0, "stale_served": 0}
+
+    def _league_bucket(self, league_id: int) -> TokenBucket:
+        with self._lock:
+            if league_id not in self._league_buckets:
+                self._league_buckets[league_id] = TokenBucket(self.league_rate, self.league_burst)
+            return self._league_buckets[league_id]
+
+    def _buckets(self, league_id: int) -> Tuple[TokenBucket, TokenBucket]:
+        """Buckets a fetch for this league draws from, global first"""
+        return self.global_bucket, self._league_bucket(league_id)
+
+    def breaker(self, league_id: int) -> CircuitBreaker:
+        with self._lock:
+            if league_id not in self._breakers:
+                self._breakers[league_id] = CircuitBreaker(self.breaker_failures, self.breaker_reset)
+            return self._breakers[league_id]
+
+    def call(self, key: Tuple, league_id: int, fn: Callable[[], Any]) -> Any:
+        """
+        Run a blocking ESPN fetch through the breaker, single-flight, rate limits and retries
+
+        Args:
+            key: Query identity, endpoint name first (also the single-flight key)
+            league_id: League the fetch counts against
+            fn: Blocking fetch
+
+        Returns:
+            Fresh result, or the last-known-good result when ESPN is unavailable
+        """
+        breaker = self.breaker(league_id)
+        allowed, probe = breaker.allow()
+        if not allowed:
+            self._count("short_circuited")
+            return self._fallback(key, CircuitOpenError(f"ESPN circuit open for league {league_id}"))
+
+        try:
+            result = espn_single_flight.do(key, lambda: self._execute(breaker, league_id, fn))
+        except Exception as e:
+            return self._fallback(key, e)
+        finally:
+            if probe:
+                breaker.release_probe()
+        self._remember(key, result)
+        return result
+
+    async def call_async(self, key: Tuple, league_id: int, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async call(); fn is a coroutine factory"""
+        breaker = self.breaker(league_id)
+        allowed, probe = breaker.allow()
+        if not allowed:
+            self._count("short_circuited")
+            return self._fallback(key, CircuitOpenError(f"ESPN circuit open for league {league_id}"))
+
+        try:
+            result = await espn_single_flight.do_async(key, lambda: self._execute_async(breaker, league_id, fn))
+        except Exception as e:
+            return self._fallback(key, e)
+        finally:
+            if probe:
+                breaker.release_probe()
+        self._remember(key, result)
+        return result
+
+    def _execute(self, breaker: CircuitBreaker, league_id: int, fn: Callable[[], Any]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            if not acquire_tokens(self._buckets(league_id), self.rate_limit_wait):
+                self._count("rate_limited")
+                raise RateLimitedError(f"ESPN rate limit reached for league {league_id}")
+            try:
+                self._count("fetches")
+                result = fn()
+                breaker.record_success()
+                return result
+            except Exception as e:
+                if not _is_retryable(e):
+                    # Says nothing about ESPN's health: leave the breaker as it was (call() frees a probe)
+                    raise
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    breaker.record_failure()
+                    raise
+                self._count("retries")
+                time.sleep(_backoff(attempt))
+
+    async def _execute_async(self, breaker: CircuitBreaker, league_id: int, fn: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            if not await acquire_tokens_async(self._buckets(league_id), self.rate_limit_wait):
+                self._count("rate_limited")
+                raise RateLimitedError(f"ESPN rate limit reached for league {league_id}")
+            try:
+                self._count("fetches")
+                result = await fn()
+                breaker.record_success()
+                return result
+            except Exception as e:
+                if not _is_retryable(e):
+                    # Says nothing about ESPN's health: leave the breaker as it was (call() frees a probe)
+                    raise
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    breaker.record_failure()
+                    raise
+                self._count("retries")
+                await asyncio.sleep(_backoff(attempt))
+
+    def _remember(self, key: Tuple, result: Any):
+        with self._lock:
+            self._last_good[key] = (result, time.time())
+            self._last_good.move_to_end(key)
+            while len(self._last_good) > LAST_GOOD_MAX_ENTRIES:
+                self._last_good.popitem(last=False)
+
+    def _fallback(self, key: Tuple, error: Exception) -> Any:
+        """Last-known-good result for key, flagged stale on the current request; re-raises error otherwise"""
+        with self._lock:
+            entry = self._last_good.get(key)
+        if entry is None or time.time() - entry[1] > self.stale_max_age or not _is_retryable(error):
+            raise error
+
+        result, fetched_at = entry
+        age = time.time() - fetched_at
+        self._count("stale_served")
+        marker = _stale_marker.get()
+        if marker is not None:
+            marker["age"] = max(marker.get("age", 0.0), age)
+        logger.warning(f"Serving stale ESPN data for {key[0]} ({age:.0f}s old): {error}")
+        return result
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters, bucket levels and breaker states for monitoring"""
+        with self._lock:
+            stats = dict(self._stats)
+            breakers = {str(league_id): breaker.get_status() for league_id, breaker in self._breakers.items()}
+            last_good = len(self._last_good)
+        return {
+            **stats,
+            "breakers": breakers,
+            "global_tokens": round(self.global_bucket.tokens, 2),
+            "last_good_entries": last_good
+        }
+
+# Global ESPN resilience layer
+espn_resilience = ESPNResilience()
@@ -1,32 +1,100 @@
+import asyncio
 from typing import Optional, List, Dict, Any
 from espn_api.football import League
 from app.core.config import settings
 from app.core.database import get_supabase
+from app.services.league_registry import league_registry
+from app.services.espn_snapshot_store import build_league
+from app.services.espn_resilience import espn_resilience
+from app.services.league_model import CompactLeague, get_compact_league
+from app.services.player_index import PlayerIndex, player_index_registry
+from app.services.activity_log import activity_log, action_filter
 import logging
 
 logger = logging.getLogger(__name__)
 
+def matchup_to_dict(matchup, week: Optional[int]) -> Dict[str, Any]:
+    """Response shape for one espn_api Matchup"""
+    return {
+        "week": week,
+        "home_team": {
+            "espn_team_id": matchup.home_team.team_id,
+            "name": matchup.home_team.team_name,
+            "score": matchup.home_score
+        },
+        "away_team": {
+            "espn_team_id": matchup.away_team.team_id,
+            "name": matchup.away_team.team_name,
+            "score": matchup.away_score
+        }
+    }
+
+def box_player_to_dict(player) -> Dict[str, Any]:
+    """Response shape for one espn_api BoxPlayer"""
+    return {
+        "name": player.name,
+        "position": player.position,
+        "slot_position": player.slot_position,
+        "points": player.points,
+        "projected_points": player.projected_points,
+        "pro_opponent": player.pro_opponent,
+        "pro_pos_rank": player.pro_pos_rank
+    }
+
+def box_score_to_dict(box_score, week: int) -> Dict[str, Any]:
+    """Response shape for one espn_api BoxScore"""
+    return {
+        "week": week,
+        "home_team": {
+            "espn_team_id": box_score.home_team.team_id,
+            "name": box_score.home_team.team_name,
+            "score": box_score.home_score,
+            "lineup": [box_player_to_dict(player) for player in box_score.home_lineup]
+        },
+        "away_team": {
+            "espn_team_id": box_score.away_team.team_id,
+            "name": box_score.away_team.team_name,
+            "score": box_score.away_score,
+            "lineup": [box_player_to_dict(player) for player in box_score.away_lineup]
+        }
+    }
+
+def activity_message(actions: List[Dict[str, Any]]) -> str:
+    """One-line summary of an activity entry's actions, e.g. Team A WAIVER ADDED Player ($12)"""
+    parts = []
+    for action in actions:
+        part = " ".join(str(value) for value in (action["team"], action["action"], action["player_name"]) if value)
+        if action.get("bid_amount"):
+            part += f" (${action['bid_amount']})"
+        parts.append(part)
+    return ", ".join(parts)
+
 class ESPNService:
-    def __init__(self):
+    """
+    ESPN league access for one request
+
+    fetch_mode "full" builds (or reuses) the whole League. The partial modes ("scoreboard",
+    "roster", "settings") reuse a League only if one is already built and otherwise fetch
+    just the ESPN views their calls need (see app.services.espn_views).
+    """
+
+    def __init__(self, fetch_mode: str = "full"):
         self.league_id: Optional[int] = None
         self.year: Optional[int] = None
         self.espn_s2: Optional[str] = None
         self.swid: Optional[str] = None
         self.league: Optional[League] = None
+        self.fetch_mode = fetch_mode
+        self.views = None
         self._load_configuration()
     
     def _load_configuration(self):
         """Load ESPN configuration from database"""
         try:
-            supabase = get_supabase()
-            if not supabase:
-                return
-            
-            # Get the most recent league configuration
-            response = supabase.table("leagues").select("*").order("created_at", desc=True).limit(1).execute()
+            # Get the most recent league configuration (cached process-wide)
+            league_data = league_registry.get_active_config()
             
-            if response.data:
-                league_data = response.data[0]
+            if league_data:
                 self.league_id = int(league_data["espn_league_id"])
                 self.year = league_data["season"]
                 
@@ -71,13 +139,17 @@ class ESPNService:
             espn_s2 = getattr(settings, 'ESPN_S2', None) or self.espn_s2
             swid = getattr(settings, 'SWID', None) or self.swid
             
-            self.league = League(
-                league_id=self.league_id,
-                year=self.year,
-                espn_s2=espn_s2,
-                swid=swid,
-                debug=False
-            )
+            # Scoped views serve the partial modes and data the League doesn't hold (other weeks' rosters)
+            from app.services.espn_views import LeagueViews
+            self.views = LeagueViews(self.league_id, self.year, espn_s2, swid)
+            
+            if self.fetch_mode != "full":
+                # Partial modes never pay for a League build; they use one only if it is already warm
+                self.league = league_registry.peek(self.league_id, self.year, espn_s2, swid)
+                return
+            
+            # Shared connection, built once per process and refreshed on a TTL
+            self.league = league_registry.get_league(self.league_id, self.year, espn_s2, swid)
             logger.info(f"ESPN league connection initialized for league {self.league_id}")
         except Exception as e:
             logger.error(f"Failed to initialize ESPN league: {e}")
@@ -92,13 +164,14 @@ class ESPNService:
         
         try:
             # Initialize the league connection
-            self.league = League(
-                league_id=league_id,
-                year=year,
-                espn_s2=espn_s2,
-                swid=swid,
-                debug=False
-            )
+            self.league = build_league(league_id, year, espn_s2, swid)
+            
+            # Share the new connection and drop any cached configuration
+            league_registry.invalidate()
+            league_registry.put(league_id, year, self.league, espn_s2, swid)
+            player_index_registry.invalidate(league_id)
+            from app.services.espn_views import espn_view_cache
+            espn_view_cache.invalidate(league_id)
             
             # Save configuration for future use
             self._save_configuration(league_id, year, espn_s2, swid)
@@ -129,7 +202,7 @@ class ESPNService:
     def get_league_info(self) -> Optional[Dict[str, Any]]:
         """Get basic league information"""
         if not self.league:
-            return None
+            return self._from_views("league info", lambda views: views.league_info(), None)
         
         try:
             settings = self.league.settings
@@ -149,60 +222,35 @@ class ESPNService:
     def get_teams(self) -> List[Dict[str, Any]]:
         """Get all teams in the league"""
         if not self.league:
-            return []
+            return self._from_views("teams", lambda views: views.teams(), [])
         
         try:
-            teams = []
-            for team in self.league.teams:
-                # Get owner name from owners list
-                owner_name = "Unknown"
-                if hasattr(team, 'owners') and team.owners:
-                    owner_name = team.owners[0].get('displayName', 'Unknown')
-                
-                teams.append({
-                    "espn_team_id": team.team_id,
-                    "name": team.team_name,
-                    "owner": owner_name,
-                    "wins": team.wins,
-                    "losses": team.losses,
-                    "ties": team.ties,
-                    "final_standing": team.final_standing,
-                    "points_for": team.points_for,
-                    "points_against": team.points_against
-                })
-            return teams
+            return self.compact_league().teams_to_dicts()
         except Exception as e:
             logger.error(f"Error getting teams: {e}")
             return []
     
+    def compact_league(self) -> Optional[CompactLeague]:
+        """Slotted, array-backed model of the current League, built once per connection"""
+        if not self.league:
+            return None
+        return get_compact_league(self.league)
+    
+    def player_index(self) -> Optional[PlayerIndex]:
+        """Shared player_id lookup for the current league, rebuilt in bulk on a TTL"""
+        if not self.league:
+            return None
+        return player_index_registry.get_index(self.league)
+    
     def get_matchups(self, week: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get matchups for a specific week or current week"""
         if not self.league:
-            return []
+            return self._from_views("matchups", lambda views: views.matchups(week), [])
         
         try:
-            if week is None:
-                # Get current week matchups
-                matchups = self.league.scoreboard()
-            else:
-                matchups = self.league.scoreboard(week)
-            
-            matchup_data = []
-            for matchup in matchups:
-                matchup_data.append({
-                    "week": week,
-                    "home_team": {
-                        "espn_team_id": matchup.home_team.team_id,
-                        "name": matchup.home_team.team_name,
-                        "score": matchup.home_score
-                    },
-                    "away_team": {
-                        "espn_team_id": matchup.away_team.team_id,
-                        "name": matchup.away_team.team_name,
-                        "score": matchup.away_score
-                    }
-                })
-            return matchup_data
+            # week=None gets current week matchups
+            matchups = self.fetch_scoreboard(week)
+            return [matchup_to_dict(matchup, week) for matchup in matchups]
         except Exception as e:
             logger.error(f"Error getting matchups: {e}")
             return []
@@ -213,81 +261,101 @@ class ESPNService:
             return []
         
         try:
-            box_scores = self.league.box_scores(week)
-            box_score_data = []
-            
-            for box_score in box_scores:
-                home_lineup = []
-                away_lineup = []
-                
-                # Process home team lineup
-                for player in box_score.home_lineup:
-                    home_lineup.append({
-                        "name": player.name,
-                        "position": player.position,
-                        "slot_position": player.slot_position,
-                        "points": player.points,
-                        "projected_points": player.projected_points,
-                        "pro_opponent": player.pro_opponent,
-                        "pro_pos_rank": player.pro_pos_rank
-                    })
-                
-                # Process away team lineup
-                for player in box_score.away_lineup:
-                    away_lineup.append({
-                        "name": player.name,
-                        "position": player.position,
-                        "slot_position": player.slot_position,
-                        "points": player.points,
-                        "projected_points": player.projected_points,
-                        "pro_opponent": player.pro_opponent,
-                        "pro_pos_rank": player.pro_pos_rank
-                    })
-                
-                box_score_data.append({
-                    "week": week,
-                    "home_team": {
-                        "espn_team_id": box_score.home_team.team_id,
-                        "name": box_score.home_team.team_name,
-                        "score": box_score.home_score,
-                        "lineup": home_lineup
-                    },
-                    "away_team": {
-                        "espn_team_id": box_score.away_team.team_id,
-                        "name": box_score.away_team.team_name,
-                        "score": box_score.away_score,
-                        "lineup": away_lineup
-                    }
-                })
-            
-            return box_score_data
+            box_scores = self.fetch_box_scores(week)
+            return [box_score_to_dict(box_score, week) for box_score in box_scores]
         except Exception as e:
             logger.error(f"Error getting box scores: {e}")
             return []
     
+    def fetch_scoreboard(self, week: Optional[int] = None) -> List[Any]:
+        """Raw espn_api scoreboard via the resilience layer (coalesced, rate limited, stale on outage)"""
+        key = ("scoreboard", self.league.league_id, self.league.year, week)
+        return espn_resilience.call(key, self.league.league_id, lambda: self.league.scoreboard(week))
+    
+    def fetch_box_scores(self, week: int) -> List[Any]:
+        """Raw espn_api box scores via the resilience layer (coalesced, rate limited, stale on outage)"""
+        key = ("box_scores", self.league.league_id, self.league.year, week)
+        return espn_resilience.call(key, self.league.league_id, lambda: self.league.box_scores(week))
+    
+    def fetch_free_agents(self) -> List[Any]:
+        """Raw espn_api free agents via the resilience layer"""
+        key = ("free_agents", self.league.league_id, self.league.year)
+        return espn_resilience.call(key, self.league.league_id, self.league.free_agents)
+    
+    async def get_matchups_async(self, week: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Async get_matchups that does not block the event loop"""
+        if not self.league:
+            if self.views:
+                return await asyncio.to_thread(self.get_matchups, week)
+            return []
+        
+        try:
+            # Same default as League.scoreboard: the current matchup period, not the scoring week
+            resolved_week = week or self.league.currentMatchupPeriod
+            matchups = await self._get_async_client().get_matchups([resolved_week])
+            return matchups[resolved_week]
+        except Exception as e:
+            logger.error(f"Error getting matchups: {e}")
+            return []
+    
+    async def get_box_scores_async(self, weeks: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Async box scores for several weeks, fetched concurrently"""
+        if not self.league:
+            return {}
+        
+        try:
+            return await self._get_async_client().get_box_scores(weeks)
+        except Exception as e:
+            logger.error(f"Error getting box scores for weeks {weeks}: {e}")
+            return {}
+    
+    async def get_box_score_objects_async(self, weeks: List[int]) -> Dict[int, List[Any]]:
+        """Async raw espn_api BoxScores for several weeks, for compact or streamed serialization"""
+        if not self.league:
+            return {}
+        
+        try:
+            return await self._get_async_client().get_box_score_objects(weeks)
+        except Exception as e:
+            logger.error(f"Error getting box scores for weeks {weeks}: {e}")
+            return {}
+    
+    async def get_kickoffs_async(self, week: int) -> List[Any]:
+        """NFL kickoff times (UTC datetimes) for a scoring period"""
+        if not self.league:
+            return []
+        
+        try:
+            return await self._get_async_client().get_kickoffs(week)
+        except Exception as e:
+            logger.error(f"Error getting kickoffs for week {week}: {e}")
+            return []
+    
+    def _get_async_client(self):
+        """Async ESPN client bound to this service's League"""
+        from app.services.espn_async_client import AsyncESPNClient
+        if getattr(self, '_async_client', None) is None or self._async_client.league is not self.league:
+            self._async_client = AsyncESPNClient(self.league)
+        return self._async_client
+    
+    def _from_views(self, what: str, fetch, default):
+        """Serve a call from scoped ESPN views when this service runs in a partial fetch mode"""
+        if not self.views:
+            return default
+        
+        try:
+            return fetch(self.views)
+        except Exception as e:
+            logger.error(f"Error getting {what} from ESPN views: {e}")
+            return default
+    
     def get_standings(self) -> List[Dict[str, Any]]:
         """Get current league standings"""
         if not self.league:
             return []
         
         try:
-            standings = self.league.standings()
-            standings_data = []
-            
-            for i, team in enumerate(standings):
-                standings_data.append({
-                    "rank": i + 1,
-                    "espn_team_id": team.team_id,
-                    "name": team.team_name,
-                    "wins": team.wins,
-                    "losses": team.losses,
-                    "ties": team.ties,
-                    "points_for": team.points_for,
-                    "points_against": team.points_against,
-                    "final_standing": team.final_standing
-                })
-            
-            return standings_data
+            return self.compact_league().standings_to_dicts()
         except Exception as e:
             logger.error(f"Error getting standings: {e}")
             return []
@@ -318,21 +386,30 @@ class ESPNService:
             logger.error(f"Error getting power rankings: {e}")
             return []
     
-    def get_recent_activity(self, size: int = 25, msg_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get recent league activity (trades, waivers, etc.)"""
+    def get_recent_activity(self, size: int = 25, msg_type: Optional[str] = None, team_id: Optional[int] = None,
+                            week: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Get recent league activity (trades, waivers, etc.) from the incrementally synced activity log"""
         if not self.league:
             return []
         
         try:
-            activities = self.league.recent_activity(size=size, msg_type=msg_type)
+            entries = activity_log.query(self.league, action_filter(msg_type), team_id, week, size, offset)
+            compact = self.compact_league()
             activity_data = []
             
-            for activity in activities:
+            for entry in entries:
+                actions = [{
+                    **action,
+                    "team": compact.team_name(action["team_id"]) if action["team_id"] is not None else None
+                } for action in entry["actions"]]
                 activity_data.append({
-                    "date": activity.date,
-                    "message": activity.message,
-                    "msg_type": activity.msg_type,
-                    "team": activity.team.team_name if activity.team else None
+                    "id": entry["topic_id"],
+                    "date": entry["date"],
+                    "week": entry["week"],
+                    "message": activity_message(actions),
+                    "msg_type": actions[0]["action"] if actions else None,
+                    "team": actions[0]["team"] if actions else None,
+                    "actions": actions
                 })
             
             return activity_data
@@ -340,34 +417,14 @@ class ESPNService:
             logger.error(f"Error getting recent activity: {e}")
             return []
     
-    def get_team_roster(self, team_id: int) -> List[Dict[str, Any]]:
-        """Get roster for a specific team"""
-        if not self.league:
-            return []
+    def get_team_roster(self, team_id: int, week: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get roster for a specific team, with points and projections for a scoring week (defaults to current week)"""
+        if not self.league or (week and week != self.league.current_week):
+            # The League only holds current-week stats; other weeks come from that week's mRoster
+            return self._from_views("team roster", lambda views: views.roster(team_id, week), [])
         
         try:
-            # Find the team
-            team = None
-            for t in self.league.teams:
-                if t.team_id == team_id:
-                    team = t
-                    break
-            
-            if not team:
-                return []
-            
-            roster_data = []
-            for player in team.roster:
-                roster_data.append({
-                    "name": player.name,
-                    "position": player.position,
-                    "points": player.points,
-                    "projected_points": player.projected_points,
-                    "pro_opponent": player.pro_opponent,
-                    "pro_pos_rank": player.pro_pos_rank
-                })
-            
-            return roster_data
+            return self.compact_league().roster_to_dicts(team_id)
         except Exception as e:
             logger.error(f"Error getting team roster: {e}")
             return []
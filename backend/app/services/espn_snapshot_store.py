@@ -0,0 +1,188 @@
+"""
+ESPN Snapshot Store
+Records raw ESPN API responses to compressed files and replays them for offline, deterministic runs
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional, List
+from espn_api.football import League
+from espn_api.requests.espn_requests import EspnFantasyRequests
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Snapshot modes: off (live ESPN), record (live ESPN, responses saved), replay (saved responses only)
+SNAPSHOT_MODES = ("off", "record", "replay")
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "snapshots", "espn")
+
+class SnapshotMissError(KeyError):
+    """Replay mode was asked for a response that was never recorded"""
+
+class EspnSnapshotStore:
+    """Gzipped JSON responses laid out as <root>/<league_id>/<year>/<endpoint>-<request hash>.json.gz"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or getattr(settings, 'ESPN_SNAPSHOT_DIR', None) or DEFAULT_SNAPSHOT_DIR
+
+    @staticmethod
+    def request_key(channel: str, params: Optional[dict], headers: Optional[dict], extend: str) -> str:
+        """Stable name for one request: which endpoint it hit plus a hash of everything that shapes the response"""
+        view = (params or {}).get('view', 'data')
+        view = '+'.join(view) if isinstance(view, list) else str(view)
+        endpoint = f"{channel}{extend.replace('/', '_')}-{view}"
+        payload = json.dumps([channel, extend, params, headers], sort_keys=True, default=str)
+        return f"{endpoint}-{hashlib.sha1(payload.encode()).hexdigest()[:16]}"
+
+    def _path(self, league_id: int, year: int, key: str) -> str:
+        return os.path.join(self.root, str(league_id), str(year), f"{key}.json.gz")
+
+    def save(self, league_id: int, year: int, key: str, response: Any):
+        """Write one response, replacing any earlier recording of the same request"""
+        path = self._path(league_id, year, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(response, f)
+        os.replace(tmp_path, path)
+
+    def load(self, league_id: int, year: int, key: str) -> Any:
+        """Read one recorded response"""
+        path = self._path(league_id, year, key)
+        if not os.path.exists(path):
+            raise SnapshotMissError(f"No ESPN snapshot for league {league_id}, year {year}: {key}")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_snapshots(self, league_id: int, year: int) -> List[str]:
+        """Recorded request keys for a league season"""
+        directory = os.path.join(self.root, str(league_id), str(year))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".json.gz")] for name in os.listdir(directory) if name.endswith(".json.gz"))
+
+class RecordingEspnRequests(EspnFantasyRequests):
+    """EspnFantasyRequests that saves every response it receives"""
+
+    def __init__(self, store: EspnSnapshotStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def _record(self, channel: str, params: Optional[dict], headers: Optional[dict], extend: str, response: Any) -> Any:
+        try:
+            self.store.save(self.league_id, self.year, self.store.request_key(channel, params, headers, extend), response)
+        except Exception as e:
+            logger.warning(f"Could not record ESPN response: {e}")
+        return response
+
+    def league_get(self, params: dict = None, headers: dict = None, extend: str = ''):
+        return self._record("league", params, headers, extend, super().league_get(params=params, headers=headers, extend=extend))
+
+    def get(self, params: dict = None, headers: dict = None, extend: str = ''):
+        return self._record("get", params, headers, extend, super().get(params=params, headers=headers, extend=extend))
+
+    def news_get(self, params: dict = None, headers: dict = None, extend: str = ''):
+        return self._record("news", params, headers, extend, super().news_get(params=params, headers=headers, extend=extend))
+
+class ReplayEspnRequests(EspnFantasyRequests):
+    """EspnFantasyRequests that serves recorded responses and never touches the network"""
+
+    def __init__(self, store: EspnSnapshotStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def _replay(self, channel: str, params: Optional[dict], headers: Optional[dict], extend: str) -> Any:
+        return self.store.load(self.league_id, self.year, self.store.request_key(channel, params, headers, extend))
+
+    def league_get(self, params: dict = None, headers: dict = None, extend: str = ''):
+        return self._replay("league", params, headers, extend)
+
+    def get(self, params: dict = None, headers: dict = None, extend: str = ''):
+        return self._replay("get", params, headers, extend)
+
+    def news_get(self, params: dict = None, headers: dict = None, extend: str = ''):
+        return self._replay("news", params, headers, extend)
+
+def get_snapshot_mode() -> str:
+    """Configured snapshot mode (ESPN_SNAPSHOT_MODE setting), defaulting to off"""
+    mode = (getattr(settings, 'ESPN_SNAPSHOT_MODE', None) or "off").lower()
+    if mode not in SNAPSHOT_MODES:
+        logger.warning(f"Unknown ESPN_SNAPSHOT_MODE '{mode}', using live ESPN")
+        return "off"
+    return mode
+
+def build_requests(
+    league_id: int,
+    year: int,
+    espn_s2: Optional[str] = None,
+    swid: Optional[str] = None,
+    mode: Optional[str] = None,
+    store: Optional[EspnSnapshotStore] = None
+) -> EspnFantasyRequests:
+    """
+    ESPN request client for one league season, live, recording or replaying depending on mode
+
+    Used on its own to fetch single views without building a whole League.
+
+    Args:
+        league_id: ESPN league ID
+        year: Season year
+        espn_s2: ESPN S2 cookie for private leagues
+        swid: ESPN SWID cookie for private leagues
+        mode: off, record or replay (defaults to the ESPN_SNAPSHOT_MODE setting)
+        store: Snapshot store (defaults to ESPN_SNAPSHOT_DIR)
+
+    Returns:
+        EspnFantasyRequests (or its recording/replaying subclass)
+    """
+    mode = mode or get_snapshot_mode()
+    # Same cookie rule as espn_api's League: private leagues need both
+    cookies = {'espn_s2': espn_s2, 'SWID': swid} if espn_s2 and swid else None
+    if mode == "off":
+        return EspnFantasyRequests(sport="nfl", year=year, league_id=league_id, cookies=cookies)
+
+    requests_class = RecordingEspnRequests if mode == "record" else ReplayEspnRequests
+    return requests_class(store=store or EspnSnapshotStore(), sport="nfl", year=year, league_id=league_id, cookies=cookies)
+
+def build_league(
+    league_id: int,
+    year: int,
+    espn_s2: Optional[str] = None,
+    swid: Optional[str] = None,
+    mode: Optional[str] = None,
+    store: Optional[EspnSnapshotStore] = None
+) -> League:
+    """
+    Build an espn_api League that talks to live ESPN, records, or replays depending on mode
+
+    Args:
+        league_id: ESPN league ID
+        year: Season year
+        espn_s2: ESPN S2 cookie for private leagues
+        swid: ESPN SWID cookie for private leagues
+        mode: off, record or replay (defaults to the ESPN_SNAPSHOT_MODE setting)
+        store: Snapshot store (defaults to ESPN_SNAPSHOT_DIR)
+
+    Returns:
+        Fetched League object
+    """
+    mode = mode or get_snapshot_mode()
+    if mode == "off":
+        return League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid, debug=False)
+
+    league = League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid, fetch_league=False, debug=False)
+    requests_class = RecordingEspnRequests if mode == "record" else ReplayEspnRequests
+    league.espn_request = requests_class(
+        store=store or EspnSnapshotStore(),
+        sport="nfl",
+        year=year,
+        league_id=league_id,
+        cookies=league.espn_request.cookies,
+        logger=league.logger
+    )
+    league.fetch_league()
+    logger.info(f"Built league {league_id} ({year}) in ESPN snapshot {mode} mode")
+    return league
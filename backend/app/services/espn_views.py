@@ -0,0 +1,206 @@
+"""
+ESPN Views
+Scoped ESPN fetches that download only the views a call needs, each cached on its own TTL
+"""
+
+import threading
+import time
+from enum import Enum
+from typing import Dict, Any, List, Optional, Tuple
+from espn_api.football.matchup import Matchup
+from espn_api.football.player import Player
+from espn_api.football.settings import Settings
+from espn_api.football.team import Team
+from espn_api.requests.espn_requests import EspnFantasyRequests
+from app.services.espn_resilience import espn_resilience
+from app.services.espn_snapshot_store import build_requests
+from app.services.espn_service import matchup_to_dict
+from app.services.game_windows import game_calendar
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FetchMode(str, Enum):
+    FULL = "full"              # whole espn_api League (teams, settings, draft, player map)
+    SCOREBOARD = "scoreboard"  # mMatchupScore + mTeam
+    ROSTER = "roster"          # mRoster for one team
+    SETTINGS = "settings"      # mSettings
+
+# Seconds each view is reused; scores follow the game-window odds TTL instead
+VIEW_TTLS = {
+    "mSettings": 3600,
+    "mTeam": 900,
+    "mRoster": 300,
+}
+# Most view responses kept across all leagues
+MAX_VIEW_ENTRIES = 512
+
+class ViewCache:
+    """Thread-safe TTL cache of raw ESPN view responses keyed by (league_id, year, view, params)"""
+
+    def __init__(self, max_entries: int = MAX_VIEW_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def get(self, key: Tuple, ttl: float) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            stats = self._stats.setdefault(key[2], {"hits": 0, "misses": 0})
+            if entry and time.time() - entry[1] <= ttl:
+                stats["hits"] += 1
+                return entry[0]
+            stats["misses"] += 1
+            return None
+
+    def put(self, key: Tuple, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            if len(self._entries) > self.max_entries:
+                # Drop the oldest responses first
+                for old_key, _ in sorted(self._entries.items(), key=lambda item: item[1][1])[:len(self._entries) - self.max_entries]:
+                    del self._entries[old_key]
+
+    def invalidate(self, league_id: Optional[int] = None):
+        with self._lock:
+            for key in list(self._entries):
+                if league_id is None or key[0] == league_id:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "views": {view: dict(stats) for view, stats in self._stats.items()}}
+
+class LeagueViews:
+    """
+    Read one league season piecemeal instead of constructing an espn_api League
+
+    Each method requests only the views it needs and parses them with espn_api's own
+    Team/Matchup/Player classes, so responses have the same shape as the full-League
+    paths in ESPNService. Fetches go through the resilience layer.
+    """
+
+    def __init__(self, league_id: int, year: int, espn_s2: Optional[str] = None, swid: Optional[str] = None,
+                 cache: Optional["ViewCache"] = None):
+        self.league_id = league_id
+        self.year = year
+        self.espn_s2 = espn_s2
+        self.swid = swid
+        self.cache = cache or espn_view_cache
+        self._requests: Optional[EspnFantasyRequests] = None
+
+    @property
+    def requests(self) -> EspnFantasyRequests:
+        if self._requests is None:
+            self._requests = build_requests(self.league_id, self.year, self.espn_s2, self.swid)
+        return self._requests
+
+    def _view(self, view: str, ttl: float, **params) -> Dict[str, Any]:
+        """One view's response, from cache when younger than ttl"""
+        key = (self.league_id, self.year, view, tuple(sorted(params.items())))
+        data = self.cache.get(key, ttl)
+        if data is None:
+            data = espn_resilience.call(
+                (f"view:{view}",) + key, self.league_id,
+                lambda: self.requests.league_get(params={'view': view, **params})
+            )
+            self.cache.put(key, data)
+        return data
+
+    @staticmethod
+    def _current_week(data: Dict[str, Any]) -> int:
+        """Same rule as espn_api's League.current_week, from the status every view carries"""
+        status = data['status']
+        return min(data['scoringPeriodId'], status['finalScoringPeriod'])
+
+    @staticmethod
+    def _current_matchup_period(data: Dict[str, Any]) -> int:
+        """Same value as espn_api's League.currentMatchupPeriod (the default League.scoreboard week)"""
+        return data['status']['currentMatchupPeriod']
+
+    def _teams(self) -> List[Team]:
+        data = self._view("mTeam", VIEW_TTLS["mTeam"])
+        members = data.get('members', [])
+        teams = []
+        for team in data['teams']:
+            owners = [member for member in members if member.get('id') in team.get('owners', [])]
+            teams.append(Team(team, roster={}, schedule=[], year=self.year, owners=owners))
+        return sorted(teams, key=lambda team: team.team_id)
+
+    def league_info(self) -> Dict[str, Any]:
+        """Response shape of ESPNService.get_league_info, from mSettings only"""
+        settings = Settings(self._view("mSettings", VIEW_TTLS["mSettings"])['settings'])
+        return {
+            "league_id": self.league_id,
+            "year": self.year,
+            "name": getattr(settings, 'name', 'Unknown League'),
+            "team_count": getattr(settings, 'team_count', 0),
+            "reg_season_count": getattr(settings, 'reg_season_count', 0),
+            "playoff_team_count": getattr(settings, 'playoff_team_count', 0),
+            "veto_votes_required": getattr(settings, 'veto_votes_required', 0)
+        }
+
+    def teams(self) -> List[Dict[str, Any]]:
+        """Response shape of ESPNService.get_teams, from mTeam only"""
+        return [{
+            "espn_team_id": team.team_id,
+            "name": team.team_name,
+            "owner": team.owners[0].get('displayName', 'Unknown') if team.owners else "Unknown",
+            "wins": team.wins,
+            "losses": team.losses,
+            "ties": team.ties,
+            "final_standing": team.final_standing,
+            "points_for": float(team.points_for),
+            "points_against": float(team.points_against)
+        } for team in self._teams()]
+
+    def matchups(self, week: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Response shape of ESPNService.get_matchups, from mMatchupScore plus the cached mTeam"""
+        data = self._view("mMatchupScore", game_calendar.cache_ttl())
+        matchup_period = week or self._current_matchup_period(data)
+        teams = {team.team_id: team for team in self._teams()}
+
+        matchups = []
+        for entry in data['schedule']:
+            if entry['matchupPeriodId'] != matchup_period:
+                continue
+            matchup = Matchup(entry)
+            if matchup._home_team_id in teams:
+                matchup.home_team = teams[matchup._home_team_id]
+            if matchup._away_team_id in teams:
+                matchup.away_team = teams[matchup._away_team_id]
+            matchups.append(matchup_to_dict(matchup, week))
+        return matchups
+
+    def roster(self, team_id: int, week: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Response shape of ESPNService.get_team_roster, from one team's mRoster for a scoring week"""
+        params = {'forTeamId': team_id}
+        if week:
+            params['scoringPeriodId'] = week
+        data = self._view("mRoster", VIEW_TTLS["mRoster"], **params)
+        current_week = week or self._current_week(data)
+        team = next((team for team in data.get('teams', []) if team['id'] == team_id), None)
+        if not team:
+            return []
+
+        roster = []
+        for entry in team.get('roster', {}).get('entries', []):
+            player = Player(entry, self.year)
+            week_stats = player.stats.get(current_week, {})
+            roster.append({
+                "player_id": player.playerId,
+                "name": player.name,
+                "position": player.position,
+                "lineup_slot": player.lineupSlot,
+                "eligible_slots": list(player.eligibleSlots),
+                "injury_status": player.injuryStatus,
+                "points": float(week_stats.get('points', 0)),
+                "projected_points": float(week_stats.get('projected_points', 0)),
+                "pro_opponent": None,
+                "pro_pos_rank": 0
+            })
+        return roster
+
+# Global view cache shared by every LeagueViews
+espn_view_cache = ViewCache()
@@ -20,7 +20,7 @@ class FAABService:
                 return []
             
             # Get free agents from ESPN
-            free_agents = self.espn_service.league.free_agents()
+            free_agents = self.espn_service.fetch_free_agents()
             
             players_data = []
             for player in free_agents:
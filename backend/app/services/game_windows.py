@@ -0,0 +1,232 @@
+"""
+Game Windows
+NFL game-window calendar that sets how often ESPN is polled and how long odds stay cached
+"""
+
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Dict, Any, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+from espn_api.football import League
+from app.core.config import settings
+from app.services.espn_resilience import espn_resilience
+import logging
+
+logger = logging.getLogger(__name__)
+
+EASTERN = ZoneInfo("America/New_York")
+
+# A window opens shortly before the first kickoff in it and closes once the last game can be over
+WINDOW_LEAD = timedelta(minutes=15)
+GAME_DURATION = timedelta(hours=3, minutes=30)
+# Polling speeds up this long before a window opens (lineups lock, inactives are announced)
+PREGAME_LEAD = timedelta(hours=2)
+# Time after a scoring period's last game can be over before its box scores count as final
+SCORE_SETTLE_DELAY = timedelta(hours=12)
+
+# Standard kickoff slots (weekday, hour, minute in US/Eastern) used until ESPN's pro schedule is loaded
+DEFAULT_KICKOFF_SLOTS = [
+    (3, 20, 15),  # Thursday night
+    (6, 9, 30),   # Sunday international
+    (6, 13, 0),   # Sunday early
+    (6, 16, 5),   # Sunday late
+    (6, 20, 20),  # Sunday night
+    (0, 20, 15),  # Monday night
+]
+
+# Jitter applied to every interval so leagues (and workers) do not poll in lockstep
+INTERVAL_JITTER = 0.1
+
+class PollPhase(str, Enum):
+    LIVE = "live"                # in a window and scores are moving
+    GAME_WINDOW = "game_window"  # in a window, nothing moving yet
+    PREGAME = "pregame"          # a window opens soon
+    IDLE = "idle"                # midweek
+
+# Seconds between polls per phase (idle sleeps until the next pregame, capped)
+DEFAULT_POLL_INTERVALS = {
+    PollPhase.LIVE: 5,
+    PollPhase.GAME_WINDOW: 20,
+    PollPhase.PREGAME: 300,
+    PollPhase.IDLE: 6 * 3600,
+}
+# Minimum idle poll gap, so a missed window start is caught within this long
+MIN_IDLE_INTERVAL = 900
+
+# Odds cache TTL per phase in seconds
+DEFAULT_CACHE_TTLS = {
+    PollPhase.LIVE: 10,
+    PollPhase.GAME_WINDOW: 30,
+    PollPhase.PREGAME: 120,
+    PollPhase.IDLE: 900,
+}
+
+@dataclass(frozen=True)
+class GameWindow:
+    start: datetime
+    end: datetime
+
+class GameWindowCalendar:
+    """
+    Merged game windows for the current NFL week plus the watched league's live state
+
+    Windows come from ESPN kickoff times when the scoreboard watcher has loaded them and
+    from the standard weekly slots otherwise. Everything here is computed in UTC.
+    """
+
+    def __init__(self):
+        self.poll_intervals = {
+            PollPhase.LIVE: getattr(settings, 'SCOREBOARD_LIVE_POLL_INTERVAL', None) or DEFAULT_POLL_INTERVALS[PollPhase.LIVE],
+            PollPhase.GAME_WINDOW: getattr(settings, 'SCOREBOARD_WINDOW_POLL_INTERVAL', None) or DEFAULT_POLL_INTERVALS[PollPhase.GAME_WINDOW],
+            PollPhase.PREGAME: getattr(settings, 'SCOREBOARD_PREGAME_POLL_INTERVAL', None) or DEFAULT_POLL_INTERVALS[PollPhase.PREGAME],
+            PollPhase.IDLE: getattr(settings, 'SCOREBOARD_IDLE_MAX_INTERVAL', None) or DEFAULT_POLL_INTERVALS[PollPhase.IDLE],
+        }
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS)
+        self.live = False
+        self.source = "default"
+        self._windows: List[GameWindow] = []
+        self._week_ends: Dict[int, List[datetime]] = {}
+        self._lock = threading.Lock()
+
+    def set_kickoffs(self, kickoffs: Iterable[datetime]):
+        """Replace the windows with ones built from ESPN kickoff times"""
+        windows = self._merge(kickoffs)
+        if not windows:
+            return
+        with self._lock:
+            self._windows = windows
+            self.source = "espn"
+        logger.info(f"Game windows loaded from ESPN: {len(windows)} windows")
+
+    def set_live(self, live: bool):
+        """Whether the watched league's scores moved on the last poll"""
+        self.live = live
+
+    def _merge(self, kickoffs: Iterable[datetime]) -> List[GameWindow]:
+        windows: List[GameWindow] = []
+        for kickoff in sorted(k.astimezone(timezone.utc) for k in kickoffs):
+            start, end = kickoff - WINDOW_LEAD, kickoff + GAME_DURATION
+            if windows and start <= windows[-1].end:
+                windows[-1] = GameWindow(windows[-1].start, max(windows[-1].end, end))
+            else:
+                windows.append(GameWindow(start, end))
+        return windows
+
+    def _default_windows(self, now: datetime) -> List[GameWindow]:
+        """Standard slots for last week, this week and next week around now"""
+        local = now.astimezone(EASTERN)
+        monday = (local - timedelta(days=local.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        kickoffs = []
+        for week_offset in (-1, 0, 1):
+            for weekday, hour, minute in DEFAULT_KICKOFF_SLOTS:
+                day = monday + timedelta(days=7 * week_offset + weekday)
+                kickoffs.append(datetime(day.year, day.month, day.day, hour, minute, tzinfo=EASTERN))
+        return self._merge(kickoffs)
+
+    def windows(self, now: Optional[datetime] = None) -> List[GameWindow]:
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            windows = list(self._windows)
+        # Fall back to the standard slots once ESPN's windows are all in the past
+        if not windows or windows[-1].end < now:
+            return self._default_windows(now)
+        return windows
+
+    def phase(self, now: Optional[datetime] = None) -> PollPhase:
+        """Current polling phase"""
+        now = now or datetime.now(timezone.utc)
+        for window in self.windows(now):
+            if window.start <= now <= window.end:
+                return PollPhase.LIVE if self.live else PollPhase.GAME_WINDOW
+            if now < window.start <= now + PREGAME_LEAD:
+                return PollPhase.PREGAME
+        return PollPhase.IDLE
+
+    def next_window_start(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        now = now or datetime.now(timezone.utc)
+        upcoming = [window.start for window in self.windows(now) if window.start > now]
+        return min(upcoming) if upcoming else None
+
+    def poll_interval(self, now: Optional[datetime] = None) -> float:
+        """
+        Seconds until the next poll, with jitter
+
+        Idle periods sleep until pregame polling should begin (at least MIN_IDLE_INTERVAL,
+        at most the idle cap), so midweek costs a handful of calls a day.
+        """
+        now = now or datetime.now(timezone.utc)
+        phase = self.phase(now)
+        if phase == PollPhase.IDLE:
+            next_start = self.next_window_start(now)
+            until_pregame = (next_start - PREGAME_LEAD - now).total_seconds() if next_start else self.poll_intervals[PollPhase.IDLE]
+            interval = min(max(until_pregame, MIN_IDLE_INTERVAL), self.poll_intervals[PollPhase.IDLE])
+        else:
+            interval = self.poll_intervals[phase]
+        return interval * (1 + INTERVAL_JITTER * (2 * random.random() - 1))
+
+    def cache_ttl(self, now: Optional[datetime] = None) -> int:
+        """How long odds may be cached in the current phase"""
+        return self.cache_ttls[self.phase(now)]
+
+    def week_ends(self, league: League) -> List[datetime]:
+        """When each scoring period's last game can be over, from ESPN's pro schedule (loaded once per season)"""
+        with self._lock:
+            cached = self._week_ends.get(league.year)
+        if cached is not None:
+            return cached
+
+        data = espn_resilience.call(("pro_schedule", league.year), league.league_id, league.espn_request.get_pro_schedule)
+        last_kickoffs: Dict[int, int] = {}
+        for team in data['settings']['proTeams']:
+            for period, games in team.get('proGamesByScoringPeriod', {}).items():
+                for game in games:
+                    last_kickoffs[int(period)] = max(last_kickoffs.get(int(period), 0), game['date'])
+        week_ends = [
+            datetime.fromtimestamp(last_kickoffs[period] / 1000, timezone.utc) + GAME_DURATION
+            for period in sorted(last_kickoffs)
+        ]
+        with self._lock:
+            self._week_ends[league.year] = week_ends
+        return week_ends
+
+    def last_final_week(self, league: League, now: Optional[datetime] = None) -> int:
+        """
+        Latest scoring period whose games have all ended and settled
+
+        Args:
+            league: Fetched espn_api League
+            now: Time to evaluate at (defaults to now)
+
+        Returns:
+            Week number, capped below the league's current week; 0 if none or the schedule is unavailable
+        """
+        now = now or datetime.now(timezone.utc)
+        try:
+            week_ends = self.week_ends(league)
+        except Exception as e:
+            logger.error(f"Error loading pro schedule for league {league.league_id}: {e}")
+            return 0
+        finished = sum(1 for end in week_ends if end + SCORE_SETTLE_DELAY <= now)
+        return min(finished, league.current_week - 1)
+
+    def get_status(self) -> Dict[str, Any]:
+        now = datetime.now(timezone.utc)
+        next_start = self.next_window_start(now)
+        return {
+            'phase': self.phase(now).value,
+            'live': self.live,
+            'source': self.source,
+            'next_window_start': next_start.isoformat() if next_start else None,
+            'poll_intervals': {phase.value: seconds for phase, seconds in self.poll_intervals.items()},
+            'cache_ttl': self.cache_ttl(now)
+        }
+
+def league_phase_offset(league_id: int, interval: float) -> float:
+    """Stable per-league delay within one interval, so many leagues' polls are spread out instead of aligned"""
+    return (league_id * 2654435761 % 2 ** 32) / 2 ** 32 * interval
+
+# Global game window calendar instance
+game_calendar = GameWindowCalendar()
@@ -0,0 +1,152 @@
+"""
+League History Ingestion
+Pulls every past season of a league from ESPN into the league history store, concurrently and resumably
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+from espn_api.football import League
+from app.services.activity_log import ActivityLog, activity_log, FIRST_ACTIVITY_SEASON
+from app.services.espn_snapshot_store import build_league
+from app.services.league_history_store import LeagueHistoryStore, get_history_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seasons ingested at once
+DEFAULT_SEASON_WORKERS = 4
+# espn_api only supports box scores from this season on; older seasons fall back to the scoreboard
+FIRST_BOX_SCORE_SEASON = 2019
+
+class LeagueHistoryIngestion:
+    """
+    Ingest a league's seasons step by step: season (teams and rosters), each week, activity
+
+    Every step commits on its own and is recorded in ingest_progress, so a rerun skips
+    what already landed. A past season is marked complete once all its steps are in and is
+    never fetched again; the live season only stores finalized weeks and is revisited on
+    each run. Activity goes through the incremental ActivityLog, the same log the live
+    endpoints read, so a revisit only fetches topics newer than the stored ones.
+    """
+
+    def __init__(self, league_id: int, espn_s2: Optional[str] = None, swid: Optional[str] = None,
+                 store: Optional[LeagueHistoryStore] = None):
+        self.league_id = league_id
+        self.espn_s2 = espn_s2
+        self.swid = swid
+        self.store = store or get_history_store()
+        # Share the global log (and its per-season sync locks) unless writing to another store
+        self.activity_log = activity_log if store is None else ActivityLog(store)
+
+    def discover_seasons(self, latest_year: int) -> List[int]:
+        """The latest season plus every previous season ESPN lists for the league"""
+        league = build_league(self.league_id, latest_year, self.espn_s2, self.swid)
+        return sorted(set(getattr(league, 'previousSeasons', [])) | {latest_year})
+
+    def ingest(self, years: List[int], workers: int = DEFAULT_SEASON_WORKERS, force: bool = False) -> Dict[int, Dict[str, Any]]:
+        """
+        Ingest several seasons concurrently
+
+        Args:
+            years: Seasons to ingest
+            workers: Seasons processed at once
+            force: Re-ingest seasons already marked complete
+
+        Returns:
+            Dictionary mapping each year to its ingestion summary
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="history-ingest") as executor:
+            futures = {executor.submit(self.ingest_season, year, force): year for year in years}
+            for future in as_completed(futures):
+                year = futures[future]
+                try:
+                    results[year] = future.result()
+                except Exception as e:
+                    logger.error(f"Error ingesting league {self.league_id} season {year}: {e}")
+                    results[year] = {"year": year, "status": "failed", "error": str(e)}
+        return dict(sorted(results.items()))
+
+    def ingest_season(self, year: int, force: bool = False) -> Dict[str, Any]:
+        """Ingest one season, skipping steps that already completed"""
+        if not force and self.store.is_season_complete(self.league_id, year):
+            return {"year": year, "status": "skipped", "steps": 0}
+
+        done = set() if force else self.store.completed_steps(self.league_id, year)
+        league = build_league(self.league_id, year, self.espn_s2, self.swid)
+
+        final_week = league.finalScoringPeriod
+        # Past seasons report current_week as their final week, so only the live season is partial
+        last_finalized = final_week if league.current_week >= final_week else league.current_week - 1
+        steps = 0
+
+        if "season" not in done or league.current_week < final_week:
+            self._ingest_season_row(league, final_week)
+            steps += 1
+
+        for week in range(1, last_finalized + 1):
+            if f"week:{week}" not in done:
+                self._ingest_week(league, week)
+                steps += 1
+
+        season_over = last_finalized >= final_week
+        if year >= FIRST_ACTIVITY_SEASON and ("activity" not in done or not season_over):
+            self._ingest_activity(league)
+            steps += 1
+
+        if season_over:
+            self.store.mark_season_complete(self.league_id, year)
+
+        logger.info(f"Ingested league {self.league_id} season {year}: {steps} steps")
+        return {"year": year, "status": "complete" if season_over else "partial", "steps": steps, "weeks": last_finalized}
+
+    def _ingest_season_row(self, league: League, final_week: int):
+        teams, rosters = [], []
+        for team in league.teams:
+            owner = team.owners[0].get('displayName', 'Unknown') if getattr(team, 'owners', None) else "Unknown"
+            teams.append((
+                self.league_id, league.year, team.team_id, team.team_name, owner, team.wins, team.losses,
+                team.ties, team.points_for, team.points_against, team.final_standing
+            ))
+            for player in team.roster:
+                rosters.append((
+                    self.league_id, league.year, team.team_id, player.playerId, player.name,
+                    getattr(player, 'position', None), getattr(player, 'acquisitionType', None)
+                ))
+        self.store.save_season(
+            self.league_id, league.year, getattr(league.settings, 'name', None), len(league.teams), final_week, teams, rosters
+        )
+
+    def _ingest_week(self, league: League, week: int):
+        scores, lineups = [], []
+        if league.year >= FIRST_BOX_SCORE_SEASON:
+            for box_score in league.box_scores(week):
+                for side, other in (("home", "away"), ("away", "home")):
+                    team = getattr(box_score, f"{side}_team")
+                    if not getattr(team, 'team_id', None):
+                        continue
+                    opponent = getattr(getattr(box_score, f"{other}_team"), 'team_id', None)
+                    scores.append((
+                        self.league_id, league.year, week, team.team_id, opponent, side == "home",
+                        getattr(box_score, f"{side}_score"), getattr(box_score, f"{side}_projected")
+                    ))
+                    for player in getattr(box_score, f"{side}_lineup"):
+                        lineups.append((
+                            self.league_id, league.year, week, team.team_id, player.playerId, player.name,
+                            player.position, player.slot_position, player.points, player.projected_points
+                        ))
+        else:
+            for matchup in league.scoreboard(week):
+                home = getattr(matchup, 'home_team', None)
+                away = getattr(matchup, 'away_team', None)
+                for team, opponent, score, is_home in ((home, away, matchup.home_score, True), (away, home, matchup.away_score, False)):
+                    if getattr(team, 'team_id', None):
+                        scores.append((
+                            self.league_id, league.year, week, team.team_id, getattr(opponent, 'team_id', None),
+                            is_home, score, None
+                        ))
+        self.store.save_week(self.league_id, league.year, week, scores, lineups)
+
+    def _ingest_activity(self, league: League):
+        self.activity_log.sync(league, force=True)
+        self.store.mark_activity_synced(self.league_id, league.year)
@@ -0,0 +1,386 @@
+"""
+League History Store
+Embedded SQLite analytics database holding every ingested season's teams, weekly scores, lineups and activity,
+plus the live season's incrementally synced activity log
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "league_history.sqlite3")
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS seasons (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        name TEXT,
+        team_count INTEGER,
+        final_week INTEGER,
+        complete INTEGER NOT NULL DEFAULT 0,
+        ingested_at TEXT,
+        PRIMARY KEY (league_id, year)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ingest_progress (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        step TEXT NOT NULL,
+        completed_at TEXT NOT NULL,
+        PRIMARY KEY (league_id, year, step)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS teams (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        name TEXT,
+        owner TEXT,
+        wins INTEGER,
+        losses INTEGER,
+        ties INTEGER,
+        points_for REAL,
+        points_against REAL,
+        final_standing INTEGER,
+        PRIMARY KEY (league_id, year, team_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rosters (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        name TEXT,
+        position TEXT,
+        acquisition_type TEXT,
+        PRIMARY KEY (league_id, year, team_id, player_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS weekly_scores (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        week INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        opponent_id INTEGER,
+        is_home INTEGER NOT NULL,
+        score REAL,
+        projected REAL,
+        PRIMARY KEY (league_id, year, week, team_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS lineups (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        week INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        player_id INTEGER NOT NULL,
+        name TEXT,
+        position TEXT,
+        slot_position TEXT,
+        points REAL,
+        projected_points REAL,
+        PRIMARY KEY (league_id, year, week, team_id, player_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS activity_log (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        topic_id TEXT NOT NULL,
+        date INTEGER NOT NULL,
+        week INTEGER,
+        PRIMARY KEY (league_id, topic_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS activity_log_actions (
+        league_id INTEGER NOT NULL,
+        topic_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        team_id INTEGER,
+        action TEXT,
+        player_id INTEGER,
+        player_name TEXT,
+        bid_amount INTEGER,
+        PRIMARY KEY (league_id, topic_id, seq)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS settled_weeks (
+        league_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        week INTEGER NOT NULL,
+        settled_at TEXT NOT NULL,
+        PRIMARY KEY (league_id, year, week)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_weekly_scores_team ON weekly_scores (league_id, team_id, year, week)",
+    "CREATE INDEX IF NOT EXISTS idx_weekly_scores_opponent ON weekly_scores (league_id, team_id, opponent_id)",
+    "CREATE INDEX IF NOT EXISTS idx_lineups_player ON lineups (league_id, player_id)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_log_date ON activity_log (league_id, year, date)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_log_actions_team ON activity_log_actions (league_id, team_id)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_log_actions_action ON activity_log_actions (league_id, action)"
+]
+
+class LeagueHistoryStore:
+    """
+    SQLite store for multi-season league history
+
+    The database runs in WAL mode so analytic reads never wait on an ingestion writer.
+    Each thread gets its own connection; every write helper commits one season step in a
+    single transaction, which is what lets an interrupted ingestion resume cleanly.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or getattr(settings, 'LEAGUE_HISTORY_DB', None) or DEFAULT_HISTORY_DB
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.transaction() as conn:
+            for statement in SCHEMA_SQL:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self._connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._connection().execute(sql, tuple(params)).fetchall()]
+
+    # Ingestion progress
+
+    def completed_steps(self, league_id: int, year: int) -> set:
+        rows = self._query("SELECT step FROM ingest_progress WHERE league_id = ? AND year = ?", (league_id, year))
+        return {row['step'] for row in rows}
+
+    def is_season_complete(self, league_id: int, year: int) -> bool:
+        rows = self._query("SELECT complete FROM seasons WHERE league_id = ? AND year = ?", (league_id, year))
+        return bool(rows and rows[0]['complete'])
+
+    def _mark_step(self, conn: sqlite3.Connection, league_id: int, year: int, step: str):
+        conn.execute(
+            "INSERT OR REPLACE INTO ingest_progress (league_id, year, step, completed_at) VALUES (?, ?, ?, ?)",
+            (league_id, year, step, datetime.utcnow().isoformat())
+        )
+
+    # Writes (each is one step in one transaction)
+
+    def save_season(self, league_id: int, year: int, name: str, team_count: int, final_week: int,
+                    teams: List[Tuple], rosters: List[Tuple]):
+        """Season row, final team records and end-of-season rosters"""
+        with self.transaction() as conn:
+            conn.execute(
+                """INSERT INTO seasons (league_id, year, name, team_count, final_week, complete, ingested_at)
+                   VALUES (?, ?, ?, ?, ?, 0, ?)
+                   ON CONFLICT (league_id, year) DO UPDATE SET name = excluded.name, team_count = excluded.team_count,
+                   final_week = excluded.final_week, ingested_at = excluded.ingested_at""",
+                (league_id, year, name, team_count, final_week, datetime.utcnow().isoformat())
+            )
+            conn.execute("DELETE FROM teams WHERE league_id = ? AND year = ?", (league_id, year))
+            conn.execute("DELETE FROM rosters WHERE league_id = ? AND year = ?", (league_id, year))
+            conn.executemany("INSERT INTO teams VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", teams)
+            conn.executemany("INSERT INTO rosters VALUES (?, ?, ?, ?, ?, ?, ?)", rosters)
+            self._mark_step(conn, league_id, year, "season")
+
+    def save_week(self, league_id: int, year: int, week: int, scores: List[Tuple], lineups: List[Tuple]):
+        """One week's team scores and lineups"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM weekly_scores WHERE league_id = ? AND year = ? AND week = ?", (league_id, year, week))
+            conn.execute("DELETE FROM lineups WHERE league_id = ? AND year = ? AND week = ?", (league_id, year, week))
+            conn.executemany("INSERT INTO weekly_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", scores)
+            conn.executemany("INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", lineups)
+            self._mark_step(conn, league_id, year, f"week:{week}")
+
+    def mark_activity_synced(self, league_id: int, year: int):
+        """Record that a season's activity is in the activity log (written by ActivityLog.sync)"""
+        with self.transaction() as conn:
+            self._mark_step(conn, league_id, year, "activity")
+
+    def mark_season_complete(self, league_id: int, year: int):
+        with self.transaction() as conn:
+            conn.execute("UPDATE seasons SET complete = 1 WHERE league_id = ? AND year = ?", (league_id, year))
+
+    # Activity log (appended incrementally, never rewritten)
+
+    def known_activity_topics(self, league_id: int, topic_ids: List[str]) -> set:
+        """Which of these ESPN topic IDs are already in the activity log"""
+        if not topic_ids:
+            return set()
+        placeholders = ", ".join("?" * len(topic_ids))
+        rows = self._query(
+            f"SELECT topic_id FROM activity_log WHERE league_id = ? AND topic_id IN ({placeholders})",
+            [league_id, *topic_ids]
+        )
+        return {row['topic_id'] for row in rows}
+
+    def append_activity_log(self, league_id: int, topics: List[Tuple], actions: List[Tuple]):
+        """New activity topics and their actions, in one transaction; already-stored topics are ignored"""
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO activity_log VALUES (?, ?, ?, ?, ?)", topics)
+            conn.executemany("INSERT OR IGNORE INTO activity_log_actions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", actions)
+
+    def query_activity_log(self, league_id: int, year: Optional[int] = None, action: Optional[str] = None,
+                           team_id: Optional[int] = None, week: Optional[int] = None,
+                           limit: int = 25, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Activity log entries, newest first, each with its actions
+
+        Args:
+            league_id: ESPN league ID
+            year: Only this season
+            action: Only entries with an action of this type (e.g. TRADED, WAIVER ADDED)
+            team_id: Only entries involving this team
+            week: Only entries in this scoring period
+            limit: Page size
+            offset: Entries to skip
+
+        Returns:
+            List of {topic_id, year, date, week, actions: [...]}
+        """
+        sql = "SELECT topic_id, year, date, week FROM activity_log l WHERE league_id = ?"
+        params: List[Any] = [league_id]
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(year)
+        if week is not None:
+            sql += " AND week = ?"
+            params.append(week)
+        if action is not None or team_id is not None:
+            sql += " AND EXISTS (SELECT 1 FROM activity_log_actions a WHERE a.league_id = l.league_id AND a.topic_id = l.topic_id"
+            if action is not None:
+                sql += " AND a.action = ?"
+                params.append(action)
+            if team_id is not None:
+                sql += " AND a.team_id = ?"
+                params.append(team_id)
+            sql += ")"
+        sql += " ORDER BY date DESC, topic_id DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        entries = self._query(sql, params)
+        if not entries:
+            return entries
+
+        placeholders = ", ".join("?" * len(entries))
+        rows = self._query(
+            f"""SELECT topic_id, team_id, action, player_id, player_name, bid_amount FROM activity_log_actions
+                WHERE league_id = ? AND topic_id IN ({placeholders}) ORDER BY topic_id, seq""",
+            [league_id, *(entry['topic_id'] for entry in entries)]
+        )
+        actions: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            actions.setdefault(row.pop('topic_id'), []).append(row)
+        for entry in entries:
+            entry['actions'] = actions.get(entry['topic_id'], [])
+        return entries
+
+    # Settlement (weeks whose final results the scoreboard watcher has published)
+
+    def settled_weeks(self, league_id: int, year: int) -> set:
+        rows = self._query("SELECT week FROM settled_weeks WHERE league_id = ? AND year = ?", (league_id, year))
+        return {row['week'] for row in rows}
+
+    def mark_week_settled(self, league_id: int, year: int, week: int):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO settled_weeks (league_id, year, week, settled_at) VALUES (?, ?, ?, ?)",
+                (league_id, year, week, datetime.utcnow().isoformat())
+            )
+
+    # Analytics
+
+    def get_seasons(self, league_id: int) -> List[Dict[str, Any]]:
+        """Ingested seasons with their champion (final standing 1)"""
+        return self._query(
+            """SELECT s.year, s.name, s.team_count, s.final_week, s.complete, s.ingested_at,
+                      t.team_id AS champion_team_id, t.name AS champion_name
+               FROM seasons s
+               LEFT JOIN teams t ON t.league_id = s.league_id AND t.year = s.year AND t.final_standing = 1
+               WHERE s.league_id = ? ORDER BY s.year""",
+            (league_id,)
+        )
+
+    def get_rivalry(self, league_id: int, team_a: int, team_b: int) -> Dict[str, Any]:
+        """All-time head-to-head record between two team IDs"""
+        games = self._query(
+            """SELECT a.year, a.week, a.score AS team_a_score, b.score AS team_b_score
+               FROM weekly_scores a
+               JOIN weekly_scores b ON b.league_id = a.league_id AND b.year = a.year AND b.week = a.week AND b.team_id = a.opponent_id
+               WHERE a.league_id = ? AND a.team_id = ? AND a.opponent_id = ?
+               ORDER BY a.year, a.week""",
+            (league_id, team_a, team_b)
+        )
+        wins = sum(1 for g in games if g['team_a_score'] > g['team_b_score'])
+        losses = sum(1 for g in games if g['team_a_score'] < g['team_b_score'])
+        return {
+            "team_a": team_a,
+            "team_b": team_b,
+            "games": len(games),
+            "team_a_wins": wins,
+            "team_b_wins": losses,
+            "ties": len(games) - wins - losses,
+            "history": games
+        }
+
+    def get_team_history(self, league_id: int, team_id: int) -> List[Dict[str, Any]]:
+        """A team's record, points and finish in every ingested season"""
+        return self._query(
+            """SELECT t.year, t.name, t.owner, t.wins, t.losses, t.ties, t.points_for, t.points_against, t.final_standing,
+                      AVG(w.score) AS avg_score, MAX(w.score) AS best_score
+               FROM teams t
+               LEFT JOIN weekly_scores w ON w.league_id = t.league_id AND w.year = t.year AND w.team_id = t.team_id
+               WHERE t.league_id = ? AND t.team_id = ?
+               GROUP BY t.year ORDER BY t.year""",
+            (league_id, team_id)
+        )
+
+    def get_bidding_history(self, league_id: int, year: Optional[int] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """Waiver adds with their FAAB bids, newest first"""
+        sql = """SELECT l.year, l.date, l.week, a.team_id, a.player_id, a.player_name, a.bid_amount
+                 FROM activity_log_actions a JOIN activity_log l ON l.league_id = a.league_id AND l.topic_id = a.topic_id
+                 WHERE a.league_id = ? AND a.action = 'WAIVER ADDED'"""
+        params: List[Any] = [league_id]
+        if year is not None:
+            sql += " AND l.year = ?"
+            params.append(year)
+        sql += " ORDER BY l.date DESC, a.topic_id DESC, a.seq LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+
+# Global league history store instance (opened on first use)
+_history_store: Optional[LeagueHistoryStore] = None
+_history_store_lock = threading.Lock()
+
+def get_history_store() -> LeagueHistoryStore:
+    global _history_store
+    with _history_store_lock:
+        if _history_store is None:
+            _history_store = LeagueHistoryStore()
+        return _history_store
@@ -0,0 +1,268 @@
+"""
+Compact League Model
+Slotted, array-backed snapshot of an espn_api League built once per connection and shared by every request
+"""
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from espn_api.football import League
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class CompactTeam:
+    """Team identity; numeric fields live in CompactLeague's arrays at `index`"""
+    index: int
+    team_id: int
+    name: str
+    owner: str
+    roster: Tuple[int, ...]  # player indices
+
+@dataclass(slots=True)
+class CompactPlayer:
+    """Rostered player identity; numeric fields live in CompactLeague's arrays at `index`"""
+    index: int
+    player_id: Optional[int]
+    name: str
+    position: str
+    lineup_slot: str
+    eligible_slots: Tuple[str, ...]
+    injury_status: Optional[str]
+    pro_team: str
+    pro_opponent: Optional[str]
+    team_index: int
+
+class CompactLeague:
+    """
+    Dense, read-only view of a League's teams and rosters
+
+    Teams and players get dense integer indices; per-team records and per-player scoring
+    are NumPy columns indexed by them, and team_id / player_id map to an index through a
+    dict, so lookups are O(1). Serializers return the same shapes ESPNService has always
+    returned.
+
+    Once the model is built it replaces the League's player payload: the rosters' espn_api
+    Player objects (with their per-week stats dicts), the player name map and the draft
+    picks are released, so the registry keeps teams, schedules and settings plus these
+    columns. Box scores are never held by the League; they are fetched per call.
+    """
+
+    __slots__ = (
+        "league_id", "year", "current_week", "teams", "players", "team_index", "player_index",
+        "wins", "losses", "ties", "final_standing", "standing", "points_for", "points_against",
+        "player_points", "player_projected_points", "player_pos_rank", "__weakref__"
+    )
+
+    def __init__(self, league_id: int, year: int, current_week: int, teams: List[CompactTeam],
+                 players: List[CompactPlayer], team_columns: Dict[str, np.ndarray], player_columns: Dict[str, np.ndarray]):
+        self.league_id = league_id
+        self.year = year
+        self.current_week = current_week
+        self.teams = teams
+        self.players = players
+        self.team_index = {team.team_id: team.index for team in teams}
+        # Rostered players are unique to one team; players ESPN returns without an ID stay index-only
+        self.player_index = {player.player_id: player.index for player in players if player.player_id is not None}
+
+        self.wins = team_columns["wins"]
+        self.losses = team_columns["losses"]
+        self.ties = team_columns["ties"]
+        self.final_standing = team_columns["final_standing"]
+        self.standing = team_columns["standing"]
+        self.points_for = team_columns["points_for"]
+        self.points_against = team_columns["points_against"]
+
+        self.player_points = player_columns["points"]
+        self.player_projected_points = player_columns["projected_points"]
+        self.player_pos_rank = player_columns["pro_pos_rank"]
+
+    @classmethod
+    def from_league(cls, league: League) -> "CompactLeague":
+        """
+        Build the compact model from a fetched League
+
+        Args:
+            league: espn_api League with teams and rosters loaded
+
+        Returns:
+            CompactLeague snapshot
+        """
+        current_week = league.current_week
+        teams: List[CompactTeam] = []
+        players: List[CompactPlayer] = []
+        team_rows = []
+        player_rows = []
+
+        for team_index, team in enumerate(league.teams):
+            owner = "Unknown"
+            if getattr(team, 'owners', None):
+                owner = team.owners[0].get('displayName', 'Unknown')
+
+            roster = []
+            for player in team.roster:
+                # Roster players only carry per-week stats; box score players carry the flattened fields
+                week_stats = getattr(player, 'stats', {}).get(current_week, {})
+                roster.append(len(players))
+                players.append(CompactPlayer(
+                    index=len(players),
+                    player_id=getattr(player, 'playerId', None),
+                    name=player.name,
+                    position=player.position,
+                    lineup_slot=getattr(player, 'lineupSlot', ''),
+                    eligible_slots=tuple(getattr(player, 'eligibleSlots', ())),
+                    injury_status=getattr(player, 'injuryStatus', None),
+                    pro_team=getattr(player, 'proTeam', 'None'),
+                    pro_opponent=getattr(player, 'pro_opponent', None),
+                    team_index=team_index
+                ))
+                player_rows.append((
+                    getattr(player, 'points', week_stats.get('points', 0)),
+                    getattr(player, 'projected_points', week_stats.get('projected_points', 0)),
+                    getattr(player, 'pro_pos_rank', 0) or 0
+                ))
+
+            teams.append(CompactTeam(
+                index=team_index,
+                team_id=team.team_id,
+                name=team.team_name,
+                owner=owner,
+                roster=tuple(roster)
+            ))
+            team_rows.append((
+                team.wins, team.losses, team.ties, team.final_standing, getattr(team, 'standing', 0),
+                team.points_for, team.points_against
+            ))
+
+        team_data = np.array(team_rows, dtype=np.float64).reshape(-1, 7)
+        player_data = np.array(player_rows, dtype=np.float64).reshape(-1, 3)
+        team_columns = {
+            "wins": team_data[:, 0].astype(np.int16),
+            "losses": team_data[:, 1].astype(np.int16),
+            "ties": team_data[:, 2].astype(np.int16),
+            "final_standing": team_data[:, 3].astype(np.int16),
+            "standing": team_data[:, 4].astype(np.int16),
+            "points_for": team_data[:, 5].copy(),
+            "points_against": team_data[:, 6].copy()
+        }
+        player_columns = {
+            "points": player_data[:, 0].copy(),
+            "projected_points": player_data[:, 1].copy(),
+            "pro_pos_rank": player_data[:, 2].astype(np.int16)
+        }
+
+        return cls(league.league_id, league.year, current_week, teams, players, team_columns, player_columns)
+
+    def team(self, team_id: int) -> Optional[CompactTeam]:
+        """Team by ESPN team ID"""
+        index = self.team_index.get(team_id)
+        return self.teams[index] if index is not None else None
+
+    def player(self, player_id: int) -> Optional[CompactPlayer]:
+        """Rostered player by ESPN player ID"""
+        index = self.player_index.get(player_id)
+        return self.players[index] if index is not None else None
+
+    def team_name(self, team_id: int) -> Optional[str]:
+        """Team name by ESPN team ID"""
+        team = self.team(team_id)
+        return team.name if team else None
+
+    def _team_record(self, team: CompactTeam) -> Dict[str, Any]:
+        i = team.index
+        return {
+            "espn_team_id": team.team_id,
+            "name": team.name,
+            "wins": int(self.wins[i]),
+            "losses": int(self.losses[i]),
+            "ties": int(self.ties[i]),
+            "final_standing": int(self.final_standing[i]),
+            "points_for": float(self.points_for[i]),
+            "points_against": float(self.points_against[i])
+        }
+
+    def teams_to_dicts(self) -> List[Dict[str, Any]]:
+        """Response shape of ESPNService.get_teams"""
+        teams = []
+        for team in self.teams:
+            record = self._team_record(team)
+            teams.append({
+                "espn_team_id": record["espn_team_id"],
+                "name": record["name"],
+                "owner": team.owner,
+                **{key: record[key] for key in ("wins", "losses", "ties", "final_standing", "points_for", "points_against")}
+            })
+        return teams
+
+    def standings_to_dicts(self) -> List[Dict[str, Any]]:
+        """Response shape of ESPNService.get_standings (final standing once set, else current standing)"""
+        order_key = np.where(self.final_standing != 0, self.final_standing, self.standing)
+        standings = []
+        for rank, index in enumerate(np.argsort(order_key, kind="stable")):
+            record = self._team_record(self.teams[index])
+            standings.append({
+                "rank": rank + 1,
+                **{key: record[key] for key in ("espn_team_id", "name", "wins", "losses", "ties", "points_for", "points_against")},
+                "final_standing": record["final_standing"]
+            })
+        return standings
+
+    def roster_to_dicts(self, team_id: int) -> List[Dict[str, Any]]:
+        """Response shape of ESPNService.get_team_roster (empty for an unknown team)"""
+        team = self.team(team_id)
+        if not team:
+            return []
+
+        roster = []
+        for index in team.roster:
+            player = self.players[index]
+            roster.append({
+                "player_id": player.player_id,
+                "name": player.name,
+                "position": player.position,
+                "lineup_slot": player.lineup_slot,
+                "eligible_slots": list(player.eligible_slots),
+                "injury_status": player.injury_status,
+                "points": float(self.player_points[index]),
+                "projected_points": float(self.player_projected_points[index]),
+                "pro_opponent": player.pro_opponent,
+                "pro_pos_rank": int(self.player_pos_rank[index])
+            })
+        return roster
+
+def release_league_payload(league: League):
+    """
+    Drop the player-level data a League keeps after fetch_league once the compact model holds it
+
+    Teams keep their records, scores and schedules (standings and power rankings read them);
+    only rosters, the player name map and the draft go.
+
+    Args:
+        league: League whose compact model has been built
+    """
+    for team in league.teams:
+        team.roster = []
+    league.player_map = {}
+    league.draft = []
+
+# One compact model per live League object; dropped with the League when the registry lets it go
+_compact_leagues: "weakref.WeakKeyDictionary[League, CompactLeague]" = weakref.WeakKeyDictionary()
+_compact_lock = threading.Lock()
+
+def get_compact_league(league: League) -> CompactLeague:
+    """Compact model for a League, built on first use; the League's player payload is released after the build"""
+    with _compact_lock:
+        compact = _compact_leagues.get(league)
+    if compact is not None:
+        return compact
+
+    compact = CompactLeague.from_league(league)
+    with _compact_lock:
+        # Keep whichever build finished first so every caller shares one model
+        compact = _compact_leagues.setdefault(league, compact)
+    release_league_payload(league)
+    logger.debug(f"Built compact model for league {compact.league_id}: {len(compact.teams)} teams, {len(compact.players)} players")
+    return compact
@@ -0,0 +1,174 @@
+"""
+League Registry
+Process-wide cache of live espn_api League connections shared by every ESPNService
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+from espn_api.football import League
+from app.core.database import get_supabase
+from app.services.espn_snapshot_store import build_league
+from app.services.league_model import get_compact_league
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a League connection is reused before it is rebuilt with fresh league data
+LEAGUE_TTL = 900  # seconds
+# How long the active league configuration row is reused before Supabase is queried again
+CONFIG_TTL = 60  # seconds
+# Most League connections kept in memory
+MAX_LEAGUES = 8
+
+@dataclass
+class LeagueEntry:
+    """A live League connection and how it was built"""
+    league: League
+    espn_s2: Optional[str]
+    swid: Optional[str]
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+class LeagueRegistry:
+    """
+    Thread-safe LRU registry of League objects keyed by (league_id, year)
+
+    League objects are built lazily and shared read-only between requests. A stale
+    connection is rebuilt and swapped in whole, so requests already holding the old
+    object keep a consistent view. Concurrent requests for the same league wait on one
+    build instead of each connecting to ESPN.
+    """
+
+    def __init__(self, max_leagues: int = MAX_LEAGUES, ttl: float = LEAGUE_TTL, config_ttl: float = CONFIG_TTL):
+        self.max_leagues = max_leagues
+        self.ttl = ttl
+        self.config_ttl = config_ttl
+        self._entries: "OrderedDict[Tuple[int, int], LeagueEntry]" = OrderedDict()
+        self._build_locks: Dict[Tuple[int, int], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._config: Optional[Dict[str, Any]] = None
+        self._config_loaded_at = 0.0
+        self.builds = 0
+        self.evictions = 0
+
+    def get_active_config(self) -> Optional[Dict[str, Any]]:
+        """Most recently configured league row, cached for config_ttl seconds"""
+        with self._lock:
+            if self._config_loaded_at and time.time() - self._config_loaded_at < self.config_ttl:
+                return self._config
+
+        supabase = get_supabase()
+        if not supabase:
+            return None
+
+        response = supabase.table("leagues").select("*").order("created_at", desc=True).limit(1).execute()
+        config = response.data[0] if response.data else None
+
+        with self._lock:
+            self._config = config
+            self._config_loaded_at = time.time()
+        return config
+
+    def get_league(self, league_id: int, year: int, espn_s2: Optional[str] = None, swid: Optional[str] = None) -> League:
+        """
+        Get the shared League for (league_id, year), building or rebuilding it if needed
+
+        Args:
+            league_id: ESPN league ID
+            year: Season year
+            espn_s2: ESPN S2 cookie for private leagues
+            swid: ESPN SWID cookie for private leagues
+
+        Returns:
+            Live League object
+
+        Raises:
+            Exception: Whatever espn_api raises if the connection cannot be built
+        """
+        key = (league_id, year)
+
+        entry = self._get_fresh(key, espn_s2, swid)
+        if entry:
+            return entry.league
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            # Another request may have built it while we waited
+            entry = self._get_fresh(key, espn_s2, swid)
+            if entry:
+                return entry.league
+
+            # Live, recording or replaying depending on ESPN_SNAPSHOT_MODE
+            league = build_league(league_id, year, espn_s2, swid)
+            self.put(league_id, year, league, espn_s2, swid)
+            logger.info(f"League registry built connection for league {league_id}, year {year}")
+            return league
+
+    def peek(self, league_id: int, year: int, espn_s2: Optional[str] = None, swid: Optional[str] = None) -> Optional[League]:
+        """The shared League for (league_id, year) if one is already built and fresh; never builds"""
+        entry = self._get_fresh((league_id, year), espn_s2, swid)
+        return entry.league if entry else None
+
+    def put(self, league_id: int, year: int, league: League, espn_s2: Optional[str] = None, swid: Optional[str] = None):
+        """Register an already built League, evicting the least recently used beyond max_leagues"""
+        # Build the compact model now so the League's player payload is released before it is shared
+        get_compact_league(league)
+        with self._lock:
+            self._entries[(league_id, year)] = LeagueEntry(league=league, espn_s2=espn_s2, swid=swid)
+            self._entries.move_to_end((league_id, year))
+            self.builds += 1
+
+            while len(self._entries) > self.max_leagues:
+                evicted, _ = self._entries.popitem(last=False)
+                self._build_locks.pop(evicted, None)
+                self.evictions += 1
+                logger.info(f"League registry evicted league {evicted[0]}, year {evicted[1]}")
+
+    def _get_fresh(self, key: Tuple[int, int], espn_s2: Optional[str], swid: Optional[str]) -> Optional[LeagueEntry]:
+        """Entry for key if it is within its TTL and was built with the same credentials"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if time.time() - entry.created_at > self.ttl or (entry.espn_s2, entry.swid) != (espn_s2, swid):
+                return None
+            entry.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def invalidate(self, league_id: Optional[int] = None, year: Optional[int] = None):
+        """Drop cached connections (all, one league, or one league season) and the cached config"""
+        with self._lock:
+            for key in list(self._entries):
+                if (league_id is None or key[0] == league_id) and (year is None or key[1] == year):
+                    del self._entries[key]
+            self._config = None
+            self._config_loaded_at = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry contents and counters for monitoring"""
+        now = time.time()
+        with self._lock:
+            return {
+                "leagues": [
+                    {
+                        "league_id": key[0],
+                        "year": key[1],
+                        "age_seconds": round(now - entry.created_at, 1),
+                        "hits": entry.hits
+                    }
+                    for key, entry in self._entries.items()
+                ],
+                "max_leagues": self.max_leagues,
+                "ttl": self.ttl,
+                "builds": self.builds,
+                "evictions": self.evictions
+            }
+
+# Global league registry instance
+league_registry = LeagueRegistry()
@@ -0,0 +1,294 @@
+"""
+Start/Sit Lineup Optimizer
+Picks the starting lineup that maximizes win probability against the week's opponent
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+import numpy as np
+
+from app.services.espn_service import ESPNService
+
+logger = logging.getLogger(__name__)
+
+# Starting slots used when the league settings don't expose lineup slot counts
+DEFAULT_SLOT_COUNTS = {'QB': 1, 'RB': 2, 'WR': 2, 'TE': 1, 'RB/WR/TE': 1, 'D/ST': 1, 'K': 1}
+
+# Lineup slots that don't score points
+NON_STARTING_SLOTS = {'BE', 'IR'}
+
+# ESPN injury statuses of players who won't play this week
+UNAVAILABLE_INJURY_STATUSES = {'OUT', 'INJURY_RESERVE', 'IR', 'SUSPENSION'}
+
+def is_available(player: Dict[str, Any]) -> bool:
+    """Whether a roster player can score this week (not ruled out, suspended or on IR)"""
+    return (
+        player.get('injury_status') not in UNAVAILABLE_INJURY_STATUSES
+        and player.get('lineup_slot') != 'IR'
+    )
+
+@dataclass
+class LineupCandidate:
+    """A valid starting lineup (one roster index per starting slot)"""
+    player_indices: Tuple[int, ...]
+    projected_points: float
+    win_probability: Optional[float] = None
+
+class LineupOptimizer:
+    """Start/sit optimizer scoring candidate lineups against shared per-player Monte Carlo draws"""
+
+    # Per-player score volatility: std dev as a fraction of projection, with a floor
+    PLAYER_VOLATILITY = 0.4
+    MIN_PLAYER_STD_DEV = 3.0
+
+    # Upper bound on draw-matrix gathers held in memory at once while scoring
+    MAX_GATHER_CELLS = 8_000_000
+
+    def __init__(
+        self,
+        espn_service: Optional[ESPNService] = None,
+        iterations: int = 10000,
+        max_candidates: int = 5000,
+        prune_sigmas: float = 2.0
+    ):
+        self.espn_service = espn_service or ESPNService()
+        self.iterations = iterations
+        self.max_candidates = max_candidates
+        self.prune_sigmas = prune_sigmas
+        self.rng = np.random.default_rng()
+
+    def set_seed(self, seed: int):
+        """Set random seed for reproducible results"""
+        self.rng = np.random.default_rng(seed)
+
+    def optimize_team_lineup(self, team_id: int, week: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Pick the best start/sit lineup for a team against this week's opponent
+
+        Args:
+            team_id: ESPN team ID
+            week: Week number (defaults to current week)
+
+        Returns:
+            Dictionary with the recommended lineup, bench, unavailable players and win probabilities
+        """
+        try:
+            week = week or (self.espn_service.league.current_week if self.espn_service.league else None)
+
+            # Both rosters carry that week's projections
+            roster = self.espn_service.get_team_roster(team_id, week)
+            if not roster:
+                return {}
+
+            opponent = self._find_opponent(team_id, week)
+            opponent_lineup = []
+            if opponent:
+                opponent_roster = self.espn_service.get_team_roster(opponent['espn_team_id'], week)
+                opponent_lineup = [
+                    player for player in opponent_roster
+                    if player.get('lineup_slot') not in NON_STARTING_SLOTS and is_available(player)
+                ]
+
+            result = self.optimize(roster, self._get_starting_slots(), opponent_lineup)
+            result.update({
+                'team_id': team_id,
+                'week': week,
+                'opponent': opponent
+            })
+            return result
+
+        except Exception as e:
+            logger.error(f"Error optimizing lineup for team {team_id}: {e}")
+            return {}
+
+    def optimize(
+        self,
+        roster: List[Dict[str, Any]],
+        slots: List[str],
+        opponent_lineup: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Enumerate valid lineups for the given slots and pick the one with the best win probability
+
+        Args:
+            roster: Players in get_team_roster shape (needs eligible_slots and projected_points);
+                players ruled out, suspended or on IR are never started
+            slots: Starting slot names, one entry per slot (e.g. ['QB', 'RB', 'RB', ...])
+            opponent_lineup: Opponent's starters in get_team_roster shape
+
+        Returns:
+            Dictionary with the recommended lineup and search statistics
+        """
+        unavailable = [p['name'] for p in roster if not is_available(p)]
+        roster = [p for p in roster if is_available(p)]
+        projections = np.array([float(p.get('projected_points') or 0.0) for p in roster])
+        opponent_projections = np.array([float(p.get('projected_points') or 0.0) for p in opponent_lineup])
+
+        candidates, pruned = self._enumerate_lineups(roster, slots, projections)
+        if not candidates:
+            return {
+                'lineup': [],
+                'bench': [p['name'] for p in roster],
+                'unavailable': unavailable,
+                'win_probability': None,
+                'projected_points': 0.0,
+                'candidates_evaluated': 0,
+                'branches_pruned': pruned
+            }
+
+        # One draw per player per iteration; team and opponent share the matrix
+        means = np.concatenate([projections, opponent_projections])
+        draws = np.maximum(0, self.rng.normal(means, self._player_std_devs(means), (self.iterations, len(means))))
+
+        if len(opponent_lineup):
+            opponent_totals = draws[:, len(roster):].sum(axis=1)
+            self._score_candidates(candidates, draws, opponent_totals)
+            best = max(candidates, key=lambda c: (c.win_probability, c.projected_points))
+        else:
+            # Bye week or unknown opponent: fall back to projected points
+            best = max(candidates, key=lambda c: c.projected_points)
+
+        max_points = max(candidates, key=lambda c: c.projected_points)
+        starters = set(best.player_indices)
+
+        return {
+            'lineup': [
+                {
+                    'slot': slot,
+                    'player_id': roster[idx].get('player_id'),
+                    'name': roster[idx]['name'],
+                    'position': roster[idx].get('position'),
+                    'projected_points': float(projections[idx])
+                }
+                for slot, idx in zip(slots, best.player_indices)
+            ],
+            'bench': [p['name'] for i, p in enumerate(roster) if i not in starters],
+            'unavailable': unavailable,
+            'win_probability': best.win_probability,
+            'projected_points': round(float(best.projected_points), 2),
+            'max_points_lineup': {
+                'projected_points': round(float(max_points.projected_points), 2),
+                'win_probability': max_points.win_probability
+            },
+            'opponent_projected_points': round(float(opponent_projections.sum()), 2),
+            'candidates_evaluated': len(candidates),
+            'branches_pruned': pruned,
+            'iterations': self.iterations
+        }
+
+    def _player_std_devs(self, projections: np.ndarray) -> np.ndarray:
+        """Per-player score standard deviations"""
+        return np.maximum(projections * self.PLAYER_VOLATILITY, self.MIN_PLAYER_STD_DEV)
+
+    def _enumerate_lineups(
+        self,
+        roster: List[Dict[str, Any]],
+        slots: List[str],
+        projections: np.ndarray
+    ) -> Tuple[List[LineupCandidate], int]:
+        """
+        Depth-first enumeration of distinct lineups with branch-and-bound pruning.
+
+        A branch is cut when even its best possible completion projects more than
+        prune_sigmas starter standard deviations below the best lineup found so far,
+        since such lineups can't realistically out-win it.
+        """
+        # Eligible roster indices per slot, best projection first
+        eligible = [
+            sorted(
+                (i for i, p in enumerate(roster) if slot in p.get('eligible_slots', [])),
+                key=lambda i: -projections[i]
+            )
+            for slot in slots
+        ]
+        if any(not players for players in eligible):
+            return [], 0
+
+        # Fill the most restrictive slots first so dead ends surface early
+        order = sorted(range(len(slots)), key=lambda s: len(eligible[s]))
+
+        # Optimistic completion bound: best eligible projection for each remaining slot
+        remaining_bound = np.zeros(len(order) + 1)
+        for depth in range(len(order) - 1, -1, -1):
+            remaining_bound[depth] = remaining_bound[depth + 1] + projections[eligible[order[depth]][0]]
+
+        stds = self._player_std_devs(projections)
+        margin = self.prune_sigmas * float(np.sqrt(np.mean([stds[eligible[s][0]] ** 2 for s in order])))
+
+        candidates: List[LineupCandidate] = []
+        seen = set()
+        chosen = [0] * len(slots)
+        used = set()
+        state = {'best': -np.inf, 'pruned': 0}
+
+        def search(depth: int, points: float, min_rank: int):
+            if len(candidates) >= self.max_candidates:
+                return
+            if points + remaining_bound[depth] < state['best'] - margin:
+                state['pruned'] += 1
+                return
+            if depth == len(order):
+                key = frozenset(chosen)
+                if key not in seen:
+                    seen.add(key)
+                    candidates.append(LineupCandidate(tuple(chosen), points))
+                    state['best'] = max(state['best'], points)
+                return
+
+            slot = order[depth]
+            next_slot = order[depth + 1] if depth + 1 < len(order) else None
+            for rank, idx in enumerate(eligible[slot]):
+                # Identical slots take players in rank order to skip permutations
+                if rank < min_rank or idx in used:
+                    continue
+                chosen[slot] = idx
+                used.add(idx)
+                same_next = next_slot is not None and slots[next_slot] == slots[slot]
+                search(depth + 1, points + float(projections[idx]), rank + 1 if same_next else 0)
+                used.discard(idx)
+
+        search(0, 0.0, 0)
+
+        # The best lineup may have been found late; drop early candidates the final bound excludes
+        candidates = [c for c in candidates if c.projected_points >= state['best'] - margin]
+        return candidates, state['pruned']
+
+    def _score_candidates(self, candidates: List[LineupCandidate], draws: np.ndarray, opponent_totals: np.ndarray):
+        """Win probability of each candidate as an index-sum over the shared draw matrix"""
+        lineup_index = np.array([c.player_indices for c in candidates], dtype=np.intp)
+        chunk = max(1, self.MAX_GATHER_CELLS // (draws.shape[0] * lineup_index.shape[1]))
+
+        for start in range(0, len(candidates), chunk):
+            block = lineup_index[start:start + chunk]
+            # (iterations, lineups, slots) -> (iterations, lineups)
+            totals = draws[:, block].sum(axis=2)
+            win_probabilities = (totals > opponent_totals[:, None]).mean(axis=0)
+            for candidate, probability in zip(candidates[start:start + chunk], win_probabilities):
+                candidate.win_probability = float(probability)
+
+    def _get_starting_slots(self) -> List[str]:
+        """Expand the league's lineup slot counts into one entry per starting slot"""
+        slot_counts = DEFAULT_SLOT_COUNTS
+        try:
+            league = self.espn_service.league
+            league_counts = getattr(league.settings, 'position_slot_counts', None) if league else None
+            if league_counts:
+                slot_counts = league_counts
+        except Exception as e:
+            logger.warning(f"Could not read lineup slot counts, using defaults: {e}")
+
+        slots = []
+        for slot, count in slot_counts.items():
+            if slot and slot not in NON_STARTING_SLOTS:
+                slots.extend([slot] * int(count))
+        return slots
+
+    def _find_opponent(self, team_id: int, week: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Find this week's opponent for a team"""
+        for matchup in self.espn_service.get_matchups(week):
+            if matchup['home_team']['espn_team_id'] == team_id:
+                return matchup['away_team']
+            if matchup['away_team']['espn_team_id'] == team_id:
+                return matchup['home_team']
+        return None
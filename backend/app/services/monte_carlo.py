@@ -1,11 +1,14 @@
 import numpy as np
 from scipy import stats
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on (pairs, iterations) score cells drawn at once in simulate_matchups_batch
+MAX_BATCH_CELLS = 2_000_000
+
 @dataclass
 class SimulationResult:
     """Result of a Monte Carlo simulation"""
@@ -28,17 +31,19 @@ class MonteCarloSimulator:
         """Set random seed for reproducible results"""
         self.rng = np.random.default_rng(seed)
     
-    def simulate_matchup(self, team1_stats: Dict[str, Any], team2_stats: Dict[str, Any]) -> SimulationResult:
+    def simulate_matchup(self, team1_stats: Dict[str, Any], team2_stats: Dict[str, Any], iterations: Optional[int] = None) -> SimulationResult:
         """
         Run Monte Carlo simulation for a fantasy football matchup
         
         Args:
             team1_stats: Dictionary containing team 1 statistics
             team2_stats: Dictionary containing team 2 statistics
+            iterations: Simulations to run (defaults to the simulator's iterations)
             
         Returns:
             SimulationResult with win probability and statistics
         """
+        iterations = iterations or self.iterations
         try:
             # Extract team statistics
             team1_avg = self._extract_team_average(team1_stats)
@@ -47,26 +52,26 @@ class MonteCarloSimulator:
             team2_std = self._extract_team_std_dev(team2_stats)
             
             # Generate random scores using NumPy (vectorized for performance)
-            team1_scores = np.maximum(0, self.rng.normal(team1_avg, team1_std, self.iterations))
-            team2_scores = np.maximum(0, self.rng.normal(team2_avg, team2_std, self.iterations))
+            team1_scores = np.maximum(0, self.rng.normal(team1_avg, team1_std, iterations))
+            team2_scores = np.maximum(0, self.rng.normal(team2_avg, team2_std, iterations))
             
             # Count wins using NumPy (vectorized)
             team1_wins = np.sum(team1_scores > team2_scores)
             
             # Calculate results using NumPy
-            win_probability = team1_wins / self.iterations
+            win_probability = team1_wins / iterations
             team1_avg_score = float(np.mean(team1_scores))
             team2_avg_score = float(np.mean(team2_scores))
             team1_std_dev = float(np.std(team1_scores))
             team2_std_dev = float(np.std(team2_scores))
             
             # Calculate confidence interval using SciPy
-            confidence_interval = self._calculate_confidence_interval_scipy(win_probability, self.iterations)
+            confidence_interval = self._calculate_confidence_interval_scipy(win_probability, iterations)
             
             return SimulationResult(
                 win_probability=win_probability,
                 confidence_interval=confidence_interval,
-                iterations=self.iterations,
+                iterations=iterations,
                 team1_avg_score=team1_avg_score,
                 team2_avg_score=team2_avg_score,
                 team1_std_dev=team1_std_dev,
@@ -79,7 +84,7 @@ class MonteCarloSimulator:
             return SimulationResult(
                 win_probability=0.5,
                 confidence_interval=(0.45, 0.55),
-                iterations=self.iterations,
+                iterations=iterations,
                 team1_avg_score=100.0,
                 team2_avg_score=100.0,
                 team1_std_dev=15.0,
@@ -147,6 +152,101 @@ class MonteCarloSimulator:
             upper_bound = min(1, probability + margin_of_error)
             return (lower_bound, upper_bound)
     
+    def simulate_matchups_batch(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], iterations: Optional[int] = None) -> List[SimulationResult]:
+        """
+        Run simulate_matchup for many (team1_stats, team2_stats) pairs at once
+
+        Scores are drawn as (pairs, iterations) matrices in chunks of at most MAX_BATCH_CELLS
+        cells, so memory stays bounded whatever the iteration count, and the confidence
+        intervals come from one vectorized SciPy call.
+
+        Args:
+            pairs: List of (team1_stats, team2_stats) tuples
+            iterations: Simulations per pair (defaults to the simulator's iterations)
+
+        Returns:
+            List of SimulationResult in the same order as pairs
+        """
+        if not pairs:
+            return []
+        iterations = iterations or self.iterations
+
+        team1_avg = np.array([self._extract_team_average(team1) for team1, _ in pairs])
+        team1_std = np.array([self._extract_team_std_dev(team1) for team1, _ in pairs])
+        team2_avg = np.array([self._extract_team_average(team2) for _, team2 in pairs])
+        team2_std = np.array([self._extract_team_std_dev(team2) for _, team2 in pairs])
+
+        wins = np.empty(len(pairs))
+        team1_mean, team2_mean = np.empty(len(pairs)), np.empty(len(pairs))
+        team1_sd, team2_sd = np.empty(len(pairs)), np.empty(len(pairs))
+
+        chunk = max(1, MAX_BATCH_CELLS // iterations)
+        for start in range(0, len(pairs), chunk):
+            block = slice(start, start + chunk)
+            size = (len(team1_avg[block]), iterations)
+            team1_scores = np.maximum(0, self.rng.normal(team1_avg[block, None], team1_std[block, None], size))
+            team2_scores = np.maximum(0, self.rng.normal(team2_avg[block, None], team2_std[block, None], size))
+
+            wins[block] = np.sum(team1_scores > team2_scores, axis=1)
+            team1_mean[block], team2_mean[block] = team1_scores.mean(axis=1), team2_scores.mean(axis=1)
+            team1_sd[block], team2_sd[block] = team1_scores.std(axis=1), team2_scores.std(axis=1)
+
+        win_probability = wins / iterations
+        lower, upper = stats.binom.interval(0.95, iterations, win_probability)
+        lower = np.maximum(0.0, lower / iterations)
+        upper = np.minimum(1.0, upper / iterations)
+
+        return [
+            SimulationResult(
+                win_probability=float(win_probability[i]),
+                confidence_interval=(float(lower[i]), float(upper[i])),
+                iterations=iterations,
+                team1_avg_score=float(team1_mean[i]),
+                team2_avg_score=float(team2_mean[i]),
+                team1_std_dev=float(team1_sd[i]),
+                team2_std_dev=float(team2_sd[i])
+            )
+            for i in range(len(pairs))
+        ]
+
+    def simulate_margin_and_total(
+        self,
+        home_mean: float,
+        home_std: float,
+        away_mean: float,
+        away_std: float,
+        seed: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Simulate one matchup and return sorted margin and total samples
+
+        Args:
+            home_mean: Home team expected score
+            home_std: Home team score standard deviation
+            away_mean: Away team expected score
+            away_std: Away team score standard deviation
+            seed: Draw from a generator seeded with this (same inputs and seed give the same samples)
+
+        Returns:
+            Tuple of (sorted home-minus-away margins, sorted combined totals)
+        """
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        home_scores = np.maximum(0, rng.normal(home_mean, home_std, self.iterations))
+        away_scores = np.maximum(0, rng.normal(away_mean, away_std, self.iterations))
+
+        margins = np.sort(home_scores - away_scores)
+        totals = np.sort(home_scores + away_scores)
+        return margins, totals
+
+    def probability_above(self, sorted_samples: np.ndarray, lines: np.ndarray) -> np.ndarray:
+        """
+        Probability that a sample lands strictly above each line
+
+        Uses binary search on the pre-sorted samples, so pricing L lines costs O(L log N).
+        """
+        below_or_equal = np.searchsorted(sorted_samples, lines, side='right')
+        return 1.0 - below_or_equal / len(sorted_samples)
+
     def simulate_season_outcomes(self, team_stats: Dict[str, Any], remaining_games: int) -> Dict[str, Any]:
         """
         Simulate remaining season outcomes for a team
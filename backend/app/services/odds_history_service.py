@@ -0,0 +1,183 @@
+"""
+Odds History Service
+Append-only store of every published line per matchup for line-movement charts and closing-line analysis
+"""
+
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timezone
+import logging
+
+from app.core.database import get_supabase
+
+logger = logging.getLogger(__name__)
+
+# Rows per insert request when writing a refresh's lines
+HISTORY_BATCH_SIZE = 500
+
+class OddsHistoryService:
+    """Writes published lines to the odds_history table and answers range queries over it"""
+
+    def __init__(self):
+        self.supabase = get_supabase()
+
+    def build_entries(
+        self,
+        odds_data: List[Dict[str, Any]],
+        league_id: Optional[int],
+        season: Optional[int],
+        source: str = "espn_model",
+        ts: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Flatten matchup odds into odds_history rows sharing one timestamp"""
+        ts = (ts or datetime.now(timezone.utc)).isoformat()
+        return [
+            {
+                "league_id": str(league_id) if league_id is not None else None,
+                "season": season,
+                "week": odds["week"],
+                "matchup_id": odds["matchup_id"],
+                "ts": ts,
+                "home_moneyline": odds["home_team"]["moneyline"],
+                "away_moneyline": odds["away_team"]["moneyline"],
+                "spread": odds["away_team"]["spread"],
+                "total": odds["total"],
+                "source": source
+            }
+            for odds in odds_data
+        ]
+
+    def record_lines(
+        self,
+        odds_data: List[Dict[str, Any]],
+        league_id: Optional[int],
+        season: Optional[int],
+        source: str = "espn_model"
+    ) -> int:
+        """
+        Append published lines to the history in bulk batches
+
+        Args:
+            odds_data: Matchup odds as returned by OddsService
+            league_id: ESPN league ID the odds belong to
+            season: Season (year) the odds belong to
+            source: Where the lines came from (e.g. espn_model, odds_api)
+
+        Returns:
+            Number of rows written
+        """
+        try:
+            if not self.supabase or not odds_data:
+                return 0
+
+            entries = self.build_entries(odds_data, league_id, season, source)
+            written = 0
+            for start in range(0, len(entries), HISTORY_BATCH_SIZE):
+                batch = entries[start:start + HISTORY_BATCH_SIZE]
+                self.supabase.table("odds_history").insert(batch).execute()
+                written += len(batch)
+
+            logger.info(f"Recorded {written} lines to odds history")
+            return written
+
+        except Exception as e:
+            logger.error(f"Error recording odds history: {e}")
+            return 0
+
+    def _scoped(self, league_id: Optional[int], season: Optional[int]):
+        """odds_history query limited to one league season (matchup IDs and weeks repeat across both)"""
+        query = self.supabase.table("odds_history").select("*")
+        query = query.eq("league_id", str(league_id)) if league_id is not None else query.is_("league_id", "null")
+        return query.eq("season", season) if season is not None else query.is_("season", "null")
+
+    def get_line_movement(
+        self,
+        league_id: Optional[int],
+        season: Optional[int],
+        matchup_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a matchup's lines in time order, served by the (league_id, season, matchup_id, ts) index
+
+        Args:
+            league_id: ESPN league ID
+            season: Season (year)
+            matchup_id: Matchup ID (home_team_id-away_team_id-week)
+            start: Only lines published at or after this time
+            end: Only lines published at or before this time
+            limit: Maximum number of rows
+
+        Returns:
+            List of history rows, oldest first
+        """
+        try:
+            if not self.supabase:
+                return []
+
+            query = self._scoped(league_id, season).eq("matchup_id", matchup_id)
+            if start:
+                query = query.gte("ts", start.isoformat())
+            if end:
+                query = query.lte("ts", end.isoformat())
+
+            response = query.order("ts").limit(limit).execute()
+            return response.data
+
+        except Exception as e:
+            logger.error(f"Error getting line movement for {matchup_id}: {e}")
+            return []
+
+    def get_closing_line(
+        self,
+        league_id: Optional[int],
+        season: Optional[int],
+        matchup_id: str,
+        before: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Last line published for a league season's matchup (optionally as of a given time)"""
+        try:
+            if not self.supabase:
+                return None
+
+            query = self._scoped(league_id, season).eq("matchup_id", matchup_id)
+            if before:
+                query = query.lte("ts", before.isoformat())
+
+            response = query.order("ts", desc=True).limit(1).execute()
+            return response.data[0] if response.data else None
+
+        except Exception as e:
+            logger.error(f"Error getting closing line for {matchup_id}: {e}")
+            return None
+
+    def get_closing_lines(self, league_id: Optional[int], season: Optional[int], week: int) -> List[Dict[str, Any]]:
+        """
+        Last published line for every matchup in a league season's week
+
+        Served by the odds_history_closing_lines function (see setup_database.py), which reads
+        only the newest row per matchup through the (league_id, season, matchup_id, ts) index,
+        so neither the week's full history nor the PostgREST row cap is involved.
+
+        Args:
+            league_id: ESPN league ID
+            season: Season (year)
+            week: Week number
+
+        Returns:
+            One history row per matchup (empty without a league season)
+        """
+        try:
+            if not self.supabase or league_id is None or season is None:
+                return []
+
+            response = self.supabase.rpc(
+                "odds_history_closing_lines",
+                {"p_league_id": str(league_id), "p_season": season, "p_week": week}
+            ).execute()
+            return response.data
+
+        except Exception as e:
+            logger.error(f"Error getting closing lines for week {week}: {e}")
+            return []
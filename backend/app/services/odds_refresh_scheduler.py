@@ -0,0 +1,243 @@
+"""
+Odds Refresh Scheduler
+Materializes weekly odds in the background so odds endpoints only read stored snapshots,
+refreshing when the scoreboard watcher reports a change
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import logging
+
+from app.core.config import settings
+from app.services.odds_service import OddsService
+from app.services.odds_state_store import odds_state_store
+from app.services.scoreboard_watcher import ScoreboardEventType
+
+logger = logging.getLogger(__name__)
+
+# Fallback refresh cadence in seconds when no scoreboard events arrive
+DEFAULT_REFRESH_INTERVAL = 300
+# Scoreboard events that can move a line: lineups change the roster, finals feed the score matrix.
+# Live score changes are not among them since pricing ignores live scores (see LIVE_INPUTS)
+REPRICE_EVENTS = frozenset({ScoreboardEventType.LINEUP_CHANGED, ScoreboardEventType.MATCHUP_FINAL})
+# Refresh cycles a requested week stays tracked without being read again
+TRACKED_WEEK_IDLE_CYCLES = 12
+# Most requested weeks repriced each cycle besides the current week (least recently read dropped first)
+MAX_TRACKED_WEEKS = 6
+
+class OddsRefreshScheduler:
+    """
+    Background task that keeps materialized odds fresh for the current week and recently requested weeks
+
+    Requested weeks are tracked with the number of refresh cycles since a client last read
+    them. Weeks that are over, unread for TRACKED_WEEK_IDLE_CYCLES cycles, or beyond the
+    MAX_TRACKED_WEEKS most recently read stop being repriced; their stored odds stay readable.
+    """
+
+    def __init__(self):
+        self.refresh_interval = getattr(settings, 'ODDS_REFRESH_INTERVAL', None) or DEFAULT_REFRESH_INTERVAL
+        self.tracked_weeks: Dict[int, int] = {}
+        self.pending_events = 0
+        self.last_event: Optional[str] = None
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    def _get_odds_service(self) -> OddsService:
+        """OddsService bound to the registry's current League connection (cheap to build)"""
+        return OddsService()
+
+    async def start(self):
+        """Start the background refresh loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Odds refresh scheduler started (event driven, {self.refresh_interval}s fallback)")
+
+    async def stop(self):
+        """Stop the background refresh loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Odds refresh scheduler stopped")
+
+    async def _run(self):
+        """Refresh whenever scoreboard events arrive, and on the fallback interval otherwise"""
+        while True:
+            # Events arriving during a refresh wake the next one; a burst collapses into one refresh
+            self._wake.clear()
+            self.pending_events = 0
+            await self.refresh_all()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def on_scoreboard_event(self, event):
+        """Scoreboard watcher subscriber: reprice on the next loop iteration when the event can move a line"""
+        if event.type not in REPRICE_EVENTS:
+            return
+        self.pending_events += 1
+        self.last_event = f"{event.type.value} {event.matchup_id}"
+        self._wake.set()
+
+    async def refresh_all(self):
+        """Refresh the current week plus every week a client has asked for, in one data pass"""
+        try:
+            odds_service = await asyncio.to_thread(self._get_odds_service)
+            current_week = odds_service.resolve_week(None)
+
+            self._expire_tracked_weeks(current_week)
+            await self.refresh_weeks(sorted(set(self.tracked_weeks) | {current_week}))
+            self.last_run = datetime.now()
+            self.last_error = None
+
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error refreshing materialized odds: {e}")
+
+    def _expire_tracked_weeks(self, current_week: int):
+        """Age tracked weeks by one cycle and drop finished or idle ones"""
+        for week in list(self.tracked_weeks):
+            self.tracked_weeks[week] += 1
+            if week < current_week or self.tracked_weeks[week] > TRACKED_WEEK_IDLE_CYCLES:
+                del self.tracked_weeks[week]
+
+    def _track_weeks(self, weeks: List[int], current_week: int):
+        """Mark weeks as just read, keeping at most MAX_TRACKED_WEEKS"""
+        for week in weeks:
+            # Finished weeks are priced once on request and never change again
+            if week >= current_week:
+                self.tracked_weeks[week] = 0
+        while len(self.tracked_weeks) > MAX_TRACKED_WEEKS:
+            # Least recently read first, then the furthest-out week
+            del self.tracked_weeks[max(self.tracked_weeks, key=lambda week: (self.tracked_weeks[week], week))]
+
+    async def refresh_week(self, week: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        Recompute and store one week's odds off the event loop
+
+        Args:
+            week: Week number (defaults to current week)
+
+        Returns:
+            Change report for the refresh, or None if the week has no matchups
+        """
+        async with self._lock:
+            odds_service = await asyncio.to_thread(self._get_odds_service)
+            refresh = await odds_service.refresh_odds_async(week)
+            await asyncio.to_thread(odds_service.record_history, refresh)
+            return refresh['changes']
+
+    async def refresh_weeks(self, weeks: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Recompute and store several weeks sharing one ESPN snapshot; returns each week's change report"""
+        async with self._lock:
+            odds_service = await asyncio.to_thread(self._get_odds_service)
+            refreshed = await odds_service.refresh_weeks_async(weeks)
+            for refresh in refreshed.values():
+                await asyncio.to_thread(odds_service.record_history, refresh)
+            return {week: refresh['changes'] for week, refresh in refreshed.items()}
+
+    async def get_materialized(self, week: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read a week's stored odds and their age
+
+        A week nobody has asked for yet is materialized once and then tracked by the
+        background loop; afterwards reads never touch ESPN.
+
+        Args:
+            week: Week number (defaults to current week)
+
+        Returns:
+            Dictionary with odds, week, refreshed_at and age_seconds, or None if the week has no matchups
+        """
+        odds_service = await asyncio.to_thread(self._get_odds_service)
+        return (await self.get_materialized_weeks([odds_service.resolve_week(week)]))[0]
+
+    async def get_materialized_weeks(self, weeks: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Read several weeks' stored odds, materializing any missing weeks together in one data pass
+
+        Args:
+            weeks: Week numbers
+
+        Returns:
+            One entry per requested week (None where the week has no matchups or is outside the season)
+        """
+        odds_service = await asyncio.to_thread(self._get_odds_service)
+        league_id = odds_service.espn_service.league_id
+        final_week = odds_service.final_week()
+        valid = [week for week in weeks if week >= 1 and (final_week is None or week <= final_week)]
+        self._track_weeks(valid, odds_service.resolve_week(None))
+
+        missing = [week for week in valid if odds_state_store.age(league_id, week) is None]
+        if missing:
+            await self.refresh_weeks(missing)
+
+        return [self._read_materialized(league_id, week) if week in valid else None for week in weeks]
+
+    async def get_materialized_ladders(self, week: Optional[int] = None, matchup_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read a week's stored alternate-line ladders and their age
+
+        The week is materialized and tracked exactly as get_materialized does, so ladders are
+        repriced with the week's odds and reads never price anything themselves.
+
+        Args:
+            week: Week number (defaults to current week)
+            matchup_id: Limit to one matchup (home_team_id-away_team_id-week)
+
+        Returns:
+            Dictionary with ladders, week, refreshed_at and age_seconds, or None if the week has no matchups
+        """
+        materialized = await self.get_materialized(week)
+        if not materialized:
+            return None
+
+        odds_service = await asyncio.to_thread(self._get_odds_service)
+        return {
+            **{key: materialized[key] for key in ('week', 'refreshed_at', 'age_seconds')},
+            'ladders': odds_service.get_alternate_lines(materialized['week'], matchup_id)
+        }
+
+    async def remaining_regular_season_weeks(self) -> List[int]:
+        """Current week through the last regular-season week"""
+        odds_service = await asyncio.to_thread(self._get_odds_service)
+        return odds_service.remaining_regular_season_weeks()
+
+    def _read_materialized(self, league_id: Optional[int], week: int) -> Optional[Dict[str, Any]]:
+        """Stored odds for a week with when they were computed"""
+        states = odds_state_store.get_week(league_id, week)
+        refreshed_at = odds_state_store.refreshed_at(league_id, week)
+        if not states or refreshed_at is None:
+            return None
+
+        return {
+            'week': week,
+            'odds': [state.odds for state in states.values()],
+            'refreshed_at': datetime.fromtimestamp(refreshed_at).isoformat(),
+            'age_seconds': round(time.time() - refreshed_at, 1)
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        """Scheduler state for monitoring"""
+        return {
+            'running': bool(self._task and not self._task.done()),
+            'refresh_interval': self.refresh_interval,
+            'pending_events': self.pending_events,
+            'last_event': self.last_event,
+            'tracked_weeks': sorted(self.tracked_weeks),
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_error': self.last_error
+        }
+
+# Global odds refresh scheduler instance
+odds_refresh_scheduler = OddsRefreshScheduler()
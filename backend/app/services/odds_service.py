@@ -1,223 +1,528 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
-import statistics
+from types import MappingProxyType
+import asyncio
 import math
+import numpy as np
+from scipy import special
 from app.services.espn_service import ESPNService
-from app.services.monte_carlo import MonteCarloSimulator
+from app.services.monte_carlo import MonteCarloSimulator, SimulationResult
+from app.services.odds_state_store import odds_state_store, MatchupOddsState, OddsChangeReport
+from app.services.odds_history_service import OddsHistoryService
+from app.services.score_matrix import score_matrix_store
+from app.services.game_windows import game_calendar
 from app.core.database import get_supabase
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for blocking espn_api calls made from async code
+ESPN_FETCH_WORKERS = 8
+ESPN_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=ESPN_FETCH_WORKERS, thread_name_prefix="espn-fetch")
+
+# Alternate line offsets around the main spread/total: ±20 points in 0.5 steps
+LADDER_OFFSETS = np.arange(-20.0, 20.5, 0.5)
+
+# Matchup inputs kept on the stored state that no line depends on (left out of the fingerprint)
+LIVE_INPUTS = ('home_score', 'away_score')
+
+# Win probabilities are clamped to this range before pricing so moneylines stay finite (+9900/-9900 at most)
+MONEYLINE_PROBABILITY_RANGE = (0.01, 0.99)
+
+# Stats returned for teams missing from the league data
+EMPTY_TEAM_STATS = MappingProxyType({'season_avg': 0, 'recent_avg': 0})
+
+@dataclass(frozen=True)
+class OddsSnapshot:
+    """Immutable per-request view of the ESPN data needed to price one week"""
+    week: Optional[int]
+    current_week: int
+    recent_weeks: Tuple[int, ...]  # recent form window read from the score matrix
+    team_stats: Mapping[int, Mapping[str, float]]  # team_id -> season/recent averages
+
 class OddsService:
     def __init__(self):
         self.espn_service = ESPNService()
         self.monte_carlo = MonteCarloSimulator(iterations=10000)
         self.supabase = get_supabase()
+        self.history = OddsHistoryService()
     
     def calculate_matchup_odds(self, week: Optional[int] = None) -> List[Dict[str, Any]]:
         """Calculate odds for all matchups in a given week"""
+        return self.refresh_odds(week).get('odds', [])
+    
+    def refresh_odds(self, week: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Refresh a week's odds, repricing only matchups whose inputs changed
+        
+        Args:
+            week: Week number (defaults to current week)
+            
+        Returns:
+            Dictionary with the week's odds (in scoreboard order) and a change report
+        """
         try:
             # Get matchups for the week
             matchups = self.espn_service.get_matchups(week)
             if not matchups:
-                return []
-            
-            odds_data = []
-            for matchup in matchups:
-                home_team = matchup['home_team']
-                away_team = matchup['away_team']
-                
-                # Calculate win probabilities
-                home_win_prob, away_win_prob = self._calculate_win_probabilities(
-                    home_team, away_team, week
-                )
-                
-                # Calculate spread
-                spread = self._calculate_spread(home_team, away_team, week)
-                
-                # Calculate total points
-                total = self._calculate_total_points(home_team, away_team, week)
-                
-                # Create odds data
-                odds_data.append({
-                    'week': week or self.espn_service.league.current_week if self.espn_service.league else 1,
-                    'home_team': {
-                        'id': home_team['espn_team_id'],
-                        'name': home_team['name'],
-                        'win_probability': home_win_prob,
-                        'moneyline': self._probability_to_moneyline(home_win_prob),
-                        'spread': -spread,  # Home team spread is negative
-                        'projected_score': self._get_projected_score(home_team, week)
-                    },
-                    'away_team': {
-                        'id': away_team['espn_team_id'],
-                        'name': away_team['name'],
-                        'win_probability': away_win_prob,
-                        'moneyline': self._probability_to_moneyline(away_win_prob),
-                        'spread': spread,  # Away team spread is positive
-                        'projected_score': self._get_projected_score(away_team, week)
-                    },
-                    'total': total,
-                    'over_odds': -110,  # Standard -110 for over/under
-                    'under_odds': -110,
-                    'last_updated': datetime.utcnow().isoformat()
-                })
+                return {'odds': [], 'changes': None}
             
-            return odds_data
+            return self._reprice(matchups, self._build_snapshot(week), week)
             
         except Exception as e:
             logger.error(f"Error calculating matchup odds: {e}")
-            return []
+            return {'odds': [], 'changes': None}
     
-    def _calculate_win_probabilities(self, home_team: Dict, away_team: Dict, week: Optional[int]) -> Tuple[float, float]:
-        """Calculate win probabilities for a matchup using multiple factors"""
-        try:
-            # Get historical performance data
-            home_stats = self._get_team_stats(home_team['espn_team_id'], week)
-            away_stats = self._get_team_stats(away_team['espn_team_id'], week)
+    async def refresh_odds_async(self, week: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Async refresh_odds: the scoreboard and any finalized weeks' box scores missing from
+        the score matrix are fetched concurrently on the ESPN thread pool, so the refresh takes about as long as the
+        slowest upstream call instead of the sum of them
+        
+        Args:
+            week: Week number (defaults to current week)
             
-            # Calculate base probabilities from season performance
-            home_season_avg = home_stats.get('season_avg', 0)
-            away_season_avg = away_stats.get('season_avg', 0)
+        Returns:
+            Dictionary with the week's odds (in scoreboard order) and a change report
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            snapshot_weeks = self._score_weeks_to_fetch()
             
-            # Calculate recent form (last 4 weeks)
-            home_recent_avg = home_stats.get('recent_avg', home_season_avg)
-            away_recent_avg = away_stats.get('recent_avg', away_season_avg)
+            matchups, *box_scores = await asyncio.gather(
+                loop.run_in_executor(ESPN_FETCH_EXECUTOR, self.espn_service.get_matchups, week),
+                *(loop.run_in_executor(ESPN_FETCH_EXECUTOR, self._fetch_box_scores, w) for w in snapshot_weeks)
+            )
+            if not matchups:
+                return {'odds': [], 'changes': None}
             
-            # Calculate home field advantage (typically 2-3 points in fantasy)
-            home_advantage = 2.5
+            snapshot = self._snapshot_from_score_matrix(week, dict(zip(snapshot_weeks, box_scores)))
+            return await loop.run_in_executor(ESPN_FETCH_EXECUTOR, self._reprice, matchups, snapshot, week)
             
-            # Weighted calculation: 60% recent form, 40% season average
-            home_projected = (home_recent_avg * 0.6 + home_season_avg * 0.4) + home_advantage
-            away_projected = away_recent_avg * 0.6 + away_season_avg * 0.4
+        except Exception as e:
+            logger.error(f"Error calculating matchup odds: {e}")
+            return {'odds': [], 'changes': None}
+    
+    async def refresh_weeks_async(self, weeks: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Refresh several weeks in one data pass
+        
+        Team stats only depend on the league's recent form window, so one snapshot is
+        built and shared by every week; the only per-week upstream call is its scoreboard.
+        All scoreboards and any box scores missing from the score matrix are fetched
+        concurrently.
+        
+        Args:
+            weeks: Week numbers to refresh
             
-            # Convert to probabilities using normal distribution approximation
-            point_diff = home_projected - away_projected
-            std_dev = 15.0  # Typical fantasy football standard deviation
+        Returns:
+            Dictionary mapping each week to its odds and change report
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            snapshot_weeks = self._score_weeks_to_fetch()
+            
+            fetched = await asyncio.gather(
+                *(loop.run_in_executor(ESPN_FETCH_EXECUTOR, self.espn_service.get_matchups, week) for week in weeks),
+                *(loop.run_in_executor(ESPN_FETCH_EXECUTOR, self._fetch_box_scores, w) for w in snapshot_weeks)
+            )
+            scoreboards = fetched[:len(weeks)]
+            snapshot = self._snapshot_from_score_matrix(None, dict(zip(snapshot_weeks, fetched[len(weeks):])))
+            
+            refreshed = {}
+            for week, matchups in zip(weeks, scoreboards):
+                if matchups:
+                    refreshed[week] = await loop.run_in_executor(ESPN_FETCH_EXECUTOR, self._reprice, matchups, snapshot, week)
+                else:
+                    refreshed[week] = {'odds': [], 'changes': None}
+            return refreshed
             
-            # Calculate win probability for home team
-            home_win_prob = 0.5 + (0.5 * math.erf(point_diff / (std_dev * math.sqrt(2))))
-            away_win_prob = 1.0 - home_win_prob
+        except Exception as e:
+            logger.error(f"Error calculating odds for weeks {weeks}: {e}")
+            return {week: {'odds': [], 'changes': None} for week in weeks}
+    
+    def remaining_regular_season_weeks(self) -> List[int]:
+        """Current week through the last regular-season week"""
+        league = self.espn_service.league
+        if not league:
+            return []
+        last_week = getattr(league.settings, 'reg_season_count', 0) or league.current_week
+        return list(range(league.current_week, last_week + 1))
+    
+    def final_week(self) -> Optional[int]:
+        """Last scoring period of the season (playoffs included), or None without a League"""
+        league = self.espn_service.league
+        return getattr(league, 'finalScoringPeriod', None) if league else None
+    
+    async def calculate_matchup_odds_async(self, week: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Async calculate_matchup_odds with concurrent upstream fetches"""
+        return (await self.refresh_odds_async(week)).get('odds', [])
+    
+    def _reprice(self, matchups: List[Dict[str, Any]], snapshot: OddsSnapshot, week: Optional[int]) -> Dict[str, Any]:
+        """Reprice the matchups whose inputs changed since the stored state and store the week"""
+        league_id = self.espn_service.league_id
+        resolved_week = self.resolve_week(week)
+        
+        previous = odds_state_store.get_week(league_id, resolved_week)
+        report = OddsChangeReport(league_id=league_id, week=resolved_week)
+        
+        inputs = {}
+        fingerprints = {}
+        dirty = []
+        for matchup in matchups:
+            matchup_id = self._matchup_id(matchup, resolved_week)
+            inputs[matchup_id] = self._matchup_inputs(matchup, snapshot)
+            fingerprints[matchup_id] = self._pricing_fingerprint(inputs[matchup_id])
+            state = previous.get(matchup_id)
+            if state and state.fingerprint == fingerprints[matchup_id]:
+                report.unchanged.append(matchup_id)
+                # Live scores moved but no projection did: keep the published lines
+                if state.inputs != inputs[matchup_id]:
+                    previous[matchup_id] = replace(state, inputs=inputs[matchup_id])
+            else:
+                dirty.append(matchup)
+        
+        # Reprice the changed matchups in one vectorized pass
+        repriced = {}
+        if dirty:
+            for odds in self._price_matchups(dirty, snapshot, resolved_week):
+                matchup_id = odds['matchup_id']
+                repriced[matchup_id] = MatchupOddsState(
+                    matchup_id=matchup_id,
+                    fingerprint=fingerprints[matchup_id],
+                    inputs=inputs[matchup_id],
+                    odds=odds,
+                    # Price the alternate line ladder from one simulation of this matchup, seeded
+                    # from its inputs so repricing the same projections gives the same ladder
+                    ladder=self._calculate_alternate_lines(odds, snapshot, seed=int(fingerprints[matchup_id][:16], 16))
+                )
+                report.recomputed.append(matchup_id)
+                report.changes.append(self._describe_change(previous.get(matchup_id), repriced[matchup_id]))
+        
+        report.removed = [matchup_id for matchup_id in previous if matchup_id not in inputs]
+        
+        states = [repriced.get(matchup_id) or previous[matchup_id] for matchup_id in inputs]
+        odds_state_store.replace_week(league_id, resolved_week, states)
+        
+        if dirty:
+            logger.info(f"Repriced {len(dirty)} of {len(matchups)} matchups for week {resolved_week}")
+        
+        return {
+            'odds': [state.odds for state in states],
+            'changes': report.to_dict()
+        }
+    
+    def resolve_week(self, week: Optional[int]) -> int:
+        """Requested week, or the league's current week"""
+        if week:
+            return week
+        return self.espn_service.league.current_week if self.espn_service.league else 1
+    
+    def _matchup_id(self, matchup: Dict[str, Any], week: int) -> str:
+        """Matchup ID in the bet format: home_team_id-away_team_id-week"""
+        return f"{matchup['home_team']['espn_team_id']}-{matchup['away_team']['espn_team_id']}-{week}"
+    
+    def _matchup_inputs(self, matchup: Dict[str, Any], snapshot: OddsSnapshot) -> Dict[str, Any]:
+        """Everything a matchup's odds depend on, plus live scores for change reports"""
+        home_team = matchup['home_team']
+        away_team = matchup['away_team']
+        return {
+            'home_team_id': home_team['espn_team_id'],
+            'away_team_id': away_team['espn_team_id'],
+            'home_name': home_team['name'],
+            'away_name': away_team['name'],
+            'home_stats': {k: round(v, 4) for k, v in self._get_team_stats(home_team['espn_team_id'], snapshot).items()},
+            'away_stats': {k: round(v, 4) for k, v in self._get_team_stats(away_team['espn_team_id'], snapshot).items()},
+            'home_score': home_team.get('score'),
+            'away_score': away_team.get('score')
+        }
+    
+    def _pricing_fingerprint(self, inputs: Dict[str, Any]) -> str:
+        """Fingerprint of the inputs the lines are priced from (live scores excluded)"""
+        return odds_state_store.fingerprint({k: v for k, v in inputs.items() if k not in LIVE_INPUTS})
+    
+    def _describe_change(self, before: Optional[MatchupOddsState], after: MatchupOddsState) -> Dict[str, Any]:
+        """Summarize which inputs changed and how the published lines moved"""
+        if before is None:
+            return {'matchup_id': after.matchup_id, 'reason': 'new', 'changed_inputs': [], 'moved': {}}
+        
+        lines = {
+            'home_moneyline': lambda odds: odds['home_team']['moneyline'],
+            'away_moneyline': lambda odds: odds['away_team']['moneyline'],
+            'spread': lambda odds: odds['away_team']['spread'],
+            'total': lambda odds: odds['total']
+        }
+        moved = {}
+        for name, line in lines.items():
+            if line(before.odds) != line(after.odds):
+                moved[name] = {'from': line(before.odds), 'to': line(after.odds)}
+        
+        return {
+            'matchup_id': after.matchup_id,
+            'reason': 'inputs_changed',
+            'changed_inputs': sorted(k for k in after.inputs if before.inputs.get(k) != after.inputs[k]),
+            'moved': moved
+        }
+    
+    def _price_matchups(self, matchups: List[Dict[str, Any]], snapshot: OddsSnapshot, week: int) -> List[Dict[str, Any]]:
+        """Price a list of matchups in one vectorized pass"""
+        home_stats = [self._get_team_stats(m['home_team']['espn_team_id'], snapshot) for m in matchups]
+        away_stats = [self._get_team_stats(m['away_team']['espn_team_id'], snapshot) for m in matchups]
+        priced = self.calculate_odds_arrays(
+            np.array([stats.get('season_avg', 0) for stats in home_stats], dtype=float),
+            np.array([stats.get('recent_avg', stats.get('season_avg', 0)) for stats in home_stats], dtype=float),
+            np.array([stats.get('season_avg', 0) for stats in away_stats], dtype=float),
+            np.array([stats.get('recent_avg', stats.get('season_avg', 0)) for stats in away_stats], dtype=float)
+        )
+        return self._assemble_odds(matchups, priced, week)
+    
+    def calculate_odds_arrays(
+        self,
+        home_season_avg: np.ndarray,
+        home_recent_avg: np.ndarray,
+        away_season_avg: np.ndarray,
+        away_recent_avg: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized odds for a batch of matchups (any number of weeks or leagues)
+        
+        Win probabilities are clamped to 5%-95% here; the moneyline conversion's wider
+        MONEYLINE_PROBABILITY_RANGE clamp only affects unclamped callers (advanced odds).
+        
+        Args:
+            home_season_avg: Home team season averages
+            home_recent_avg: Home team recent (last 4 weeks) averages
+            away_season_avg: Away team season averages
+            away_recent_avg: Away team recent (last 4 weeks) averages
             
-            # Ensure probabilities are between 0.05 and 0.95 (avoid extreme odds)
-            home_win_prob = max(0.05, min(0.95, home_win_prob))
-            away_win_prob = max(0.05, min(0.95, away_win_prob))
+        Returns:
+            Dictionary of per-matchup arrays: win probabilities, moneylines, spread, total
+        """
+        home_advantage = 2.5
+        
+        # Weighted calculation: 60% recent form, 40% season average
+        home_projected = (home_recent_avg * 0.6 + home_season_avg * 0.4) + home_advantage
+        away_projected = away_recent_avg * 0.6 + away_season_avg * 0.4
+        
+        # Normal approximation with the typical 15-point fantasy standard deviation
+        home_win_prob = 0.5 + 0.5 * special.erf((home_projected - away_projected) / (15.0 * math.sqrt(2)))
+        away_win_prob = 1.0 - home_win_prob
+        
+        # Keep probabilities between 0.05 and 0.95 (avoid extreme odds)
+        home_win_prob = np.clip(home_win_prob, 0.05, 0.95)
+        away_win_prob = np.clip(away_win_prob, 0.05, 0.95)
+        
+        return {
+            'home_win_probability': home_win_prob,
+            'away_win_probability': away_win_prob,
+            'home_moneyline': self._probabilities_to_moneylines(home_win_prob),
+            'away_moneyline': self._probabilities_to_moneylines(away_win_prob),
+            # Spread and total round to the nearest 0.5
+            'spread': np.round((home_recent_avg + home_advantage - away_recent_avg) * 2) / 2,
+            'total': np.round((home_recent_avg + away_recent_avg) * 2) / 2,
+            'home_projected_score': home_recent_avg,
+            'away_projected_score': away_recent_avg
+        }
+    
+    def _assemble_odds(self, matchups: List[Dict[str, Any]], priced: Dict[str, np.ndarray], week: int) -> List[Dict[str, Any]]:
+        """Build odds response dicts from vectorized results in one pass"""
+        columns = {key: values.tolist() for key, values in priced.items()}
+        last_updated = datetime.utcnow().isoformat()
+        
+        odds_data = []
+        for i, matchup in enumerate(matchups):
+            home_team = matchup['home_team']
+            away_team = matchup['away_team']
+            spread = columns['spread'][i]
+            odds_data.append({
+                'matchup_id': self._matchup_id(matchup, week),
+                'week': week,
+                'home_team': {
+                    'id': home_team['espn_team_id'],
+                    'name': home_team['name'],
+                    'win_probability': columns['home_win_probability'][i],
+                    'moneyline': columns['home_moneyline'][i],
+                    'spread': -spread,  # Home team spread is negative
+                    'projected_score': columns['home_projected_score'][i]
+                },
+                'away_team': {
+                    'id': away_team['espn_team_id'],
+                    'name': away_team['name'],
+                    'win_probability': columns['away_win_probability'][i],
+                    'moneyline': columns['away_moneyline'][i],
+                    'spread': spread,  # Away team spread is positive
+                    'projected_score': columns['away_projected_score'][i]
+                },
+                'total': columns['total'][i],
+                'over_odds': -110,  # Standard -110 for over/under
+                'under_odds': -110,
+                'last_updated': last_updated
+            })
+        
+        return odds_data
+    
+    def get_alternate_lines(self, week: Optional[int] = None, matchup_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get a week's stored alternate spread/total ladders
+        
+        Ladders are priced with the week's odds and only read here; keeping them fresh is the
+        odds refresh scheduler's job, so this never calls ESPN or reprices.
+        
+        Args:
+            week: Week number (defaults to current week)
+            matchup_id: Limit to one matchup (home_team_id-away_team_id-week)
             
-            return home_win_prob, away_win_prob
+        Returns:
+            Stored ladders (empty if the week has not been materialized)
+        """
+        try:
+            states = odds_state_store.get_week(self.espn_service.league_id, self.resolve_week(week))
+            if matchup_id:
+                return [states[matchup_id].ladder] if matchup_id in states else []
+            return [state.ladder for state in states.values()]
             
         except Exception as e:
-            logger.error(f"Error calculating win probabilities: {e}")
-            # Return equal probabilities if calculation fails
-            return 0.5, 0.5
+            logger.error(f"Error getting alternate lines: {e}")
+            return []
+    
+    def _calculate_alternate_lines(self, odds: Dict[str, Any], snapshot: OddsSnapshot, seed: Optional[int] = None) -> Dict[str, Any]:
+        """Price a ladder of alternate spreads and totals around the main lines (reproducibly when seeded)"""
+        home_stats = self._get_team_stats(odds['home_team']['id'], snapshot)
+        away_stats = self._get_team_stats(odds['away_team']['id'], snapshot)
+        
+        home_mean = home_stats.get('recent_avg', home_stats.get('season_avg', 0)) + 2.5  # home field advantage
+        away_mean = away_stats.get('recent_avg', away_stats.get('season_avg', 0))
+        
+        # Split the 15-point margin standard deviation evenly between the two teams
+        team_std = 15.0 / math.sqrt(2)
+        margins, totals = self.monte_carlo.simulate_margin_and_total(home_mean, team_std, away_mean, team_std, seed=seed)
+        
+        # Home spread h covers when margin + h > 0
+        home_spreads = odds['home_team']['spread'] + LADDER_OFFSETS
+        home_cover = self.monte_carlo.probability_above(margins, -home_spreads)
+        
+        total_lines = odds['total'] + LADDER_OFFSETS
+        over = self.monte_carlo.probability_above(totals, total_lines)
+        
+        home_spread_odds = self._probabilities_to_moneylines(home_cover)
+        away_spread_odds = self._probabilities_to_moneylines(1 - home_cover)
+        over_odds = self._probabilities_to_moneylines(over)
+        under_odds = self._probabilities_to_moneylines(1 - over)
+        
+        return {
+            'matchup_id': odds['matchup_id'],
+            'week': odds['week'],
+            'home_team': {'id': odds['home_team']['id'], 'name': odds['home_team']['name']},
+            'away_team': {'id': odds['away_team']['id'], 'name': odds['away_team']['name']},
+            'spreads': [
+                {
+                    'home_spread': float(home_spreads[i]),
+                    'away_spread': float(-home_spreads[i]),
+                    'home_cover_probability': float(home_cover[i]),
+                    'home_odds': int(home_spread_odds[i]),
+                    'away_odds': int(away_spread_odds[i])
+                }
+                for i in range(len(LADDER_OFFSETS))
+            ],
+            'totals': [
+                {
+                    'line': float(total_lines[i]),
+                    'over_probability': float(over[i]),
+                    'over_odds': int(over_odds[i]),
+                    'under_odds': int(under_odds[i])
+                }
+                for i in range(len(LADDER_OFFSETS))
+            ],
+            'iterations': self.monte_carlo.iterations,
+            'last_updated': odds['last_updated']
+        }
+    
+    def _build_snapshot(self, week: Optional[int]) -> OddsSnapshot:
+        """Bring the score matrix up to date and index team stats by team_id"""
+        league = self.espn_service.league
+        if not league:
+            return OddsSnapshot(week, 1, (), MappingProxyType({}))
+        
+        box_scores = {w: self._fetch_box_scores(w) for w in self._score_weeks_to_fetch()}
+        return self._snapshot_from_score_matrix(week, box_scores)
+    
+    def _recent_weeks(self) -> Tuple[int, ...]:
+        """Recent form window: the last 4 completed weeks"""
+        league = self.espn_service.league
+        if not league:
+            return ()
+        return tuple(range(max(1, league.current_week - 4), league.current_week))
     
-    def _calculate_spread(self, home_team: Dict, away_team: Dict, week: Optional[int]) -> float:
-        """Calculate the point spread for a matchup"""
+    def _score_weeks_to_fetch(self) -> List[int]:
+        """Final weeks the score matrix does not have yet (each is fetched from ESPN once per season)"""
+        league = self.espn_service.league
+        if not league:
+            return []
         try:
-            home_stats = self._get_team_stats(home_team['espn_team_id'], week)
-            away_stats = self._get_team_stats(away_team['espn_team_id'], week)
-            
-            home_projected = home_stats.get('recent_avg', home_stats.get('season_avg', 0))
-            away_projected = away_stats.get('recent_avg', away_stats.get('season_avg', 0))
-            
-            # Add home field advantage
-            home_advantage = 2.5
-            spread = (home_projected + home_advantage) - away_projected
-            
-            # Round to nearest 0.5
-            return round(spread * 2) / 2
-            
+            # A week is final once its last game has ended, not as soon as ESPN's current week advances
+            return score_matrix_store.missing_weeks(league.league_id, league.year, game_calendar.last_final_week(league))
         except Exception as e:
-            logger.error(f"Error calculating spread: {e}")
-            return 0.0
+            logger.warning(f"Could not read score matrix, fetching recent weeks: {e}")
+            return list(self._recent_weeks())
     
-    def _calculate_total_points(self, home_team: Dict, away_team: Dict, week: Optional[int]) -> float:
-        """Calculate the total points over/under for a matchup"""
+    def _fetch_box_scores(self, week: int) -> Optional[Tuple[Any, ...]]:
+        """Fetch one week's box scores, or None if ESPN fails"""
         try:
-            home_stats = self._get_team_stats(home_team['espn_team_id'], week)
-            away_stats = self._get_team_stats(away_team['espn_team_id'], week)
-            
-            home_projected = home_stats.get('recent_avg', home_stats.get('season_avg', 0))
-            away_projected = away_stats.get('recent_avg', away_stats.get('season_avg', 0))
-            
-            total = home_projected + away_projected
-            
-            # Round to nearest 0.5
-            return round(total * 2) / 2
-            
+            return tuple(self.espn_service.fetch_box_scores(week))
         except Exception as e:
-            logger.error(f"Error calculating total points: {e}")
-            return 0.0
+            logger.warning(f"Could not fetch box scores for week {week}: {e}")
+            return None
     
-    def _get_team_stats(self, team_id: int, week: Optional[int]) -> Dict[str, float]:
-        """Get team statistics for odds calculation"""
+    def _snapshot_from_score_matrix(self, week: Optional[int], fetched: Dict[int, Optional[Tuple[Any, ...]]]) -> OddsSnapshot:
+        """Write newly fetched finalized weeks to the score matrix, then index team stats by team_id from it"""
+        league = self.espn_service.league
+        if not league:
+            return OddsSnapshot(week, 1, (), MappingProxyType({}))
+        
+        recent_weeks = self._recent_weeks()
+        recent_avgs: Dict[int, Optional[float]] = {}
         try:
-            if not self.espn_service.league:
-                return {'season_avg': 0, 'recent_avg': 0}
-            
-            # Get team data
-            team = None
-            for t in self.espn_service.league.teams:
-                if t.team_id == team_id:
-                    team = t
-                    break
-            
-            if not team:
-                return {'season_avg': 0, 'recent_avg': 0}
-            
-            # Calculate season average
+            # Weeks that failed to fetch stay missing and are retried on the next refresh
+            fetched = {w: scores for w, scores in fetched.items() if scores is not None}
+            score_matrix_store.write_weeks(league.league_id, league.year, [team.team_id for team in league.teams], fetched)
+            matrix = score_matrix_store.load(league.league_id, league.year)
+            if matrix:
+                recent_avgs = matrix.averages(recent_weeks)
+        except Exception as e:
+            logger.error(f"Error reading score matrix: {e}")
+        
+        team_stats = {}
+        for team in league.teams:
             season_avg = team.points_for / max(team.wins + team.losses, 1)
-            
-            # Calculate recent average (last 4 weeks)
-            recent_scores = []
-            current_week = self.espn_service.league.current_week
-            
-            # Get recent box scores
-            for w in range(max(1, current_week - 4), current_week):
-                try:
-                    box_scores = self.espn_service.league.box_scores(w)
-                    for box_score in box_scores:
-                        if box_score.home_team.team_id == team_id:
-                            recent_scores.append(box_score.home_score)
-                        elif box_score.away_team.team_id == team_id:
-                            recent_scores.append(box_score.away_score)
-                except:
-                    continue
-            
-            recent_avg = statistics.mean(recent_scores) if recent_scores else season_avg
-            
-            return {
+            recent_avg = recent_avgs.get(team.team_id)
+            team_stats[team.team_id] = MappingProxyType({
                 'season_avg': season_avg,
-                'recent_avg': recent_avg
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting team stats: {e}")
-            return {'season_avg': 0, 'recent_avg': 0}
+                'recent_avg': recent_avg if recent_avg is not None else season_avg
+            })
+        
+        return OddsSnapshot(week, league.current_week, recent_weeks, MappingProxyType(team_stats))
     
-    def _get_projected_score(self, team: Dict, week: Optional[int]) -> float:
-        """Get projected score for a team"""
-        try:
-            team_stats = self._get_team_stats(int(team['espn_team_id']), week)
-            return team_stats.get('recent_avg', team_stats.get('season_avg', 0))
-        except:
-            return 0.0
+    def _get_team_stats(self, team_id: int, snapshot: OddsSnapshot) -> Mapping[str, float]:
+        """Get team statistics for odds calculation"""
+        return snapshot.team_stats.get(team_id, EMPTY_TEAM_STATS)
     
     def _probability_to_moneyline(self, probability: float) -> int:
-        """Convert win probability to moneyline odds"""
-        try:
-            if probability >= 0.5:
-                # Favorite (negative odds)
-                odds = -int((probability / (1 - probability)) * 100)
-            else:
-                # Underdog (positive odds)
-                odds = int(((1 - probability) / probability) * 100)
-            
-            # Round to nearest 5
-            return round(odds / 5) * 5
-            
-        except:
-            return 100  # Default to +100 if calculation fails
+        """Convert a win probability to moneyline odds (single-value _probabilities_to_moneylines)"""
+        return int(self._probabilities_to_moneylines(np.array([probability]))[0])
+    
+    def _probabilities_to_moneylines(self, probabilities: np.ndarray) -> np.ndarray:
+        """Convert win probabilities to moneyline odds, clamped to MONEYLINE_PROBABILITY_RANGE first"""
+        p = np.clip(probabilities, *MONEYLINE_PROBABILITY_RANGE)
+        odds = np.where(
+            p >= 0.5,
+            -np.trunc(p / (1 - p) * 100),  # Favorite (negative odds)
+            np.trunc((1 - p) / p * 100)    # Underdog (positive odds)
+        )
+        
+        # Round to nearest 5
+        return (np.round(odds / 5) * 5).astype(int)
     
     def get_odds_for_week(self, week: int) -> List[Dict[str, Any]]:
         """Get odds for a specific week"""
@@ -230,70 +535,47 @@ class OddsService:
     def update_odds(self, week: Optional[int] = None) -> bool:
         """Update and store odds in database"""
         try:
-            odds_data = self.calculate_matchup_odds(week)
+            refresh = self.refresh_odds(week)
+            odds_data = refresh['odds']
             
             if not odds_data:
                 return False
             
-            # Store odds in database (we'll create an odds table later)
-            # For now, just return success
-            logger.info(f"Updated odds for {len(odds_data)} matchups")
+            recorded = self.record_history(refresh)
+            
+            logger.info(f"Updated odds for {len(odds_data)} matchups ({recorded} lines moved)")
             return True
             
         except Exception as e:
             logger.error(f"Error updating odds: {e}")
             return False
     
-    def calculate_advanced_odds(self, team1_stats: Dict[str, Any], team2_stats: Dict[str, Any]) -> Dict[str, Any]:
+    def record_history(self, refresh: Dict[str, Any]) -> int:
+        """Append a refresh's new or moved lines to the odds history; other matchups already have their line on record"""
+        if not refresh.get('changes'):
+            return 0
+        moved = {change['matchup_id'] for change in refresh['changes']['changes'] if change['reason'] == 'new' or change['moved']}
+        published = [odds for odds in refresh['odds'] if odds['matchup_id'] in moved]
+        self.history.record_lines(published, self.espn_service.league_id, self.espn_service.year)
+        return len(published)
+    
+    def calculate_advanced_odds(self, team1_stats: Dict[str, Any], team2_stats: Dict[str, Any], iterations: Optional[int] = None) -> Dict[str, Any]:
         """
         Calculate advanced odds using Monte Carlo simulation
         
         Args:
             team1_stats: Team 1 statistics
             team2_stats: Team 2 statistics
+            iterations: Simulations to run (defaults to the simulator's iterations)
             
         Returns:
             Dictionary with advanced odds calculations
         """
         try:
             # Run Monte Carlo simulation
-            simulation_result = self.monte_carlo.simulate_matchup(team1_stats, team2_stats)
-            
-            # Convert probabilities to odds
-            team1_win_prob = simulation_result.win_probability
-            team2_win_prob = 1 - team1_win_prob
-            
-            # Calculate moneylines
-            team1_moneyline = self._probability_to_moneyline(team1_win_prob)
-            team2_moneyline = self._probability_to_moneyline(team2_win_prob)
+            simulation_result = self.monte_carlo.simulate_matchup(team1_stats, team2_stats, iterations)
             
-            # Calculate spread based on average scores
-            spread = simulation_result.team1_avg_score - simulation_result.team2_avg_score
-            
-            # Calculate total
-            total = simulation_result.team1_avg_score + simulation_result.team2_avg_score
-            
-            return {
-                "team1": {
-                    "win_probability": team1_win_prob,
-                    "moneyline": team1_moneyline,
-                    "projected_score": simulation_result.team1_avg_score,
-                    "confidence_interval": simulation_result.confidence_interval
-                },
-                "team2": {
-                    "win_probability": team2_win_prob,
-                    "moneyline": team2_moneyline,
-                    "projected_score": simulation_result.team2_avg_score,
-                    "confidence_interval": (1 - simulation_result.confidence_interval[1], 1 - simulation_result.confidence_interval[0])
-                },
-                "spread": round(spread, 1),
-                "total": round(total, 1),
-                "simulation_details": {
-                    "iterations": simulation_result.iterations,
-                    "team1_std_dev": simulation_result.team1_std_dev,
-                    "team2_std_dev": simulation_result.team2_std_dev
-                }
-            }
+            return self._advanced_odds_from_simulation(simulation_result)
             
         except Exception as e:
             logger.error(f"Error calculating advanced odds: {e}")
@@ -304,3 +586,60 @@ class OddsService:
                 "total": 200.0,
                 "simulation_details": {"error": str(e)}
             }
+    
+    def calculate_advanced_odds_batch(self, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], iterations: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Calculate advanced odds for many team-stat pairs in one vectorized simulation
+        
+        Args:
+            pairs: List of (team1_stats, team2_stats) tuples
+            iterations: Simulations per pair (defaults to the simulator's iterations)
+            
+        Returns:
+            List of advanced odds dictionaries in the same order as pairs
+        """
+        try:
+            simulation_results = self.monte_carlo.simulate_matchups_batch(pairs, iterations)
+            return [self._advanced_odds_from_simulation(result) for result in simulation_results]
+            
+        except Exception as e:
+            logger.error(f"Error calculating batch advanced odds: {e}")
+            return [self.calculate_advanced_odds(team1_stats, team2_stats, iterations) for team1_stats, team2_stats in pairs]
+    
+    def _advanced_odds_from_simulation(self, simulation_result: SimulationResult) -> Dict[str, Any]:
+        """Convert a Monte Carlo result to moneylines, spread and total"""
+        # Convert probabilities to odds
+        team1_win_prob = simulation_result.win_probability
+        team2_win_prob = 1 - team1_win_prob
+        
+        # Calculate moneylines
+        team1_moneyline = self._probability_to_moneyline(team1_win_prob)
+        team2_moneyline = self._probability_to_moneyline(team2_win_prob)
+        
+        # Calculate spread based on average scores
+        spread = simulation_result.team1_avg_score - simulation_result.team2_avg_score
+        
+        # Calculate total
+        total = simulation_result.team1_avg_score + simulation_result.team2_avg_score
+        
+        return {
+            "team1": {
+                "win_probability": team1_win_prob,
+                "moneyline": team1_moneyline,
+                "projected_score": simulation_result.team1_avg_score,
+                "confidence_interval": simulation_result.confidence_interval
+            },
+            "team2": {
+                "win_probability": team2_win_prob,
+                "moneyline": team2_moneyline,
+                "projected_score": simulation_result.team2_avg_score,
+                "confidence_interval": (1 - simulation_result.confidence_interval[1], 1 - simulation_result.confidence_interval[0])
+            },
+            "spread": round(spread, 1),
+            "total": round(total, 1),
+            "simulation_details": {
+                "iterations": simulation_result.iterations,
+                "team1_std_dev": simulation_result.team1_std_dev,
+                "team2_std_dev": simulation_result.team2_std_dev
+            }
+        }
@@ -0,0 +1,93 @@
+"""
+Odds State Store
+Keeps the last published odds per matchup with a fingerprint of their inputs,
+so refreshes only reprice matchups whose inputs actually changed
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MatchupOddsState:
+    """Last priced odds for one matchup and the inputs they were priced from"""
+    matchup_id: str
+    fingerprint: str
+    inputs: Dict[str, Any]
+    odds: Dict[str, Any]
+    ladder: Optional[Dict[str, Any]] = None
+    priced_at: float = field(default_factory=time.time)
+
+@dataclass
+class OddsChangeReport:
+    """What a refresh recomputed and which lines moved"""
+    league_id: Optional[int]
+    week: int
+    recomputed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'league_id': self.league_id,
+            'week': self.week,
+            'recomputed': self.recomputed,
+            'unchanged': self.unchanged,
+            'removed': self.removed,
+            'changes': self.changes,
+            'recomputed_count': len(self.recomputed),
+            'unchanged_count': len(self.unchanged)
+        }
+
+class OddsStateStore:
+    """In-process store of per-matchup odds state, keyed by (league_id, week)"""
+
+    def __init__(self):
+        self._weeks: Dict[Tuple[Optional[int], int], Dict[str, MatchupOddsState]] = {}
+        self._refreshed_at: Dict[Tuple[Optional[int], int], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(inputs: Dict[str, Any]) -> str:
+        """Stable hash of a matchup's pricing inputs"""
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def get_week(self, league_id: Optional[int], week: int) -> Dict[str, MatchupOddsState]:
+        """Current state for every matchup in a week (empty if never refreshed)"""
+        with self._lock:
+            return dict(self._weeks.get((league_id, week), {}))
+
+    def age(self, league_id: Optional[int], week: int) -> Optional[float]:
+        """Seconds since the week was last refreshed, or None if never"""
+        refreshed_at = self.refreshed_at(league_id, week)
+        return time.time() - refreshed_at if refreshed_at is not None else None
+
+    def refreshed_at(self, league_id: Optional[int], week: int) -> Optional[float]:
+        """Epoch time the week was last refreshed, or None if never"""
+        with self._lock:
+            return self._refreshed_at.get((league_id, week))
+
+    def replace_week(self, league_id: Optional[int], week: int, states: List[MatchupOddsState]):
+        """Store the full, ordered set of matchup states for a week"""
+        with self._lock:
+            self._weeks[(league_id, week)] = {state.matchup_id: state for state in states}
+            self._refreshed_at[(league_id, week)] = time.time()
+
+    def invalidate(self, league_id: Optional[int] = None, week: Optional[int] = None):
+        """Drop stored state so the next refresh reprices everything"""
+        with self._lock:
+            for key in list(self._weeks):
+                if (league_id is None or key[0] == league_id) and (week is None or key[1] == week):
+                    del self._weeks[key]
+                    self._refreshed_at.pop(key, None)
+
+# Global odds state store instance
+odds_state_store = OddsStateStore()
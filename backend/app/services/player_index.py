@@ -0,0 +1,174 @@
+"""
+Player Index
+League-scoped player_id -> name/position/pro team/injury lookup, filled in bulk and shared across services
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from espn_api.football import League
+from espn_api.football.constant import PRO_TEAM_MAP
+from app.core.config import settings
+from app.services.league_model import get_compact_league
+from app.services.single_flight import espn_single_flight
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long an index is served before it is rebuilt from ESPN
+DEFAULT_PLAYER_INDEX_TTL = 6 * 3600  # seconds
+# ESPN defaultPositionId -> position (differs from the lineup slot IDs in POSITION_MAP)
+DEFAULT_POSITION_MAP = {
+    1: 'QB', 2: 'RB', 3: 'WR', 4: 'TE', 5: 'K', 7: 'P', 9: 'DT', 10: 'DE',
+    11: 'LB', 12: 'CB', 13: 'S', 14: 'HC', 16: 'D/ST'
+}
+
+@dataclass(frozen=True, slots=True)
+class PlayerInfo:
+    player_id: int
+    name: str
+    position: str
+    pro_team: str
+    injury_status: Optional[str]
+
+class PlayerIndex:
+    """Immutable player lookup for one league season"""
+
+    def __init__(self, league_id: int, year: int, players: Dict[int, PlayerInfo]):
+        self.league_id = league_id
+        self.year = year
+        self.players = players
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, league: League) -> "PlayerIndex":
+        """
+        Build the index from the league's player universe plus its rosters
+
+        The universe (every active pro player) is one ESPN request; rostered players are
+        then overlaid from the league's compact model so their injury status and position
+        match what the league shows.
+
+        Args:
+            league: Fetched espn_api League
+
+        Returns:
+            PlayerIndex for the league season
+        """
+        players: Dict[int, PlayerInfo] = {}
+        for player in league.espn_request.get_pro_players():
+            players[player['id']] = PlayerInfo(
+                player_id=player['id'],
+                name=player.get('fullName', f"Player {player['id']}"),
+                position=DEFAULT_POSITION_MAP.get(player.get('defaultPositionId'), 'Unknown'),
+                pro_team=PRO_TEAM_MAP.get(player.get('proTeamId'), 'None'),
+                injury_status=player.get('injuryStatus')
+            )
+
+        for player in get_compact_league(league).players:
+            if player.player_id is None:
+                continue
+            players[player.player_id] = PlayerInfo(
+                player_id=player.player_id,
+                name=player.name,
+                position=player.position or 'Unknown',
+                pro_team=player.pro_team,
+                injury_status=player.injury_status
+            )
+
+        return cls(league.league_id, league.year, players)
+
+    def get(self, player_id: int) -> Optional[PlayerInfo]:
+        return self.players.get(player_id)
+
+    def name(self, player_id: int) -> Optional[str]:
+        player = self.players.get(player_id)
+        return player.name if player else None
+
+    def position(self, player_id: int) -> Optional[str]:
+        player = self.players.get(player_id)
+        return player.position if player else None
+
+    def to_dict(self, player_id: int) -> Optional[Dict[str, Any]]:
+        player = self.players.get(player_id)
+        if not player:
+            return None
+        return {
+            "player_id": player.player_id,
+            "name": player.name,
+            "position": player.position,
+            "pro_team": player.pro_team,
+            "injury_status": player.injury_status
+        }
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+class PlayerIndexRegistry:
+    """
+    Process-wide player indexes keyed by (league_id, year)
+
+    An index older than the TTL is rebuilt on its next use; concurrent callers share that
+    one rebuild. If a rebuild fails the previous index keeps being served.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl or getattr(settings, 'PLAYER_INDEX_TTL', None) or DEFAULT_PLAYER_INDEX_TTL
+        self._indexes: Dict[Tuple[int, int], PlayerIndex] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get_index(self, league: League) -> Optional[PlayerIndex]:
+        """
+        Get the league season's index, building or refreshing it if needed
+
+        Args:
+            league: Fetched espn_api League
+
+        Returns:
+            PlayerIndex, or None if it has never been built and ESPN fails
+        """
+        key = (league.league_id, league.year)
+        with self._lock:
+            index = self._indexes.get(key)
+        if index and time.time() - index.built_at < self.ttl:
+            return index
+
+        try:
+            return espn_single_flight.do(("player_index",) + key, lambda: self.refresh(league))
+        except Exception as e:
+            logger.error(f"Error building player index for league {key[0]}: {e}")
+            return index
+
+    def refresh(self, league: League) -> PlayerIndex:
+        """Rebuild and store a league season's index now"""
+        index = PlayerIndex.build(league)
+        with self._lock:
+            self._indexes[(league.league_id, league.year)] = index
+            self.builds += 1
+        logger.info(f"Player index built for league {league.league_id} ({league.year}): {len(index)} players")
+        return index
+
+    def invalidate(self, league_id: Optional[int] = None):
+        """Drop indexes (all, or one league's)"""
+        with self._lock:
+            for key in list(self._indexes):
+                if league_id is None or key[0] == league_id:
+                    del self._indexes[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Indexed leagues and their ages for monitoring"""
+        now = time.time()
+        with self._lock:
+            return {
+                "indexes": [
+                    {"league_id": key[0], "year": key[1], "players": len(index), "age_seconds": round(now - index.built_at, 1)}
+                    for key, index in self._indexes.items()
+                ],
+                "ttl": self.ttl,
+                "builds": self.builds
+            }
+
+# Global player index registry instance
+player_index_registry = PlayerIndexRegistry()
@@ -0,0 +1,205 @@
+"""
+Weekly Score Matrix
+Persistent per-league (teams x weeks) actual and projected score matrices, memory-mapped for zero-copy reads
+"""
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+import numpy as np
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Week columns per matrix (regular season plus playoffs)
+MAX_WEEKS = 18
+DEFAULT_SCORE_MATRIX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "score_matrices")
+
+@dataclass(frozen=True)
+class ScoreMatrix:
+    """
+    Read-only view of one league season
+
+    scores and projected are (teams x MAX_WEEKS) float32 arrays opened with mmap_mode='r',
+    so every process reading the same files shares the page cache instead of copying.
+    Column w - 1 holds week w; weeks not yet finalized are NaN.
+    """
+    league_id: int
+    year: int
+    team_ids: Tuple[int, ...]
+    team_index: Dict[int, int]
+    finalized_weeks: Tuple[int, ...]
+    scores: np.ndarray
+    projected: np.ndarray
+
+    def team_scores(self, team_id: int, weeks: Optional[Iterable[int]] = None) -> np.ndarray:
+        """A team's finalized scores for the given weeks (all finalized weeks by default)"""
+        index = self.team_index.get(team_id)
+        if index is None:
+            return np.empty(0, dtype=np.float32)
+        columns = [w - 1 for w in (weeks if weeks is not None else self.finalized_weeks) if 1 <= w <= MAX_WEEKS]
+        row = self.scores[index, columns]
+        return row[~np.isnan(row)]
+
+    def averages(self, weeks: Optional[Iterable[int]] = None) -> Dict[int, Optional[float]]:
+        """Mean finalized score per team over the given weeks, None for a team with no scores"""
+        columns = [w - 1 for w in (weeks if weeks is not None else self.finalized_weeks) if 1 <= w <= MAX_WEEKS]
+        block = self.scores[:, columns]
+        counts = np.sum(~np.isnan(block), axis=1)
+        totals = np.nansum(block, axis=1)
+        return {
+            team_id: float(totals[i] / counts[i]) if counts[i] else None
+            for i, team_id in enumerate(self.team_ids)
+        }
+
+class ScoreMatrixStore:
+    """
+    Score matrices laid out as <root>/<league_id>/<year>/{scores,projected}.npy plus meta.json
+
+    Weeks are written in place through a read-write memmap as they finalize, so an update
+    touches one column instead of rewriting the file. meta.json (team order and finalized
+    weeks) is replaced atomically last, which is what makes a new week visible to readers.
+    Writers hold an exclusive flock on the season's .lock file, so workers in different
+    processes never interleave a read-modify-write of the same matrix.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or getattr(settings, 'SCORE_MATRIX_DIR', None) or DEFAULT_SCORE_MATRIX_DIR
+        self._lock = threading.Lock()
+        self._open: Dict[Tuple[int, int], Tuple[float, ScoreMatrix]] = {}
+
+    def _dir(self, league_id: int, year: int) -> str:
+        return os.path.join(self.root, str(league_id), str(year))
+
+    def _read_meta(self, league_id: int, year: int) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self._dir(league_id, year), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def load(self, league_id: int, year: int) -> Optional[ScoreMatrix]:
+        """
+        Open a league season's matrices read-only, reusing the mapping until meta.json changes
+
+        Args:
+            league_id: ESPN league ID
+            year: Season year
+
+        Returns:
+            ScoreMatrix, or None if nothing has been recorded yet
+        """
+        directory = self._dir(league_id, year)
+        meta_path = os.path.join(directory, "meta.json")
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        key = (league_id, year)
+        with self._lock:
+            cached = self._open.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        meta = self._read_meta(league_id, year)
+        team_ids = tuple(meta["team_ids"])
+        matrix = ScoreMatrix(
+            league_id=league_id,
+            year=year,
+            team_ids=team_ids,
+            team_index={team_id: i for i, team_id in enumerate(team_ids)},
+            finalized_weeks=tuple(meta["finalized_weeks"]),
+            scores=np.load(os.path.join(directory, "scores.npy"), mmap_mode="r"),
+            projected=np.load(os.path.join(directory, "projected.npy"), mmap_mode="r")
+        )
+        with self._lock:
+            self._open[key] = (mtime, matrix)
+        return matrix
+
+    def missing_weeks(self, league_id: int, year: int, last_final_week: int) -> List[int]:
+        """Final weeks (through last_final_week) not yet written to the matrix"""
+        meta = self._read_meta(league_id, year)
+        finalized = set(meta["finalized_weeks"]) if meta else set()
+        return [w for w in range(1, min(last_final_week, MAX_WEEKS) + 1) if w not in finalized]
+
+    @contextmanager
+    def _write_lock(self, directory: str):
+        """Exclusive cross-process lock on one league season's files"""
+        with open(os.path.join(directory, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write_weeks(self, league_id: int, year: int, team_ids: List[int], weeks: Dict[int, Tuple[Any, ...]]):
+        """
+        Write finalized weeks' box scores into the matrices
+
+        Args:
+            league_id: ESPN league ID
+            year: Season year
+            team_ids: League team IDs (row order for a new matrix)
+            weeks: Week -> that week's espn_api box scores
+        """
+        if not weeks:
+            return
+
+        directory = self._dir(league_id, year)
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock, self._write_lock(directory):
+            # Re-read under the lock: another process may have written since the caller checked
+            meta = self._read_meta(league_id, year)
+            in_place = bool(meta) and set(team_ids) <= set(meta["team_ids"])
+            if in_place:
+                row_ids = meta["team_ids"]
+                finalized = set(meta["finalized_weeks"])
+                scores = np.load(os.path.join(directory, "scores.npy"), mmap_mode="r+")
+                projected = np.load(os.path.join(directory, "projected.npy"), mmap_mode="r+")
+            else:
+                # First write, or the league's teams changed: build a fresh matrix and swap it in
+                row_ids = list(team_ids)
+                finalized = set()
+                scores = np.full((len(row_ids), MAX_WEEKS), np.nan, dtype=np.float32)
+                projected = np.full((len(row_ids), MAX_WEEKS), np.nan, dtype=np.float32)
+
+            rows = {team_id: i for i, team_id in enumerate(row_ids)}
+            for week, box_scores in weeks.items():
+                if not 1 <= week <= MAX_WEEKS:
+                    continue
+                for box_score in box_scores:
+                    for side in ("home", "away"):
+                        team_id = getattr(getattr(box_score, f"{side}_team"), 'team_id', None)
+                        if team_id in rows:
+                            scores[rows[team_id], week - 1] = getattr(box_score, f"{side}_score")
+                            projected[rows[team_id], week - 1] = getattr(box_score, f"{side}_projected", np.nan)
+                finalized.add(week)
+
+            if in_place:
+                scores.flush()
+                projected.flush()
+            else:
+                # Replace rather than truncate, so readers still mapping the old files are unaffected
+                for name, matrix in (("scores", scores), ("projected", projected)):
+                    path = os.path.join(directory, f"{name}.npy")
+                    with open(f"{path}.tmp", "wb") as f:
+                        np.save(f, matrix)
+                    os.replace(f"{path}.tmp", path)
+            del scores, projected
+
+            meta_path = os.path.join(directory, "meta.json")
+            with open(f"{meta_path}.tmp", "w") as f:
+                json.dump({"team_ids": row_ids, "finalized_weeks": sorted(finalized)}, f)
+            os.replace(f"{meta_path}.tmp", meta_path)
+
+        logger.info(f"Score matrix for league {league_id} ({year}) updated with weeks {sorted(weeks)}")
+
+# Global score matrix store instance
+score_matrix_store = ScoreMatrixStore()
@@ -0,0 +1,254 @@
+"""
+Scoreboard Watcher
+Polls the active league's box scores on a game-window-aware cadence and emits typed diff events
+only when something actually changed
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable, Set, Tuple
+import logging
+
+from app.services.espn_service import ESPNService
+from app.services.game_windows import game_calendar, league_phase_offset
+from app.services.league_history_store import get_history_store
+
+logger = logging.getLogger(__name__)
+
+# Recent events kept for the status endpoint
+RECENT_EVENTS = 100
+
+class ScoreboardEventType(str, Enum):
+    SCORE_CHANGED = "score_changed"
+    LINEUP_CHANGED = "lineup_changed"
+    MATCHUP_FINAL = "matchup_final"
+
+@dataclass(frozen=True)
+class ScoreboardEvent:
+    """One detected change to a matchup"""
+    type: ScoreboardEventType
+    league_id: int
+    week: int
+    matchup_id: str  # Bet format: home_team_id-away_team_id-week
+    data: Dict[str, Any]
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.type.value,
+            'league_id': self.league_id,
+            'week': self.week,
+            'matchup_id': self.matchup_id,
+            'data': self.data,
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat()
+        }
+
+EventHandler = Callable[[ScoreboardEvent], Awaitable[None]]
+
+class ScoreboardWatcher:
+    """
+    Single poller for the active league's current-week box scores
+
+    Each matchup's scores and starting lineups are hashed separately; a poll only emits
+    events for the parts whose hash changed, and the first sight of a week is taken as the
+    baseline. Once a week's last game has ended and settled (game_calendar.last_final_week),
+    its matchups are read one last time and reported final. Settled weeks are recorded in
+    the league history store only after every subscriber handled their final events, so a
+    restart or a failed settlement re-reports the week instead of skipping it. Consumers
+    subscribe instead of polling ESPN themselves.
+
+    The gap between polls comes from the game-window calendar: seconds while games are
+    live, minutes around kickoff, hours midweek. Each week's kickoff times are loaded from
+    ESPN's pro schedule so the windows match the real slate.
+    """
+
+    def __init__(self):
+        self.league_id: Optional[int] = None
+        self.week: Optional[int] = None
+        self.kickoff_week: Optional[int] = None
+        self.polls = 0
+        self.live = False
+        self.last_poll: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.events_emitted = 0
+        self.recent_events: deque = deque(maxlen=RECENT_EVENTS)
+        self._fingerprints: Dict[Tuple[int, int, str], Dict[str, str]] = {}
+        self._finalized: Set[Tuple[int, int, str]] = set()
+        self._subscribers: List[Tuple[EventHandler, Optional[Set[ScoreboardEventType]]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, handler: EventHandler, event_types: Optional[Iterable[ScoreboardEventType]] = None):
+        """
+        Register an async handler for scoreboard events
+
+        Args:
+            handler: Coroutine function called with each event
+            event_types: Only deliver these types (all types by default)
+        """
+        self._subscribers.append((handler, set(event_types) if event_types else None))
+
+    async def start(self):
+        """Start the background poll loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Scoreboard watcher started ({game_calendar.phase().value} phase)")
+
+    async def stop(self):
+        """Stop the background poll loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Scoreboard watcher stopped")
+
+    async def _run(self):
+        """Poll on a loop at the calendar's cadence"""
+        spread = True
+        while True:
+            await self.poll_once()
+            delay = game_calendar.poll_interval()
+            if spread and self.league_id:
+                # Offset each league within its first interval so leagues do not poll in step
+                delay += league_phase_offset(self.league_id, min(delay, 60))
+                spread = False
+            await asyncio.sleep(delay)
+
+    async def poll_once(self) -> List[ScoreboardEvent]:
+        """
+        Fetch the current week (and a just-finished week) and publish any changes
+
+        Returns:
+            Events emitted by this poll
+        """
+        try:
+            espn_service = await asyncio.to_thread(ESPNService)
+            league = espn_service.league
+            if not league:
+                return []
+
+            league_id = espn_service.league_id
+            current_week = league.current_week
+            self.league_id = league_id
+            self.polls += 1
+
+            if self.kickoff_week != current_week:
+                kickoffs = await espn_service.get_kickoffs_async(current_week)
+                if kickoffs:
+                    game_calendar.set_kickoffs(kickoffs)
+                    self.kickoff_week = current_week
+
+            last_final_week = await asyncio.to_thread(game_calendar.last_final_week, league)
+            store = get_history_store()
+            settled = await asyncio.to_thread(store.settled_weeks, league_id, league.year)
+            finished_weeks = [week for week in range(1, last_final_week + 1) if week not in settled]
+
+            box_scores = await espn_service.get_box_scores_async(finished_weeks + [current_week])
+
+            events: List[ScoreboardEvent] = []
+            for week in finished_weeks:
+                events.extend(self._diff_week(league_id, week, box_scores.get(week, []), final=True))
+            events.extend(self._diff_week(league_id, current_week, box_scores.get(current_week, []), final=False))
+
+            self.week = current_week
+            self.live = any(event.type == ScoreboardEventType.SCORE_CHANGED for event in events)
+            game_calendar.set_live(self.live)
+            self.last_poll = datetime.now()
+            self.last_error = None
+
+            failed_weeks = await self._publish(events)
+            for week in finished_weeks:
+                # A week ESPN returned nothing for, or whose settlement failed, is retried on the next poll
+                if box_scores.get(week) and week not in failed_weeks:
+                    await asyncio.to_thread(store.mark_week_settled, league_id, league.year, week)
+                else:
+                    self._forget_final(league_id, week)
+            return events
+
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error polling scoreboard: {e}")
+            return []
+
+    def _diff_week(self, league_id: int, week: int, box_scores: List[Dict[str, Any]], final: bool) -> List[ScoreboardEvent]:
+        """Compare one week's box scores with the previous poll"""
+        events = []
+        for box_score in box_scores:
+            home, away = box_score['home_team'], box_score['away_team']
+            matchup_id = f"{home['espn_team_id']}-{away['espn_team_id']}-{week}"
+            key = (league_id, week, matchup_id)
+            if key in self._finalized:
+                continue
+
+            scores = {'home_score': home['score'], 'away_score': away['score']}
+            lineups = {'home_lineup': self._lineup(home), 'away_lineup': self._lineup(away)}
+            fingerprint = {'score': self._hash(scores), 'lineup': self._hash(lineups)}
+            previous = self._fingerprints.get(key)
+            self._fingerprints[key] = fingerprint
+
+            if previous and previous['score'] != fingerprint['score']:
+                events.append(ScoreboardEvent(ScoreboardEventType.SCORE_CHANGED, league_id, week, matchup_id, scores))
+            if previous and previous['lineup'] != fingerprint['lineup']:
+                events.append(ScoreboardEvent(ScoreboardEventType.LINEUP_CHANGED, league_id, week, matchup_id, lineups))
+            if final:
+                events.append(ScoreboardEvent(ScoreboardEventType.MATCHUP_FINAL, league_id, week, matchup_id, scores))
+                self._finalized.add(key)
+                del self._fingerprints[key]
+        return events
+
+    def _forget_final(self, league_id: int, week: int):
+        """Let a week's matchups be reported final again"""
+        self._finalized = {key for key in self._finalized if key[:2] != (league_id, week)}
+
+    @staticmethod
+    def _lineup(team: Dict[str, Any]) -> List[List[str]]:
+        """Who is in which slot; points are covered by the score hash"""
+        return sorted([player['name'], player['slot_position']] for player in team.get('lineup', []))
+
+    @staticmethod
+    def _hash(value: Any) -> str:
+        return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+    async def _publish(self, events: List[ScoreboardEvent]) -> Set[int]:
+        """Deliver events to subscribers; one failing handler does not block the others. Returns weeks with a failed delivery"""
+        failed_weeks: Set[int] = set()
+        for event in events:
+            self.events_emitted += 1
+            self.recent_events.append(event)
+            for handler, event_types in self._subscribers:
+                if event_types and event.type not in event_types:
+                    continue
+                try:
+                    await handler(event)
+                except Exception as e:
+                    failed_weeks.add(event.week)
+                    logger.error(f"Scoreboard event handler {getattr(handler, '__qualname__', handler)} failed: {e}")
+        return failed_weeks
+
+    def get_status(self) -> Dict[str, Any]:
+        """Watcher state for monitoring"""
+        return {
+            'running': bool(self._task and not self._task.done()),
+            'live': self.live,
+            'week': self.week,
+            'polls': self.polls,
+            'calendar': game_calendar.get_status(),
+            'tracked_matchups': len(self._fingerprints),
+            'subscribers': len(self._subscribers),
+            'events_emitted': self.events_emitted,
+            'recent_events': [event.to_dict() for event in self.recent_events],
+            'last_poll': self.last_poll.isoformat() if self.last_poll else None,
+            'last_error': self.last_error
+        }
+
+# Global scoreboard watcher instance
+scoreboard_watcher = ScoreboardWatcher()
@@ -0,0 +1,131 @@
+"""
+Single-Flight Coalescing
+Concurrent callers asking for the same upstream ESPN query share one in-flight fetch and its result
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Callable, Awaitable, Hashable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """One in-flight sync fetch and what it produced"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent calls for both threads and coroutines
+
+    Keys are tuples whose first element names the endpoint (e.g. ("box_scores", league_id,
+    year, week)); metrics are grouped by that name. Nothing is cached: once a fetch finishes
+    the key is released and the next caller fetches again, so upstream load is bounded by
+    the number of distinct queries in flight rather than by concurrent users. Every caller
+    receives the same result object, which must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "executions": 0, "coalesced": 0})
+
+    def _count(self, key: Tuple, coalesced: bool):
+        stats = self._stats[str(key[0])]
+        stats["calls"] += 1
+        stats["coalesced" if coalesced else "executions"] += 1
+
+    def do(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all threads calling with the same key at the same time
+
+        Args:
+            key: Query identity, endpoint name first
+            fn: Blocking fetch to run if no identical fetch is in flight
+
+        Returns:
+            The fetch result (re-raises the fetch's exception for every waiter)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+            self._count(key, coalesced=not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"Single-flight {key} served {call.waiters} coalesced callers")
+
+    async def do_async(self, key: Tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all coroutines calling with the same key at the same time
+
+        The fetch runs as its own task, so a caller that is cancelled does not cancel it
+        for the others.
+
+        Args:
+            key: Query identity, endpoint name first
+            fn: Coroutine factory to run if no identical fetch is in flight
+
+        Returns:
+            The fetch result
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._release_task(key, task))
+            self._count(key, coalesced=not leader)
+
+        return await asyncio.shield(task)
+
+    def _release_task(self, key: Tuple, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Calls, upstream executions and coalesced calls per endpoint"""
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._stats.items()}
+            in_flight = len(self._calls) + len(self._tasks)
+
+        calls = sum(stats["calls"] for stats in endpoints.values())
+        coalesced = sum(stats["coalesced"] for stats in endpoints.values())
+        return {
+            "endpoints": endpoints,
+            "calls": calls,
+            "executions": calls - coalesced,
+            "coalesced": coalesced,
+            "coalesced_rate": round(coalesced / calls, 4) if calls else 0.0,
+            "in_flight": in_flight
+        }
+
+# Global single-flight group for ESPN fetches
+espn_single_flight = SingleFlight()
@@ -0,0 +1,281 @@
+"""
+Token Economy Simulator
+Projects season-long token balance distributions and leaderboard volatility for an allocation policy
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import numpy as np
+
+from app.core.database import get_supabase
+from app.models.token import TokenAllocationPolicy
+from app.services.league_registry import league_registry
+
+logger = logging.getLogger(__name__)
+
+# Allocation the historical bets were placed under (TokenBalanceBase.starting_balance)
+HISTORICAL_WEEKLY_ALLOCATION = 1000
+# Bets read per request when loading history (at or below the PostgREST max rows setting)
+HISTORY_PAGE_SIZE = 1000
+# Most recent bets sampled from history; older bets add little to the resampled distributions
+MAX_HISTORY_BETS = 20000
+
+class LeaderboardTracker:
+    """
+    Week-by-week leaderboard statistics accumulated as the season is simulated
+
+    Only the previous week's ranks are kept, so memory is (iterations, bettors) however
+    many weeks are simulated.
+    """
+
+    def __init__(self, iterations: int, weeks: int):
+        self.midseason_week = weeks // 2
+        self.rank_change_total = 0.0
+        self.leader_changes = np.zeros(iterations)
+        self.median_by_week: List[float] = []
+        self.ranks: Optional[np.ndarray] = None
+        self.leaders: Optional[np.ndarray] = None
+        self.midseason_leaders: Optional[np.ndarray] = None
+
+    def add_week(self, week: int, tokens: np.ndarray):
+        """Rank one week's (iterations, bettors) leaderboard (0 = leader) against the previous week"""
+        ranks = np.argsort(np.argsort(-tokens, axis=1), axis=1)
+        leaders = ranks.argmin(axis=1)
+        if self.ranks is not None:
+            self.rank_change_total += float(np.abs(ranks - self.ranks).sum())
+            self.leader_changes += leaders != self.leaders
+        if week == self.midseason_week:
+            self.midseason_leaders = leaders
+        self.median_by_week.append(float(np.median(tokens)))
+        self.ranks, self.leaders = ranks, leaders
+
+class TokenEconomySimulator:
+    """Vectorized Monte Carlo simulator of league-wide betting (iterations x bettors, stepped by week)"""
+
+    # Betting behavior used when the bets table has no usable history
+    DEFAULT_BET_AMOUNTS = [50, 100, 200]
+    DEFAULT_BET_ODDS = [-110]
+    DEFAULT_BETS_PER_WEEK = [3]
+    DEFAULT_BETTORS = 10
+
+    def __init__(self, iterations: int = 5000):
+        self.iterations = iterations
+        self.supabase = get_supabase()
+        self.rng = np.random.default_rng()
+
+    def set_seed(self, seed: int):
+        """Set random seed for reproducible results"""
+        self.rng = np.random.default_rng(seed)
+
+    def load_betting_history(self, espn_league_id: Optional[int] = None, season: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Load historical bet sizes, odds and weekly bet counts for one league season
+
+        Bets are scoped through the season's teams rows, newest first, and read in pages so
+        the PostgREST row cap cannot silently truncate the sample.
+
+        Args:
+            espn_league_id: ESPN league ID (defaults to the active league configuration)
+            season: Season year (defaults to the active league configuration)
+
+        Returns:
+            Dictionary with bet_amounts, odds, bets_per_week arrays and bettor count
+        """
+        try:
+            if not self.supabase:
+                return self._default_history()
+
+            team_ids = self._season_team_ids(espn_league_id, season)
+            if not team_ids:
+                return self._default_history()
+
+            bets = []
+            while len(bets) < MAX_HISTORY_BETS:
+                start = len(bets)
+                response = (
+                    self.supabase.table("bets").select("team_id, week, bet_amount, odds")
+                    .in_("team_id", team_ids)
+                    .order("created_at", desc=True)
+                    .range(start, start + HISTORY_PAGE_SIZE - 1)
+                    .execute()
+                )
+                bets.extend(response.data)
+                if len(response.data) < HISTORY_PAGE_SIZE:
+                    break
+
+            bets = [bet for bet in bets if bet.get("bet_amount") and bet.get("odds")]
+            if not bets:
+                return self._default_history()
+
+            weekly_counts: Dict[tuple, int] = {}
+            for bet in bets:
+                key = (bet["team_id"], bet["week"])
+                weekly_counts[key] = weekly_counts.get(key, 0) + 1
+
+            return {
+                "bet_amounts": np.array([bet["bet_amount"] for bet in bets], dtype=float),
+                "odds": np.array([bet["odds"] for bet in bets], dtype=float),
+                "bets_per_week": np.array(list(weekly_counts.values()), dtype=int),
+                "bettors": len({bet["team_id"] for bet in bets}),
+                "source": "bets_table",
+                "sample_size": len(bets)
+            }
+
+        except Exception as e:
+            logger.error(f"Error loading betting history: {e}")
+            return self._default_history()
+
+    def _season_team_ids(self, espn_league_id: Optional[int], season: Optional[int]) -> List[str]:
+        """teams row IDs (what bets.team_id references) for a league season"""
+        if espn_league_id is None or season is None:
+            config = league_registry.get_active_config()
+            if not config:
+                return []
+            espn_league_id, season = config["espn_league_id"], config["season"]
+
+        league = self.supabase.table("leagues").select("id").eq("espn_league_id", str(espn_league_id)).eq("season", season).execute()
+        if not league.data:
+            return []
+
+        teams = self.supabase.table("teams").select("id").eq("league_id", league.data[0]["id"]).execute()
+        return [team["id"] for team in teams.data]
+
+    def _default_history(self) -> Dict[str, Any]:
+        """Fallback betting behavior when no history is available"""
+        return {
+            "bet_amounts": np.array(self.DEFAULT_BET_AMOUNTS, dtype=float),
+            "odds": np.array(self.DEFAULT_BET_ODDS, dtype=float),
+            "bets_per_week": np.array(self.DEFAULT_BETS_PER_WEEK, dtype=int),
+            "bettors": self.DEFAULT_BETTORS,
+            "source": "defaults",
+            "sample_size": 0
+        }
+
+    def simulate_season(
+        self,
+        policy: TokenAllocationPolicy,
+        weeks: int = 17,
+        bettors: Optional[int] = None,
+        history: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Simulate a season of betting under an allocation policy
+
+        Each bettor places a resampled number of bets per week; each bet resamples a historical
+        (stake, odds) pair, scales the stake to the policy's allocation, caps it at the current
+        balance, and wins with the odds' implied probability, paying out like BettingService.
+
+        Args:
+            policy: Allocation policy to evaluate
+            weeks: Number of weeks in the season
+            bettors: Number of bettors (defaults to the number seen in history)
+            history: Betting history (defaults to load_betting_history())
+
+        Returns:
+            Dictionary with balance distribution and leaderboard volatility statistics
+        """
+        try:
+            history = history or self.load_betting_history()
+            bettors = bettors or history["bettors"] or self.DEFAULT_BETTORS
+            shape = (self.iterations, bettors)
+
+            stake_fractions = history["bet_amounts"] / HISTORICAL_WEEKLY_ALLOCATION
+            odds = history["odds"]
+            bets_per_week = history["bets_per_week"]
+
+            # Fair win probability and per-token profit for each historical bet
+            win_probability = np.where(odds > 0, 100 / (odds + 100), -odds / (-odds + 100))
+            profit_per_token = np.where(odds > 0, odds / 100, 100 / np.abs(odds))
+
+            balance = np.zeros(shape)
+            season_tokens = np.zeros(shape)
+            busted_weeks = np.zeros(shape)
+            leaderboard = LeaderboardTracker(self.iterations, weeks)
+
+            for week in range(weeks):
+                if policy.carry_over:
+                    balance = balance + policy.weekly_allocation
+                    if policy.balance_cap is not None:
+                        balance = np.minimum(balance, policy.balance_cap)
+                else:
+                    balance = np.full(shape, float(policy.weekly_allocation))
+
+                bet_counts = self.rng.choice(bets_per_week, size=shape)
+                for bet_number in range(int(bets_per_week.max())):
+                    picks = self.rng.integers(0, len(odds), size=shape)
+                    stakes = np.minimum(np.rint(stake_fractions[picks] * policy.weekly_allocation), balance)
+                    stakes = np.where(bet_counts > bet_number, stakes, 0)
+
+                    won = self.rng.random(shape) < win_probability[picks]
+                    payouts = np.where(won, stakes + np.floor(stakes * profit_per_token[picks]), 0)
+                    balance = balance - stakes + payouts
+
+                busted_weeks += balance <= 0
+
+                # Leaderboard: live balance with carry-over, otherwise tokens banked across weeks
+                season_tokens = balance if policy.carry_over else season_tokens + balance
+                leaderboard.add_week(week, season_tokens)
+
+            return self._summarize(policy, season_tokens, leaderboard, busted_weeks, history, weeks, bettors)
+
+        except Exception as e:
+            logger.error(f"Error simulating token economy: {e}")
+            return {"error": str(e)}
+
+    def _summarize(
+        self,
+        policy: TokenAllocationPolicy,
+        final_tokens: np.ndarray,
+        leaderboard: "LeaderboardTracker",
+        busted_weeks: np.ndarray,
+        history: Dict[str, Any],
+        weeks: int,
+        bettors: int
+    ) -> Dict[str, Any]:
+        """Reduce final (iterations, bettors) tokens and the week-by-week leaderboard to summary statistics"""
+        percentiles = np.percentile(final_tokens, [5, 25, 50, 75, 95])
+
+        # Gini coefficient of final tokens within each simulated league
+        sorted_tokens = np.sort(final_tokens, axis=1)
+        positions = np.arange(1, bettors + 1)
+        totals = np.maximum(sorted_tokens.sum(axis=1), 1e-9)
+        gini = (2 * (sorted_tokens * positions).sum(axis=1) / (bettors * totals)) - (bettors + 1) / bettors
+
+        transitions = max(weeks - 1, 1)
+
+        return {
+            "policy": policy.model_dump(),
+            "weeks": weeks,
+            "bettors": bettors,
+            "iterations": self.iterations,
+            "history": {
+                "source": history["source"],
+                "sample_size": history["sample_size"],
+                "average_bet_amount": float(np.mean(history["bet_amounts"])),
+                "average_bets_per_week": float(np.mean(history["bets_per_week"]))
+            },
+            "final_balance_distribution": {
+                "mean": float(final_tokens.mean()),
+                "std_dev": float(final_tokens.std()),
+                "p5": float(percentiles[0]),
+                "p25": float(percentiles[1]),
+                "median": float(percentiles[2]),
+                "p75": float(percentiles[3]),
+                "p95": float(percentiles[4]),
+                "average_gini": float(gini.mean())
+            },
+            "median_balance_by_week": leaderboard.median_by_week,
+            "leaderboard_volatility": {
+                "mean_weekly_rank_change": float(leaderboard.rank_change_total / (transitions * self.iterations * bettors)),
+                "leader_change_rate": float(leaderboard.leader_changes.sum() / (transitions * self.iterations)),
+                "midseason_leader_wins_probability": float((leaderboard.midseason_leaders == leaderboard.leaders).mean()),
+                "bust_rate": float(busted_weeks.sum() / (weeks * self.iterations * bettors))
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def compare_policies(self, policies: List[TokenAllocationPolicy], weeks: int = 17) -> List[Dict[str, Any]]:
+        """Simulate several policies against the same betting history"""
+        history = self.load_betting_history()
+        return [self.simulate_season(policy, weeks=weeks, history=history) for policy in policies]
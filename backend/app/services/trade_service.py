@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import statistics
 from app.services.espn_service import ESPNService
+from app.services.activity_log import activity_log
 from app.core.database import get_supabase
 import logging
 
@@ -18,19 +19,14 @@ class TradeService:
             if not self.espn_service.league:
                 return []
             
-            # Get recent activity (trades)
-            recent_activity = self.espn_service.league.recent_activity(size=100, msg_type='trade')
+            # Trades from the local activity log (synced incrementally from ESPN)
+            trade_entries = activity_log.query(self.espn_service.league, action="TRADED", week=week, limit=100)
             
             trades_data = []
-            for activity in recent_activity:
-                if hasattr(activity, 'actions') and activity.actions:
-                    trade_data = self._parse_trade_activity(activity)
-                    if trade_data:
-                        trades_data.append(trade_data)
-            
-            # Filter by week if specified
-            if week:
-                trades_data = [trade for trade in trades_data if trade.get('week') == week]
+            for entry in trade_entries:
+                trade_data = self._parse_trade_activity(entry)
+                if trade_data:
+                    trades_data.append(trade_data)
             
             return trades_data
             
@@ -38,44 +34,44 @@ class TradeService:
             logger.error(f"Error getting league trades: {e}")
             return []
     
-    def _parse_trade_activity(self, activity) -> Optional[Dict[str, Any]]:
-        """Parse trade activity from ESPN"""
+    def _parse_trade_activity(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse a trade entry from the activity log"""
         try:
             # Extract trade information
             trade_data = {
-                "trade_id": getattr(activity, 'id', ''),
-                "date": getattr(activity, 'date', datetime.utcnow().isoformat()),
-                "week": getattr(activity, 'scoringPeriodId', 0),
+                "trade_id": entry["topic_id"],
+                "date": entry["date"],
+                "week": entry["week"] or 0,
                 "teams_involved": [],
                 "players_traded": [],
                 "trade_value": 0,
                 "trade_analysis": {}
             }
             
-            # Parse trade actions
-            if hasattr(activity, 'actions') and activity.actions:
-                for action in activity.actions:
-                    if hasattr(action, 'teamId') and hasattr(action, 'playerId'):
-                        team_id = action.teamId
-                        player_id = action.playerId
-                        
-                        # Get team name
-                        team_name = self._get_team_name(team_id)
-                        
-                        # Get player name
-                        player_name = self._get_player_name(player_id)
-                        
-                        trade_data["teams_involved"].append({
-                            "team_id": team_id,
-                            "team_name": team_name
-                        })
-                        
-                        trade_data["players_traded"].append({
-                            "player_id": player_id,
-                            "player_name": player_name,
-                            "team_id": team_id,
-                            "team_name": team_name
-                        })
+            # Parse trade actions (drops that came with the trade are skipped)
+            for action in entry["actions"]:
+                if action["action"] != "TRADED" or action["team_id"] is None or action["player_id"] is None:
+                    continue
+                team_id = action["team_id"]
+                player_id = action["player_id"]
+                
+                # Get team name
+                team_name = self._get_team_name(team_id)
+                
+                # Get player name
+                player_name = action["player_name"] or self._get_player_name(player_id)
+                
+                trade_data["teams_involved"].append({
+                    "team_id": team_id,
+                    "team_name": team_name
+                })
+                
+                trade_data["players_traded"].append({
+                    "player_id": player_id,
+                    "player_name": player_name,
+                    "team_id": team_id,
+                    "team_name": team_name
+                })
             
             # Remove duplicates
             trade_data["teams_involved"] = list({team["team_id"]: team for team in trade_data["teams_involved"]}.values())
@@ -96,9 +92,9 @@ class TradeService:
         """Get team name by ID"""
         try:
             if self.espn_service.league:
-                for team in self.espn_service.league.teams:
-                    if team.team_id == team_id:
-                        return team.team_name
+                team_name = self.espn_service.compact_league().team_name(team_id)
+                if team_name:
+                    return team_name
             return f"Team {team_id}"
         except:
             return f"Team {team_id}"
@@ -106,10 +102,11 @@ class TradeService:
     def _get_player_name(self, player_id: int) -> str:
         """Get player name by ID"""
         try:
-            if self.espn_service.league:
-                player_info = self.espn_service.league.player_info(player_id)
-                if player_info:
-                    return player_info.name
+            player_index = self.espn_service.player_index()
+            if player_index:
+                player_name = player_index.name(player_id)
+                if player_name:
+                    return player_name
             return f"Player {player_id}"
         except:
             return f"Player {player_id}"
@@ -292,10 +289,11 @@ class TradeService:
     def _get_player_position(self, player_id: int) -> str:
         """Get player position"""
         try:
-            if self.espn_service.league:
-                player_info = self.espn_service.league.player_info(player_id)
-                if player_info:
-                    return player_info.position
+            player_index = self.espn_service.player_index()
+            if player_index:
+                position = player_index.position(player_id)
+                if position:
+                    return position
             return "Unknown"
         except:
             return "Unknown"
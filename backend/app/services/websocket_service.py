@@ -261,6 +261,13 @@ class WebSocketService:
         except Exception as e:
             logger.error(f"Error broadcasting upset alert: {e}")
     
+    async def on_scoreboard_event(self, event):
+        """Scoreboard watcher subscriber: push score changes and lineup/final updates to the league's clients"""
+        if event.type.value == "score_changed":
+            await self.broadcast_score_update(str(event.league_id), event.to_dict())
+        else:
+            await self.broadcast_league_update(str(event.league_id), {'event': event.to_dict()})
+    
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get statistics about current connections"""
         return {
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+League History Ingestion
+Pulls every season of an ESPN league into the local history database (LEAGUE_HISTORY_DB);
+safe to rerun after an interruption, completed seasons and weeks are skipped
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.league_history_ingestion import LeagueHistoryIngestion, DEFAULT_SEASON_WORKERS
+from app.services.league_history_store import LeagueHistoryStore
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a league's seasons into the history database")
+    parser.add_argument("league_id", type=int)
+    parser.add_argument("latest_year", type=int, help="Most recent season; earlier seasons are discovered from it")
+    parser.add_argument("--espn-s2", default=os.getenv("ESPN_S2"))
+    parser.add_argument("--swid", default=os.getenv("SWID"))
+    parser.add_argument("--db", default=None, help="SQLite path (defaults to LEAGUE_HISTORY_DB)")
+    parser.add_argument("--years", type=int, nargs="*", help="Only these seasons")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SEASON_WORKERS, help="Seasons ingested at once")
+    parser.add_argument("--force", action="store_true", help="Re-ingest seasons already complete")
+    args = parser.parse_args()
+
+    print(f"📚 Ingesting ESPN league {args.league_id} history")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    ingestion = LeagueHistoryIngestion(args.league_id, args.espn_s2, args.swid, LeagueHistoryStore(args.db) if args.db else None)
+    years = args.years or ingestion.discover_seasons(args.latest_year)
+    print(f"Seasons: {', '.join(str(year) for year in years)}")
+
+    results = ingestion.ingest(years, workers=args.workers, force=args.force)
+    for year, result in results.items():
+        icon = {"complete": "✅", "partial": "🕒", "skipped": "⏭️ "}.get(result["status"], "❌")
+        detail = result.get("error") or f"{result.get('steps', 0)} steps"
+        print(f"   {icon} {year}: {result['status']} ({detail})")
+
+    print(f"\n🎉 Done in {time.perf_counter() - start:.1f}s -> {ingestion.store.path}")
+    return 0 if all(result["status"] != "failed" for result in results.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
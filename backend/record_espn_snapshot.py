@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+ESPN Snapshot Recorder
+Captures a league season's raw ESPN responses to disk so the app and tests can replay them offline
+(run the backend with ESPN_SNAPSHOT_MODE=replay to serve ESPNService from the recording)
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.espn_snapshot_store import EspnSnapshotStore, build_league
+
+def record_season(league_id: int, year: int, espn_s2=None, swid=None, root=None, weeks=None):
+    """Record league data plus every week's scoreboard and box scores"""
+    print(f"📼 Recording ESPN league {league_id} ({year})")
+    print("=" * 50)
+
+    store = EspnSnapshotStore(root)
+    start = time.perf_counter()
+    league = build_league(league_id, year, espn_s2, swid, mode="record", store=store)
+    print(f"✅ League data recorded ({len(league.teams)} teams, current week {league.current_week})")
+
+    last_week = weeks or max(league.current_week, 1)
+    for week in range(1, last_week + 1):
+        league.scoreboard(week)
+        league.box_scores(week)
+        print(f"   Week {week}: scoreboard and box scores recorded")
+
+    league.recent_activity(size=100)
+    print("✅ Recent activity recorded")
+
+    recorded = store.list_snapshots(league_id, year)
+    print(f"\n🎉 Recorded {len(recorded)} responses to {store.root} in {time.perf_counter() - start:.1f}s")
+    return recorded
+
+def verify_replay(league_id: int, year: int, root=None, weeks=None):
+    """Rebuild the league from the recording without network access"""
+    print("\n🔁 Verifying replay")
+    print("-" * 40)
+
+    start = time.perf_counter()
+    league = build_league(league_id, year, mode="replay", store=EspnSnapshotStore(root))
+    for week in range(1, (weeks or max(league.current_week, 1)) + 1):
+        league.box_scores(week)
+    print(f"✅ Replayed league with {len(league.teams)} teams in {time.perf_counter() - start:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Record ESPN responses for offline replay")
+    parser.add_argument("league_id", type=int)
+    parser.add_argument("year", type=int)
+    parser.add_argument("--espn-s2", default=os.getenv("ESPN_S2"))
+    parser.add_argument("--swid", default=os.getenv("SWID"))
+    parser.add_argument("--dir", default=None, help="Snapshot directory (defaults to ESPN_SNAPSHOT_DIR)")
+    parser.add_argument("--weeks", type=int, default=None, help="Record weeks 1..N (defaults to current week)")
+    args = parser.parse_args()
+
+    record_season(args.league_id, args.year, args.espn_s2, args.swid, args.dir, args.weeks)
+    verify_replay(args.league_id, args.year, args.dir, args.weeks)
+
+if __name__ == "__main__":
+    main()
@@ -93,6 +93,23 @@ def setup_database():
             );
             """,
             
+            # Odds history table (append-only line movement)
+            """
+            CREATE TABLE IF NOT EXISTS odds_history (
+                id BIGSERIAL PRIMARY KEY,
+                league_id VARCHAR(50),
+                season INTEGER,
+                week INTEGER NOT NULL,
+                matchup_id VARCHAR(50) NOT NULL,
+                ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                home_moneyline INTEGER,
+                away_moneyline INTEGER,
+                spread DECIMAL(5,1),
+                total DECIMAL(6,1),
+                source VARCHAR(50) NOT NULL DEFAULT 'espn_model'
+            );
+            """,
+            
             # Create indexes for performance
             """
             CREATE INDEX IF NOT EXISTS idx_teams_league_id ON teams(league_id);
@@ -106,6 +123,32 @@ def setup_database():
             """
             CREATE INDEX IF NOT EXISTS idx_token_transactions_team_week ON token_transactions(team_id, week);
             """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_odds_history_season_matchup_ts ON odds_history(league_id, season, matchup_id, ts);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_odds_history_season_week_ts ON odds_history(league_id, season, week, ts);
+            """,
+            
+            # Closing line per matchup: each week's matchups, then the newest row of each through the matchup index
+            """
+            CREATE OR REPLACE FUNCTION odds_history_closing_lines(p_league_id VARCHAR, p_season INTEGER, p_week INTEGER)
+            RETURNS SETOF odds_history
+            LANGUAGE sql STABLE
+            AS $$
+                SELECT latest.*
+                FROM (
+                    SELECT DISTINCT matchup_id FROM odds_history
+                    WHERE league_id = p_league_id AND season = p_season AND week = p_week
+                ) matchups
+                CROSS JOIN LATERAL (
+                    SELECT * FROM odds_history h
+                    WHERE h.league_id = p_league_id AND h.season = p_season AND h.matchup_id = matchups.matchup_id
+                    ORDER BY h.ts DESC
+                    LIMIT 1
+                ) latest;
+            $$;
+            """,
         ]
         
         # Execute SQL commands
@@ -207,12 +250,51 @@ def print_manual_setup():
         );
         """,
         
+        # Odds history table (append-only line movement)
+        """
+        CREATE TABLE IF NOT EXISTS odds_history (
+            id BIGSERIAL PRIMARY KEY,
+            league_id VARCHAR(50),
+            season INTEGER,
+            week INTEGER NOT NULL,
+            matchup_id VARCHAR(50) NOT NULL,
+            ts TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            home_moneyline INTEGER,
+            away_moneyline INTEGER,
+            spread DECIMAL(5,1),
+            total DECIMAL(6,1),
+            source VARCHAR(50) NOT NULL DEFAULT 'espn_model'
+        );
+        """,
+        
         # Indexes
         """
         CREATE INDEX IF NOT EXISTS idx_teams_league_id ON teams(league_id);
         CREATE INDEX IF NOT EXISTS idx_token_balances_team_week ON token_balances(team_id, week);
         CREATE INDEX IF NOT EXISTS idx_users_espn_id ON users(espn_user_id);
         CREATE INDEX IF NOT EXISTS idx_token_transactions_team_week ON token_transactions(team_id, week);
+        CREATE INDEX IF NOT EXISTS idx_odds_history_season_matchup_ts ON odds_history(league_id, season, matchup_id, ts);
+        CREATE INDEX IF NOT EXISTS idx_odds_history_season_week_ts ON odds_history(league_id, season, week, ts);
+        """,
+        
+        # Closing line per matchup
+        """
+        CREATE OR REPLACE FUNCTION odds_history_closing_lines(p_league_id VARCHAR, p_season INTEGER, p_week INTEGER)
+        RETURNS SETOF odds_history
+        LANGUAGE sql STABLE
+        AS $$
+            SELECT latest.*
+            FROM (
+                SELECT DISTINCT matchup_id FROM odds_history
+                WHERE league_id = p_league_id AND season = p_season AND week = p_week
+            ) matchups
+            CROSS JOIN LATERAL (
+                SELECT * FROM odds_history h
+                WHERE h.league_id = p_league_id AND h.season = p_season AND h.matchup_id = matchups.matchup_id
+                ORDER BY h.ts DESC
+                LIMIT 1
+            ) latest;
+        $$;
         """,
     ]
     
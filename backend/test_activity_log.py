@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the incrementally synced activity log
+Checks that syncs walk ESPN's feed only down to the newest topic already stored
+"""
+
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import activity_log as activity_log_module
+from app.services.activity_log import ActivityLog, ACTIVITY_PAGE_SIZE
+from app.services.league_history_store import LeagueHistoryStore
+
+LEAGUE_ID = 4242
+YEAR = 2024
+
+def make_topic(n: int):
+    """One waiver claim topic; larger n is newer"""
+    return {
+        'id': f"topic-{n}",
+        'date': 1_700_000_000_000 + n * 60_000,
+        'messages': [{'messageTypeId': 180, 'to': n % 10 + 1, 'targetId': 1000 + n, 'from': n}]
+    }
+
+class FakeRequests:
+    """Serves a newest-first feed the way ESPN's communication endpoint pages it"""
+    def __init__(self, feed):
+        self.feed = feed
+        self.offsets = []
+
+    def league_get(self, extend=None, params=None, headers=None):
+        topics_filter = json.loads(headers['x-fantasy-filter'])['topics']
+        offset, limit = topics_filter['offset'], topics_filter['limit']
+        self.offsets.append(offset)
+        return {'topics': self.feed[offset:offset + limit]}
+
+class FakeLeague:
+    def __init__(self, feed):
+        self.league_id = LEAGUE_ID
+        self.year = YEAR
+        self.espn_request = FakeRequests(feed)
+
+def make_activity_log(directory: str) -> ActivityLog:
+    activity_log = ActivityLog(LeagueHistoryStore(os.path.join(directory, "history.sqlite3")))
+    activity_log._week_end_dates = lambda league: []
+    return activity_log
+
+def test_sync_stops_at_known_topic():
+    """A later sync fetches one page and stores only the topics newer than the log"""
+    print("📜 Testing incremental activity sync")
+    print("-" * 40)
+
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.object(activity_log_module.player_index_registry, 'get_index', return_value=None):
+        activity_log = make_activity_log(directory)
+        feed = [make_topic(n) for n in range(30, 0, -1)]
+        league = FakeLeague(feed)
+
+        assert activity_log.sync(league, force=True) == 30
+        assert league.espn_request.offsets == [0, ACTIVITY_PAGE_SIZE], league.espn_request.offsets
+
+        feed[:0] = [make_topic(n) for n in range(33, 30, -1)]
+        league.espn_request.offsets = []
+        assert activity_log.sync(league, force=True) == 3, "only the three new topics should be stored"
+        assert league.espn_request.offsets == [0], "sync should stop on the first page"
+
+        assert activity_log.sync(league, force=True) == 0
+        entries = activity_log.store.query_activity_log(LEAGUE_ID, YEAR, limit=100)
+        assert [entry['topic_id'] for entry in entries[:3]] == ["topic-33", "topic-32", "topic-31"]
+        assert len(entries) == 33
+        assert entries[0]['actions'][0]['action'] == "WAIVER ADDED"
+        assert entries[0]['actions'][0]['bid_amount'] == 33
+
+        bids = activity_log.store.get_bidding_history(LEAGUE_ID, YEAR)
+        assert len(bids) == 33 and bids[0]['bid_amount'] == 33, "bidding history should read the activity log"
+    print("✅ Sync stopped at the newest stored topic")
+
+def main():
+    """Run the activity log tests"""
+    print("🚀 Activity Log Tests")
+    print("=" * 50)
+
+    test_sync_stops_at_known_topic()
+
+    print("\n🎉 All activity log tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tests for the ESPN resilience layer
+Covers breaker trips, stale serving, half-open probes that never reach ESPN, zero-valued settings,
+all-or-nothing rate-limit tokens and non-retryable errors leaving the breaker alone
+"""
+
+import sys
+import os
+import time
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+from app.core.config import settings
+from app.services import espn_resilience as resilience_module
+from app.services.espn_resilience import ESPNResilience, CircuitOpenError
+from espn_api.requests.espn_requests import ESPNAccessDenied
+
+LEAGUE_ID = 1
+
+def make_resilience(**overrides) -> ESPNResilience:
+    """Resilience layer with fast settings (no backoff sleeps, short breaker reset)"""
+    values = {'ESPN_MAX_RETRIES': 0, 'ESPN_BREAKER_FAILURES': 2, 'ESPN_BREAKER_RESET': 0.05, **overrides}
+    with mock.patch.multiple(settings, create=True, **values):
+        return ESPNResilience()
+
+def server_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://fantasy.espn.com")
+    return httpx.HTTPStatusError("boom", request=request, response=httpx.Response(503, request=request))
+
+def failing_fetch():
+    raise server_error()
+
+def test_breaker_opens_and_serves_stale():
+    """Repeated failures open the breaker; cached results are served while it is open"""
+    print("🔌 Testing breaker trip and stale serving")
+    print("-" * 40)
+
+    resilience = make_resilience()
+    key = ("teams", LEAGUE_ID)
+    assert resilience.call(key, LEAGUE_ID, lambda: ["fresh"]) == ["fresh"]
+
+    for _ in range(2):
+        assert resilience.call(key, LEAGUE_ID, failing_fetch) == ["fresh"], "stale result should be served"
+    assert resilience.breaker(LEAGUE_ID).state == "open", "breaker should open after 2 failures"
+
+    calls = []
+    assert resilience.call(key, LEAGUE_ID, lambda: calls.append(1)) == ["fresh"]
+    assert not calls, "open breaker should not call ESPN"
+
+    try:
+        resilience.call(("matchups", LEAGUE_ID), LEAGUE_ID, lambda: calls.append(1))
+        assert False, "open breaker with nothing cached should raise"
+    except CircuitOpenError:
+        pass
+
+    stats = resilience.get_stats()
+    assert stats["short_circuited"] == 2 and stats["stale_served"] == 3, stats
+    print("✅ Breaker opened and stale data served")
+
+def test_rate_limited_probe_releases_breaker():
+    """A half-open probe that cannot get a rate-limit token leaves the next call free to probe"""
+    print("\n🚦 Testing rate-limited half-open probe")
+    print("-" * 40)
+
+    resilience = make_resilience(ESPN_RATE_LIMIT_WAIT=0)
+    key = ("teams", LEAGUE_ID)
+    for _ in range(2):
+        try:
+            resilience.call(key, LEAGUE_ID, failing_fetch)
+        except httpx.HTTPStatusError:
+            pass
+    breaker = resilience.breaker(LEAGUE_ID)
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+
+    # Drain the league bucket so the probe is rate limited before it reaches ESPN
+    resilience._league_bucket(LEAGUE_ID).tokens = 0
+    with mock.patch.object(resilience._league_bucket(LEAGUE_ID), 'rate', 0.001):
+        try:
+            resilience.call(key, LEAGUE_ID, lambda: "probe")
+            assert False, "probe should be rate limited"
+        except resilience_module.RateLimitedError:
+            pass
+    assert not breaker.probing, "rate-limited probe should release the half-open slot"
+
+    resilience._league_bucket(LEAGUE_ID).tokens = 1
+    assert resilience.call(key, LEAGUE_ID, lambda: "recovered") == "recovered"
+    assert breaker.state == "closed", "successful probe should close the breaker"
+    print("✅ Breaker recovered after a rate-limited probe")
+
+def test_zero_settings_honoured():
+    """ESPN_MAX_RETRIES=0 means one attempt, and zero rates/thresholds disable the limit"""
+    print("\n0️⃣  Testing zero-valued settings")
+    print("-" * 40)
+
+    resilience = make_resilience(ESPN_BREAKER_FAILURES=0, ESPN_LEAGUE_RATE_LIMIT=0, ESPN_LEAGUE_RATE_BURST=0)
+    assert resilience.max_retries == 0
+
+    attempts = []
+    def fetch():
+        attempts.append(1)
+        raise server_error()
+
+    for _ in range(5):
+        try:
+            resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, fetch)
+        except httpx.HTTPStatusError:
+            pass
+    assert len(attempts) == 5, f"expected one attempt per call, got {len(attempts)}"
+    assert resilience.breaker(LEAGUE_ID).state == "closed", "threshold 0 should never open the breaker"
+    print("✅ Zero retries, unlimited league bucket and disabled breaker honoured")
+
+def test_rate_limit_takes_no_token_on_refusal():
+    """A fetch refused by the league bucket does not spend a global token"""
+    print("\n🪣 Testing all-or-nothing rate-limit tokens")
+    print("-" * 40)
+
+    resilience = make_resilience(ESPN_RATE_LIMIT_WAIT=0)
+    league_bucket = resilience._league_bucket(LEAGUE_ID)
+    league_bucket.tokens = 0
+    global_tokens = resilience.global_bucket.tokens
+
+    with mock.patch.object(league_bucket, 'rate', 0.001), mock.patch.object(resilience.global_bucket, 'rate', 0.001):
+        for _ in range(3):
+            try:
+                resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, lambda: "fetched")
+                assert False, "league bucket is empty"
+            except resilience_module.RateLimitedError:
+                pass
+        assert resilience.global_bucket.tokens >= global_tokens, "refused fetches should not drain the global bucket"
+
+        league_bucket.tokens = 1
+        assert resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, lambda: "fetched") == "fetched"
+        assert league_bucket.tokens < 1 and resilience.global_bucket.tokens < global_tokens, "a fetch takes one token from each"
+    print("✅ Tokens only taken when both buckets have one")
+
+def test_non_retryable_error_leaves_breaker_unchanged():
+    """Auth errors neither reset the failure count nor close a half-open breaker, but free the probe"""
+    print("\n🔐 Testing non-retryable errors and the breaker")
+    print("-" * 40)
+
+    resilience = make_resilience(ESPN_BREAKER_FAILURES=3)
+    breaker = resilience.breaker(LEAGUE_ID)
+
+    def denied():
+        raise ESPNAccessDenied("private league")
+
+    for _ in range(2):
+        try:
+            resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, failing_fetch)
+        except httpx.HTTPStatusError:
+            pass
+    try:
+        resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, denied)
+    except ESPNAccessDenied:
+        pass
+    assert breaker.failures == 2, "non-retryable error should not reset consecutive failures"
+
+    try:
+        resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, failing_fetch)
+    except httpx.HTTPStatusError:
+        pass
+    assert breaker.state == "open"
+    time.sleep(0.06)
+
+    try:
+        resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, denied)
+        assert False, "auth error should propagate"
+    except ESPNAccessDenied:
+        pass
+    assert breaker.state == "half_open", "non-retryable probe should not close the breaker"
+    assert not breaker.probing, "non-retryable probe should release the half-open slot"
+
+    assert resilience.call(("teams", LEAGUE_ID), LEAGUE_ID, lambda: "recovered") == "recovered"
+    assert breaker.state == "closed"
+    print("✅ Breaker state untouched by non-retryable errors")
+
+def main():
+    """Run the resilience tests"""
+    print("🚀 ESPN Resilience Tests")
+    print("=" * 50)
+
+    test_breaker_opens_and_serves_stale()
+    test_rate_limited_probe_releases_breaker()
+    test_zero_settings_honoured()
+    test_rate_limit_takes_no_token_on_refusal()
+    test_non_retryable_error_leaves_breaker_unchanged()
+
+    print("\n🎉 All ESPN resilience tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the start/sit lineup optimizer
+Covers week-specific projections and never starting players who are ruled out
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.lineup_optimizer import LineupOptimizer
+
+CURRENT_WEEK = 5
+TEAM_ID = 1
+OPPONENT_ID = 2
+
+def player(player_id, name, position, projected_points, injury_status="ACTIVE", lineup_slot="BE"):
+    """Roster entry in get_team_roster shape"""
+    return {
+        "player_id": player_id,
+        "name": name,
+        "position": position,
+        "lineup_slot": lineup_slot,
+        "eligible_slots": [position],
+        "injury_status": injury_status,
+        "points": 0.0,
+        "projected_points": projected_points
+    }
+
+class FakeESPNService:
+    """ESPNService stand-in whose rosters carry a different projection per scoring week"""
+
+    def __init__(self, rosters):
+        self.rosters = rosters
+        self.league = SimpleNamespace(current_week=CURRENT_WEEK, settings=SimpleNamespace(position_slot_counts={'QB': 1}))
+        self.roster_calls = []
+
+    def get_team_roster(self, team_id, week=None):
+        self.roster_calls.append((team_id, week))
+        return self.rosters[(team_id, week or CURRENT_WEEK)]
+
+    def get_matchups(self, week=None):
+        return [{
+            "week": week,
+            "home_team": {"espn_team_id": TEAM_ID, "name": "Home", "score": 0},
+            "away_team": {"espn_team_id": OPPONENT_ID, "name": "Away", "score": 0}
+        }]
+
+def make_optimizer(rosters) -> LineupOptimizer:
+    optimizer = LineupOptimizer(espn_service=FakeESPNService(rosters), iterations=2000)
+    optimizer.set_seed(7)
+    return optimizer
+
+def test_requested_week_projections():
+    """A future week is optimized from that week's projections, not the current week's"""
+    print("📅 Testing week-specific projections")
+    print("-" * 40)
+
+    rosters = {
+        # Current week: A is the better start; next week A is on bye
+        (TEAM_ID, CURRENT_WEEK): [player(10, "QB A", "QB", 25.0), player(11, "QB B", "QB", 15.0)],
+        (TEAM_ID, CURRENT_WEEK + 1): [player(10, "QB A", "QB", 0.0), player(11, "QB B", "QB", 18.0)],
+        (OPPONENT_ID, CURRENT_WEEK): [player(20, "Opp QB", "QB", 20.0, lineup_slot="QB")],
+        (OPPONENT_ID, CURRENT_WEEK + 1): [player(20, "Opp QB", "QB", 10.0, lineup_slot="QB")],
+    }
+
+    optimizer = make_optimizer(rosters)
+    result = optimizer.optimize_team_lineup(TEAM_ID, CURRENT_WEEK + 1)
+    assert result["week"] == CURRENT_WEEK + 1
+    assert [p["name"] for p in result["lineup"]] == ["QB B"], result["lineup"]
+    assert result["projected_points"] == 18.0
+    assert result["opponent_projected_points"] == 10.0, "opponent should use the same week's projections"
+    assert set(optimizer.espn_service.roster_calls) == {(TEAM_ID, CURRENT_WEEK + 1), (OPPONENT_ID, CURRENT_WEEK + 1)}
+
+    current = make_optimizer(rosters).optimize_team_lineup(TEAM_ID)
+    assert current["week"] == CURRENT_WEEK
+    assert [p["name"] for p in current["lineup"]] == ["QB A"], current["lineup"]
+    print("✅ Requested week's projections used for both teams")
+
+def test_unavailable_players_never_started():
+    """Players ruled out, suspended or on IR are benched even with the best projection"""
+    print("\n🚑 Testing unavailable players")
+    print("-" * 40)
+
+    rosters = {
+        (TEAM_ID, CURRENT_WEEK): [
+            player(10, "Out QB", "QB", 30.0, injury_status="OUT"),
+            player(11, "IR QB", "QB", 28.0, injury_status="INJURY_RESERVE", lineup_slot="IR"),
+            player(12, "Suspended QB", "QB", 26.0, injury_status="SUSPENSION"),
+            player(13, "Healthy QB", "QB", 12.0, injury_status="QUESTIONABLE"),
+        ],
+        (OPPONENT_ID, CURRENT_WEEK): [
+            player(20, "Opp QB", "QB", 15.0, lineup_slot="QB"),
+            player(21, "Opp Out QB", "QB", 20.0, injury_status="OUT", lineup_slot="QB"),
+        ],
+    }
+
+    result = make_optimizer(rosters).optimize_team_lineup(TEAM_ID, CURRENT_WEEK)
+    assert [p["name"] for p in result["lineup"]] == ["Healthy QB"], result["lineup"]
+    assert result["unavailable"] == ["Out QB", "IR QB", "Suspended QB"], result["unavailable"]
+    assert result["bench"] == []
+    assert result["opponent_projected_points"] == 15.0, "opponent's ruled-out starter should not count"
+
+    only_out = make_optimizer({}).optimize([player(10, "Out QB", "QB", 30.0, injury_status="OUT")], ["QB"], [])
+    assert only_out["lineup"] == [] and only_out["unavailable"] == ["Out QB"], only_out
+    print("✅ Unavailable players excluded from lineups")
+
+def main():
+    """Run the lineup optimizer tests"""
+    print("🚀 Lineup Optimizer Tests")
+    print("=" * 50)
+
+    test_requested_week_projections()
+    test_unavailable_players_never_started()
+
+    print("\n🎉 All lineup optimizer tests passed!")
+
+if __name__ == "__main__":
+    main()
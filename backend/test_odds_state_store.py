@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental odds repricing
+Checks that refreshes only reprice matchups whose projections changed, price them
+reproducibly, and only record lines that moved
+"""
+
+import sys
+import os
+from types import MappingProxyType
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.monte_carlo import MonteCarloSimulator
+from app.services.odds_service import OddsService, OddsSnapshot
+from app.services.odds_state_store import odds_state_store
+
+LEAGUE_ID = 99
+WEEK = 3
+
+class FakeESPNService:
+    """Just the attributes _reprice reads"""
+    league_id = LEAGUE_ID
+    year = 2024
+    league = None
+
+class FakeHistory:
+    """Collects the lines record_history would append"""
+    def __init__(self):
+        self.rows = []
+
+    def record_lines(self, odds_data, league_id, season, source="espn_model"):
+        self.rows.extend(odds_data)
+        return len(odds_data)
+
+def make_odds_service() -> OddsService:
+    """OddsService without ESPN/Supabase setup"""
+    odds_service = OddsService.__new__(OddsService)
+    odds_service.espn_service = FakeESPNService()
+    odds_service.monte_carlo = MonteCarloSimulator(iterations=2000)
+    odds_service.history = FakeHistory()
+    return odds_service
+
+def make_snapshot(team_stats) -> OddsSnapshot:
+    return OddsSnapshot(WEEK, WEEK, (), MappingProxyType({
+        team_id: MappingProxyType(stats) for team_id, stats in team_stats.items()
+    }))
+
+def make_matchups(scores=(0.0, 0.0, 0.0, 0.0)):
+    """Two matchups between teams 1-4 with the given live scores"""
+    def team(team_id, score):
+        return {'espn_team_id': team_id, 'name': f"Team {team_id}", 'score': score}
+    return [
+        {'home_team': team(1, scores[0]), 'away_team': team(2, scores[1])},
+        {'home_team': team(3, scores[2]), 'away_team': team(4, scores[3])},
+    ]
+
+TEAM_STATS = {
+    1: {'season_avg': 110.0, 'recent_avg': 115.0},
+    2: {'season_avg': 100.0, 'recent_avg': 98.0},
+    3: {'season_avg': 95.0, 'recent_avg': 102.0},
+    4: {'season_avg': 120.0, 'recent_avg': 118.0},
+}
+
+def test_unchanged_inputs_skip_repricing():
+    """A second refresh with identical inputs reprices and records nothing"""
+    print("🧊 Testing unchanged refresh")
+    print("-" * 40)
+
+    odds_state_store.invalidate(LEAGUE_ID)
+    odds_service = make_odds_service()
+    snapshot = make_snapshot(TEAM_STATS)
+
+    first = odds_service._reprice(make_matchups(), snapshot, WEEK)
+    assert first['changes']['recomputed_count'] == 2, first['changes']
+    assert odds_service.record_history(first) == 2
+
+    second = odds_service._reprice(make_matchups(), snapshot, WEEK)
+    assert second['changes']['recomputed_count'] == 0, second['changes']
+    assert second['changes']['unchanged_count'] == 2
+    assert odds_service.record_history(second) == 0, "unchanged refresh should not write history"
+    assert second['odds'] == first['odds']
+    print("✅ Unchanged matchups kept their stored lines")
+
+def test_changed_stats_reprice_only_that_matchup():
+    """A projection change reprices just the matchups of the affected team"""
+    print("\n✏️  Testing dirty matchup detection")
+    print("-" * 40)
+
+    odds_state_store.invalidate(LEAGUE_ID)
+    odds_service = make_odds_service()
+    odds_service._reprice(make_matchups(), make_snapshot(TEAM_STATS), WEEK)
+
+    changed_stats = {**TEAM_STATS, 1: {'season_avg': 110.0, 'recent_avg': 130.0}}
+    refresh = odds_service._reprice(make_matchups(), make_snapshot(changed_stats), WEEK)
+    changes = refresh['changes']
+    assert changes['recomputed'] == [f"1-2-{WEEK}"], changes
+    assert changes['unchanged'] == [f"3-4-{WEEK}"], changes
+    assert 'home_stats' in changes['changes'][0]['changed_inputs']
+    assert changes['changes'][0]['moved'], "a 15-point projection change should move the lines"
+    print("✅ Only the changed matchup was repriced")
+
+def test_score_only_change_keeps_lines():
+    """Live score updates neither reprice the lines nor write history"""
+    print("\n🏈 Testing score-only refresh")
+    print("-" * 40)
+
+    odds_state_store.invalidate(LEAGUE_ID)
+    odds_service = make_odds_service()
+    snapshot = make_snapshot(TEAM_STATS)
+    first = odds_service._reprice(make_matchups(), snapshot, WEEK)
+    ladders = {matchup_id: state.ladder for matchup_id, state in odds_state_store.get_week(LEAGUE_ID, WEEK).items()}
+
+    refresh = odds_service._reprice(make_matchups((42.5, 31.0, 12.0, 60.2)), snapshot, WEEK)
+    assert refresh['changes']['recomputed_count'] == 0, refresh['changes']
+    assert odds_service.record_history(refresh) == 0, "score-only refresh should not write history"
+    assert refresh['odds'] == first['odds']
+
+    states = odds_state_store.get_week(LEAGUE_ID, WEEK)
+    assert states[f"1-2-{WEEK}"].inputs['home_score'] == 42.5, "stored inputs should carry the new scores"
+    assert all(states[matchup_id].ladder == ladder for matchup_id, ladder in ladders.items())
+    print("✅ Lines and ladders unchanged by live scores")
+
+def test_ladder_reprices_deterministically():
+    """Repricing identical projections from scratch gives the identical ladder"""
+    print("\n🎲 Testing deterministic ladders")
+    print("-" * 40)
+
+    odds_service = make_odds_service()
+    snapshot = make_snapshot(TEAM_STATS)
+
+    odds_state_store.invalidate(LEAGUE_ID)
+    odds_service._reprice(make_matchups(), snapshot, WEEK)
+    before = {matchup_id: state.ladder for matchup_id, state in odds_state_store.get_week(LEAGUE_ID, WEEK).items()}
+
+    odds_state_store.invalidate(LEAGUE_ID)
+    odds_service._reprice(make_matchups(), snapshot, WEEK)
+    after = odds_state_store.get_week(LEAGUE_ID, WEEK)
+
+    for matchup_id, ladder in before.items():
+        assert ladder['spreads'] == after[matchup_id].ladder['spreads'], f"spread ladder jittered for {matchup_id}"
+        assert ladder['totals'] == after[matchup_id].ladder['totals'], f"total ladder jittered for {matchup_id}"
+    print("✅ Same inputs priced the same ladder")
+
+def main():
+    """Run the odds state tests"""
+    print("🚀 Odds State Store Tests")
+    print("=" * 50)
+
+    test_unchanged_inputs_skip_repricing()
+    test_changed_stats_reprice_only_that_matchup()
+    test_score_only_change_keeps_lines()
+    test_ladder_reprices_deterministically()
+
+    print("\n🎉 All odds state store tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Parity and benchmark tests for the vectorized odds path
+Checks OddsService.calculate_odds_arrays against a one-matchup-at-a-time reference and times large batches
+"""
+
+import sys
+import os
+import math
+import time
+import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.odds_service import OddsService
+
+def make_odds_service() -> OddsService:
+    """OddsService without ESPN/Supabase setup (the pricing math needs neither)"""
+    return OddsService.__new__(OddsService)
+
+def make_batch(size: int, seed: int = 42):
+    """Random season/recent averages for a batch of matchups"""
+    rng = np.random.default_rng(seed)
+    home_season = rng.uniform(70, 150, size)
+    home_recent = home_season + rng.normal(0, 15, size)
+    away_season = rng.uniform(70, 150, size)
+    away_recent = away_season + rng.normal(0, 15, size)
+    return home_season, home_recent, away_season, away_recent
+
+def reference_moneyline(probability: float) -> int:
+    """Scalar moneyline conversion, clamped like the service"""
+    probability = max(0.01, min(0.99, probability))
+    if probability >= 0.5:
+        odds = -int((probability / (1 - probability)) * 100)
+    else:
+        odds = int(((1 - probability) / probability) * 100)
+    return round(odds / 5) * 5
+
+def reference_odds(home_season: float, home_recent: float, away_season: float, away_recent: float):
+    """The pricing model for one matchup in plain Python (the scalar code the service used to run)"""
+    home_advantage = 2.5
+
+    # Weighted calculation: 60% recent form, 40% season average
+    home_projected = (home_recent * 0.6 + home_season * 0.4) + home_advantage
+    away_projected = away_recent * 0.6 + away_season * 0.4
+
+    home_win_prob = 0.5 + (0.5 * math.erf((home_projected - away_projected) / (15.0 * math.sqrt(2))))
+    away_win_prob = 1.0 - home_win_prob
+    home_win_prob = max(0.05, min(0.95, home_win_prob))
+    away_win_prob = max(0.05, min(0.95, away_win_prob))
+
+    return (
+        home_win_prob,
+        away_win_prob,
+        reference_moneyline(home_win_prob),
+        reference_moneyline(away_win_prob),
+        round((home_recent + home_advantage - away_recent) * 2) / 2,
+        round((home_recent + away_recent) * 2) / 2
+    )
+
+def price_scalar(home_season, home_recent, away_season, away_recent):
+    """Price each matchup one at a time through the reference model"""
+    return [
+        reference_odds(float(home_season[i]), float(home_recent[i]), float(away_season[i]), float(away_recent[i]))
+        for i in range(len(home_season))
+    ]
+
+def test_vectorized_parity():
+    """Vectorized odds match the reference model for every matchup"""
+    print("🧮 Testing vectorized odds parity")
+    print("-" * 40)
+
+    odds_service = make_odds_service()
+    batch = make_batch(2000)
+
+    scalar = price_scalar(*batch)
+    vectorized = odds_service.calculate_odds_arrays(*batch)
+
+    for i, (home_p, away_p, home_ml, away_ml, spread, total) in enumerate(scalar):
+        assert abs(vectorized['home_win_probability'][i] - home_p) < 1e-12, f"home probability mismatch at {i}"
+        assert abs(vectorized['away_win_probability'][i] - away_p) < 1e-12, f"away probability mismatch at {i}"
+        assert vectorized['home_moneyline'][i] == home_ml, f"home moneyline mismatch at {i}"
+        assert vectorized['away_moneyline'][i] == away_ml, f"away moneyline mismatch at {i}"
+        assert vectorized['spread'][i] == spread, f"spread mismatch at {i}"
+        assert vectorized['total'][i] == total, f"total mismatch at {i}"
+
+    print(f"✅ {len(scalar)} matchups match the scalar path")
+
+def test_extreme_probabilities_clamped():
+    """Lopsided matchups clamp to 5%/95% and the matching moneylines"""
+    print("\n📏 Testing probability clamping")
+    print("-" * 40)
+
+    odds_service = make_odds_service()
+    vectorized = odds_service.calculate_odds_arrays(
+        np.array([200.0, 50.0]), np.array([200.0, 50.0]),
+        np.array([50.0, 200.0]), np.array([50.0, 200.0])
+    )
+
+    assert list(vectorized['home_win_probability']) == [0.95, 0.05]
+    assert list(vectorized['home_moneyline']) == [-1900, 1900]
+
+    # Unclamped probabilities (advanced odds) still get finite prices, the same from either conversion
+    extremes = [0.0, 0.005, 0.5, 0.995, 1.0]
+    assert list(odds_service._probabilities_to_moneylines(np.array(extremes))) == [9900, 9900, -100, -9900, -9900]
+    assert [odds_service._probability_to_moneyline(p) for p in extremes] == [9900, 9900, -100, -9900, -9900]
+    print("✅ Extreme matchups clamped")
+
+def benchmark_vectorized_odds(batch_sizes=(100, 1000, 10000)):
+    """Compare scalar and vectorized pricing on multi-league sized batches"""
+    print("\n⏱️  Benchmarking vectorized odds")
+    print("-" * 40)
+
+    odds_service = make_odds_service()
+    for size in batch_sizes:
+        batch = make_batch(size)
+
+        start = time.perf_counter()
+        price_scalar(*batch)
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        odds_service.calculate_odds_arrays(*batch)
+        vectorized_time = time.perf_counter() - start
+
+        print(f"   {size:>6} matchups: scalar {scalar_time * 1000:8.2f} ms, "
+              f"vectorized {vectorized_time * 1000:7.2f} ms "
+              f"({scalar_time / max(vectorized_time, 1e-9):.0f}x)")
+
+def main():
+    """Run parity tests and the benchmark"""
+    print("🚀 Vectorized Odds Tests")
+    print("=" * 50)
+
+    test_vectorized_parity()
+    test_extreme_probabilities_clamped()
+    benchmark_vectorized_odds()
+
+    print("\n🎉 All vectorized odds tests passed!")
+
+if __name__ == "__main__":
+    main()